@@ -45,7 +45,7 @@ from .ui import *
 from .buttons import *
 from .buttons.customize import *
 from .lib import keymaps, preferences, classesToRegister
-from .lib.Brick.legal_brick_sizes import getLegalBrickSizes
+from .lib.Brick.legal_brick_sizes import getLegalBrickSizes, getLegalBrickSizeTables
 from .ui.timers import *
 from .ui.cmlist_attrs import CreatedModelProperties
 from . import addon_updater_ops
@@ -88,6 +88,8 @@ def register():
 
     # define legal brick sizes (key:height, val:[width,depth])
     bpy.props.Bricker_legal_brick_sizes = getLegalBrickSizes()
+    # lookup tables of legal brick sizes (see 'legalBrickSize')
+    bpy.props.Bricker_legal_brick_size_tables = getLegalBrickSizeTables()
 
     # Add attribute for Bricker Instructions addon
     Scene.isBrickerInstalled = BoolProperty(default=True)
@@ -129,6 +131,7 @@ def register():
     bpy.app.handlers.save_pre.append(handle_storing_to_deep_cache)
     bpy.app.handlers.save_pre.append(safe_link_parent)
     bpy.app.handlers.save_post.append(safe_unlink_parent)
+    bpy.app.handlers.save_post.append(handle_relocating_frame_files)
     bpy.app.handlers.load_post.append(safe_unlink_parent)
     bpy.app.handlers.load_post.append(handle_upconversion)
     bpy.app.handlers.load_post.append(reset_undo_stack)
@@ -145,6 +148,7 @@ def unregister():
     bpy.app.handlers.load_post.remove(reset_undo_stack)
     bpy.app.handlers.load_post.remove(handle_upconversion)
     bpy.app.handlers.load_post.remove(safe_unlink_parent)
+    bpy.app.handlers.save_post.remove(handle_relocating_frame_files)
     bpy.app.handlers.save_post.remove(safe_unlink_parent)
     bpy.app.handlers.save_pre.remove(safe_link_parent)
     bpy.app.handlers.save_pre.remove(handle_storing_to_deep_cache)
@@ -0,0 +1,93 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare legacy (JSON + zlib + hex) and binary BFMCache formats for each brick model in a .blend file
+
+Usage (with Bricker enabled):
+    blender -b path/to/models.blend --python benchmarks/bfm_cache.py
+
+Reports save/load time and cache string size for each model with a matrix cache, and
+the size of the .blend file saved with each format.
+"""
+
+# System imports
+import importlib
+import json
+import os
+import tempfile
+import time
+
+# Blender imports
+import bpy
+import addon_utils
+
+
+def getBrickerModule(name):
+    for mod in addon_utils.modules():
+        if mod.bl_info["name"] == "Bricker":
+            return importlib.import_module(mod.__name__ + name)
+    raise ImportError("Bricker addon not found")
+
+
+def timeIt(func, *args):
+    startTime = time.time()
+    result = func(*args)
+    return result, time.time() - startTime
+
+
+def getBlendSize(cacheStrs):
+    """ returns size of .blend file saved with 'cacheStrs' in place of each model's BFMCache """
+    scn = bpy.context.scene
+    origCacheStrs = [cm.BFMCache for cm in scn.cmlist]
+    for cm, cacheStr in zip(scn.cmlist, cacheStrs):
+        cm.BFMCache = cacheStr
+    filePath = os.path.join(tempfile.gettempdir(), "bricker_bfm_cache_benchmark.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=filePath, copy=True, compress=False)
+    size = os.path.getsize(filePath)
+    os.remove(filePath)
+    for cm, cacheStr in zip(scn.cmlist, origCacheStrs):
+        cm.BFMCache = cacheStr
+    return size
+
+
+def main():
+    bricksDictLib = getBrickerModule(".lib.bricksDict")
+    common = getBrickerModule(".functions.common")
+    scn = bpy.context.scene
+    legacyStrs, binaryStrs = [], []
+    print("%-24s %8s %10s %10s %10s" % ("model", "format", "save (s)", "load (s)", "size (MB)"))
+    for cm in scn.cmlist:
+        if cm.BFMCache in ("", "null"):
+            legacyStrs.append(cm.BFMCache)
+            binaryStrs.append(cm.BFMCache)
+            continue
+        cache = bricksDictLib.decodeBFMCache(cm.BFMCache)
+        # legacy format
+        legacyStr, saveTime = timeIt(lambda c: common.compress_str(json.dumps(c, default=dict)), cache)
+        _, loadTime = timeIt(lambda s: bricksDictLib.loadBricksDictCache(common.decompress_str(s)), legacyStr)
+        print("%-24s %8s %10.3f %10.3f %10.2f" % (cm.name, "legacy", saveTime, loadTime, len(legacyStr) / 1e6))
+        # binary format
+        binaryStr, saveTime = timeIt(bricksDictLib.encodeBFMCache, cache)
+        _, loadTime = timeIt(bricksDictLib.decodeBFMCache, binaryStr)
+        print("%-24s %8s %10.3f %10.3f %10.2f" % (cm.name, "binary", saveTime, loadTime, len(binaryStr) / 1e6))
+        legacyStrs.append(legacyStr)
+        binaryStrs.append(binaryStr)
+    print(".blend size (MB): legacy %.2f, binary %.2f" % (getBlendSize(legacyStrs) / 1e6, getBlendSize(binaryStrs) / 1e6))
+
+
+main()
@@ -0,0 +1,102 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare brick connectivity of 'connectThresh' sampling and the connectivity optimizer
+('optimizeLayer') when merging stacked layers of plates
+
+Usage (with Bricker enabled):
+    blender -b --python benchmarks/connectivity.py
+
+Merges a cylinder of 1x1 plates layer by layer, and reports the number of brick edges
+aligned with edges of bricks in the layer below, number of bricks, and merge time for
+random merging with 1 and 10 sampled variations per layer and for the optimizer with
+a few time limits per layer.
+"""
+
+# System imports
+import importlib
+import time
+import numpy as np
+
+# Blender imports
+import addon_utils
+
+radius = 30
+numLayers = 6
+connectThreshs = (1, 10)
+timeLimits = (0.1, 0.5)
+
+
+def getBrickerModule(name):
+    for mod in addon_utils.modules():
+        if mod.bl_info["name"] == "Bricker":
+            return importlib.import_module(mod.__name__ + name)
+    raise ImportError("Bricker addon not found")
+
+
+def buildLayers(bricksDictLib, general):
+    """ returns BricksDict of stacked circular layers of drawn 1x1 plates and its keys by z-level """
+    locs = [[x, y, z] for z in range(numLayers) for x in range(-radius, radius) for y in range(-radius, radius) if x * x + y * y < radius * radius]
+    keys = [general.packKey(*loc) for loc in locs]
+    bricksDict = bricksDictLib.BricksDict(capacity=len(keys))
+    bricksDict.addRows(keys, loc=locs, val=[1] * len(keys), draw=[True] * len(keys), type=["PLATE"] * len(keys))
+    keysDict = {}
+    for key, loc in zip(keys, locs):
+        keysDict.setdefault(loc[2], []).append(key)
+    return bricksDict, keysDict
+
+
+def mergeSampled(bricksDictLib, bricksDict, keysDict, connectThresh):
+    """ merge layers keeping the best of 'connectThresh' random variations (as 'mergeLayersParallel' does) """
+    mergeWorker = bricksDictLib.getMergeWorker()
+    for zIdx, z in enumerate(sorted(keysDict)):
+        keys = keysDict[z]
+        task, brickTypes = bricksDictLib.getLayerTask(bricksDict, keys, 1, "PLATES", 2, 10, True, False, "RANDOM")
+        variations = []
+        for j in range(connectThresh):
+            randState = np.random.RandomState([0, zIdx, j])
+            variationTask = dict(task, order=randState.permutation(len(keys)).tolist(), randOrders=randState.randint(0, 2, size=len(keys)).tolist())
+            _, results = mergeWorker.mergeLayerTask(variationTask)
+            variations.append([(keys[idx], [w, d, 1], brickTypes[idx]) for idx, w, d in results])
+        bricks = variations[0] if connectThresh == 1 else bricksDictLib.getBestVariation(bricksDict, variations, False)
+        bricksDictLib.setLayerBricks(bricksDict, bricks, 1, "PLATES")
+
+
+def mergeOptimized(bricksDictLib, bricksDict, keysDict, timeLimit):
+    for z in sorted(keysDict):
+        bricksDictLib.optimizeLayer(bricksDict, keysDict[z], keysDict.get(z - 1), 1, z, "PLATES", 2, 10, True, False, timeLimit)
+
+
+def main():
+    bricksDictLib = getBrickerModule(".lib.bricksDict")
+    general = getBrickerModule(".functions.general")
+
+    runs = [("sampled x%(connectThresh)s" % locals(), mergeSampled, connectThresh) for connectThresh in connectThreshs]
+    runs += [("optimized %(timeLimit)ss" % locals(), mergeOptimized, timeLimit) for timeLimit in timeLimits]
+    print("%-16s %14s %10s %10s" % ("merge", "aligned edges", "bricks", "time (s)"))
+    for name, merge, arg in runs:
+        bricksDict, keysDict = buildLayers(bricksDictLib, general)
+        startTime = time.time()
+        merge(bricksDictLib, bricksDict, keysDict, arg)
+        elapsed = time.time() - startTime
+        numAlignedEdges = bricksDictLib.getNumAlignedEdgesInModel(bricksDict, keysDict)
+        numBricks = sum(1 for keys in keysDict.values() for key in keys if bricksDict[key]["parent"] == "self")
+        print("%-16s %14d %10d %10.3f" % (name, numAlignedEdges, numBricks, elapsed))
+
+
+main()
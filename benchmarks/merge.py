@@ -0,0 +1,106 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compare list-based (remove_item) and set-based availability tracking when merging a single layer
+of plates key by key, and the layer merge engine ('mergeLayer')
+
+Usage (with Bricker enabled):
+    blender -b --python benchmarks/merge.py [-- --full]
+
+Merges square layers of up to 500x500 1x1 plates with 'attemptMerge' the way
+'makeBricks' does, and reports merge time for each layer size. List-based tracking
+grows quadratically with layer size, so it is only run on the smaller layers
+unless '--full' is passed.
+"""
+
+# System imports
+import importlib
+import random
+import sys
+import time
+import numpy as np
+
+# Blender imports
+import addon_utils
+
+layerSides = (50, 100, 200, 300, 400, 500)
+maxListSide = 200
+
+
+def getBrickerModule(name):
+    for mod in addon_utils.modules():
+        if mod.bl_info["name"] == "Bricker":
+            return importlib.import_module(mod.__name__ + name)
+    raise ImportError("Bricker addon not found")
+
+
+def buildLayer(bricksDictLib, general, side):
+    """ returns BricksDict of side x side drawn 1x1 plates and their keys in merge order """
+    locs = [[x, y, 0] for x in range(side) for y in range(side)]
+    keys = [general.packKey(*loc) for loc in locs]
+    bricksDict = bricksDictLib.BricksDict(capacity=len(keys))
+    bricksDict.addRows(keys, loc=locs, val=[1] * len(keys), draw=[True] * len(keys), type=["PLATE"] * len(keys))
+    random.seed(0)
+    random.shuffle(keys)
+    return bricksDict, keys
+
+
+def mergeLayerByKey(bricksDictLib, bricksDict, keys, availableKeys, removeKeys):
+    """ merge all keys in layer, tracking available keys with 'availableKeys' and 'removeKeys' """
+    randState = np.random.RandomState(0)
+    for key in keys:
+        brickD = bricksDict[key]
+        if brickD["attempted_merge"] or brickD["parent"] not in (None, "self"):
+            removeKeys(availableKeys, [key])
+            continue
+        brickSize, keysInBrick = bricksDictLib.attemptMerge(bricksDict, key, availableKeys, [1, 1, 1], 1, randState, "PLATES", 2, 10, True, True, True, "NONE", mergeVertical=False)
+        removeKeys(availableKeys, keysInBrick)
+
+
+def main():
+    bricksDictLib = getBrickerModule(".lib.bricksDict")
+    general = getBrickerModule(".functions.general")
+    common = getBrickerModule(".functions.common")
+    full = "--full" in sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else False
+
+    def removeFromList(availableKeys, keys):
+        for k in keys:
+            common.remove_item(availableKeys, k)
+
+    def removeFromSet(availableKeys, keys):
+        availableKeys.difference_update(keys)
+
+    print("%-10s %10s %12s %12s %12s" % ("layer", "keys", "list (s)", "set (s)", "layer (s)"))
+    for side in layerSides:
+        times = []
+        for container, removeKeys in ((list, removeFromList), (set, removeFromSet)):
+            if container is list and side > maxListSide and not full:
+                times.append(None)
+                continue
+            bricksDict, keys = buildLayer(bricksDictLib, general, side)
+            startTime = time.time()
+            mergeLayerByKey(bricksDictLib, bricksDict, keys, container(keys), removeKeys)
+            times.append(time.time() - startTime)
+        bricksDict, keys = buildLayer(bricksDictLib, general, side)
+        startTime = time.time()
+        bricksDictLib.mergeLayer(bricksDict, keys, 1, np.random.RandomState(0), "PLATES", 2, 10, True, True)
+        times.append(time.time() - startTime)
+        print("%-10s %10d %12s %12s %12s" % ("%(side)sx%(side)s" % locals(), side * side, *("skipped" if t is None else "%.3f" % t for t in times)))
+
+
+main()
@@ -73,9 +73,10 @@ class BRICKER_OT_brickify(bpy.types.Operator):
                         if animAction: self.report({"INFO"}, "Completed frame %(frame)s of model '%(n)s'" % locals())
                         # cache bricksDict
                         retrieved_data = self.JobManager.get_retrieved_python_data(job)
-                        bricksDict = None if retrieved_data["bricksDict"] in ("", "null") else json.loads(decompress_str(retrieved_data["bricksDict"]))
+                        bricksDict = None if retrieved_data["bricksDict"] in ("", "null") else decodeBFMCache(retrieved_data["bricksDict"])
                         cm.brickSizesUsed = retrieved_data["brickSizesUsed"]
                         cm.brickTypesUsed = retrieved_data["brickTypesUsed"]
+                        cm.numAlignedEdges = retrieved_data["numAlignedEdges"]
                         if bricksDict is not None: cacheBricksDict(self.action, cm, bricksDict[str(frame)] if animAction else bricksDict, curFrame=frame)
                         # process retrieved bricker data
                         bricker_parent = bpy.data.objects.get("Bricker_%(n)s_parent%(objFrameStr)s" % locals())
@@ -463,7 +464,7 @@ class BRICKER_OT_brickify(bpy.types.Operator):
             filename = bpy.path.basename(bpy.data.filepath)[:-6]
             curJob = "%(filename)s__%(n)s" % locals()
             script = os.path.join(self.brickerAddonPath, "lib", "brickify_in_background_template.py")
-            jobAdded, msg = self.JobManager.add_job(curJob, script=script, passed_data={"frame":None, "cmlist_index":scn.cmlist_index, "action":self.action}, use_blend_file=True)
+            jobAdded, msg = self.JobManager.add_job(curJob, script=script, passed_data={"frame":None, "cmlist_index":scn.cmlist_index, "action":self.action, "smokeCacheDir":""}, use_blend_file=True)
             if not jobAdded: raise Exception(msg)
             self.jobs.append(curJob)
         else:
@@ -536,6 +537,9 @@ class BRICKER_OT_brickify(bpy.types.Operator):
         # prepare duplicate objects for animation
         duplicates = self.getDuplicateObjects(scn, cm, n, cm.startFrame, cm.stopFrame)
 
+        # get directory of smoke point cache files so frames can be read without replaying the simulation
+        smokeCacheDir = getCacheDirectory(self.getSmokePointCache(self.source)) if cm.isSmoke else ""
+
         filename = bpy.path.basename(bpy.data.filepath)[:-6]
         overwrite_blend = True
         # iterate through frames of animation and generate Brick Model
@@ -548,12 +552,12 @@ class BRICKER_OT_brickify(bpy.types.Operator):
             if self.brickifyInBackground:
                 curJob = "%(filename)s__%(n)s__%(curFrame)s" % locals()
                 script = os.path.join(self.brickerAddonPath, "lib", "brickify_in_background_template.py")
-                jobAdded, msg = self.JobManager.add_job(curJob, script=script, passed_data={"frame":curFrame, "cmlist_index":scn.cmlist_index, "action":self.action}, use_blend_file=True, overwrite_blend=overwrite_blend)
+                jobAdded, msg = self.JobManager.add_job(curJob, script=script, passed_data={"frame":curFrame, "cmlist_index":scn.cmlist_index, "action":self.action, "smokeCacheDir":smokeCacheDir}, use_blend_file=True, overwrite_blend=overwrite_blend)
                 if not jobAdded: raise Exception(msg)
                 self.jobs.append(curJob)
                 overwrite_blend = False
             else:
-                success = self.brickifyCurrentFrame(curFrame, self.action)
+                success = self.brickifyCurrentFrame(curFrame, self.action, smokeCacheDir=smokeCacheDir)
                 if not success:
                     break
 
@@ -565,18 +569,21 @@ class BRICKER_OT_brickify(bpy.types.Operator):
         cm.lastStopFrame = cm.stopFrame
 
     @staticmethod
-    def brickifyCurrentFrame(curFrame, action, inBackground=False):
+    def brickifyCurrentFrame(curFrame, action, inBackground=False, smokeCacheDir=None):
         scn, cm, n = getActiveContextInfo()
         wm = bpy.context.window_manager
         Bricker_parent_on = "Bricker_%(n)s_parent" % locals()
         parent0 = bpy.data.objects.get(Bricker_parent_on)
         origFrame = scn.frame_current
-        if inBackground and cm.isSmoke:
-            smokeMod = [mod for mod in cm.source_obj.modifiers if mod.type == "SMOKE"][0]
-            point_cache = smokeMod.domain_settings.point_cache
-            point_cache.name = str(curFrame)
-            for frame in range(point_cache.frame_start, curFrame):
-                scn.frame_set(frame)
+        smokeCacheFile = None
+        if cm.isSmoke:
+            point_cache = BRICKER_OT_brickify.getSmokePointCache(cm.source_obj)
+            # read smoke channels straight from point cache file if current frame was cached to disk
+            smokeCacheFile = getCacheFilePath(cm.source_obj, point_cache, curFrame, cache_dir=smokeCacheDir)
+            if inBackground and smokeCacheFile is None:
+                point_cache.name = str(curFrame)
+                for frame in range(point_cache.frame_start, curFrame):
+                    scn.frame_set(frame)
         scn.frame_set(origFrame)
         # get duplicated source
         source = bpy.data.objects.get("Bricker_%(n)s_f_%(curFrame)s" % locals())
@@ -604,7 +611,7 @@ class BRICKER_OT_brickify(bpy.types.Operator):
 
         # create new bricks
         try:
-            coll_name, _ = BRICKER_OT_brickify.createNewBricks(source, parent, source_details, dimensions, refLogo, logo_details, action, split=cm.splitModel, curFrame=curFrame, clearExistingCollection=False, origSource=cm.source_obj, selectCreated=False)
+            coll_name, _ = BRICKER_OT_brickify.createNewBricks(source, parent, source_details, dimensions, refLogo, logo_details, action, split=cm.splitModel, curFrame=curFrame, clearExistingCollection=False, origSource=cm.source_obj, selectCreated=False, smokeCacheFile=smokeCacheFile)
         except KeyboardInterrupt:
             if curFrame != cm.startFrame:
                 wm.progress_end()
@@ -711,7 +718,7 @@ class BRICKER_OT_brickify(bpy.types.Operator):
         return anim_coll
 
     @staticmethod
-    def createNewBricks(source, parent, source_details, dimensions, refLogo, logo_details, action, split=True, cm=None, curFrame=None, bricksDict=None, keys="ALL", clearExistingCollection=True, selectCreated=False, printStatus=True, tempBrick=False, redraw=False, origSource=None):
+    def createNewBricks(source, parent, source_details, dimensions, refLogo, logo_details, action, split=True, cm=None, curFrame=None, bricksDict=None, keys="ALL", clearExistingCollection=True, selectCreated=False, printStatus=True, tempBrick=False, redraw=False, origSource=None, smokeCacheFile=None):
         """ gets/creates bricksDict, runs makeBricks, and caches the final bricksDict """
         scn, cm, n = getActiveContextInfo(cm=cm)
         brickScale, customData = getArgumentsForBricksDict(cm, source=source, dimensions=dimensions)
@@ -726,7 +733,7 @@ class BRICKER_OT_brickify(bpy.types.Operator):
                 # multiply brickScale by offset distance
                 brickScale2 = brickScale if cm.brickType != "CUSTOM" else vec_mult(brickScale, Vector(cm.distOffset))
                 # create new bricksDict
-                bricksDict = makeBricksDict(source, source_details, brickScale2, uv_images, cursorStatus=updateCursor)
+                bricksDict = makeBricksDict(source, source_details, brickScale2, uv_images, cursorStatus=updateCursor, smokeCacheFile=smokeCacheFile)
         else:
             loadedFromCache = True
         # reset all values for certain keys in bricksDict dictionaries
@@ -1030,6 +1037,12 @@ class BRICKER_OT_brickify(bpy.types.Operator):
         parent.use_fake_user = True
         return parent
 
+    @staticmethod
+    def getSmokePointCache(source):
+        """ returns point cache of smoke domain modifier on source object """
+        smokeMod = [mod for mod in source.modifiers if mod.type == "SMOKE"][0]
+        return smokeMod.domain_settings.point_cache
+
     @staticmethod
     def getAction(cm):
         """ gets current action type from passed cmlist item """
@@ -48,12 +48,11 @@ class BRICKER_OT_brickify_in_background(bpy.types.Operator):
         scn, cm, n = getActiveContextInfo()
         # run brickify for current frame
         if "ANIM" in self.action:
-            BRICKER_OT_brickify.brickifyCurrentFrame(self.frame, self.action, inBackground=True)
+            BRICKER_OT_brickify.brickifyCurrentFrame(self.frame, self.action, inBackground=True, smokeCacheDir=self.smokeCacheDir or None)
         else:
             BRICKER_OT_brickify.brickifyActiveFrame(self.action)
         # save last cache to cm.BFMCache
-        bfm_cache_str = json.dumps(bricker_bfm_cache[cm.id])
-        cm.BFMCache = compress_str(bfm_cache_str)
+        cm.BFMCache = encodeBFMCache(bricker_bfm_cache[cm.id])
         return {"FINISHED"}
 
     ################################################
@@ -67,6 +66,7 @@ class BRICKER_OT_brickify_in_background(bpy.types.Operator):
 
     frame = IntProperty(default=-1)
     action = StringProperty(default="CREATE")
+    smokeCacheDir = StringProperty(default="")
 
     #############################################
 
@@ -26,6 +26,7 @@ props = bpy.props
 # Addon imports
 from .customize.undo_stack import *
 from ..lib.caches import *
+from ..lib.bricksDict.frame_cache import FrameFiles, getFrameFiles, uncacheFrames
 from ..functions import *
 
 
@@ -68,15 +69,22 @@ class BRICKER_OT_clear_cache(bpy.types.Operator):
     @staticmethod
     def clearCache(cm, brick_mesh=True, light_matrix=True, deep_matrix=True):
         """clear caches for cmlist item"""
+        frameFiles = bricker_bfm_cache.get(cm.id)
+        frameFiles = frameFiles if isinstance(frameFiles, FrameFiles) else getFrameFiles(cm)
         # clear light brick mesh cache
         if brick_mesh:
             bricker_mesh_cache[cm.id] = None
         # clear light matrix cache
         if light_matrix:
             bricker_bfm_cache[cm.id] = None
+            bricker_smoke_cache.pop(cm.id, None)
+            if frameFiles is not None:
+                uncacheFrames(frameFiles.cacheDir)
         # clear deep matrix cache
         if deep_matrix:
             cm.BFMCache = ""
+            if frameFiles is not None:
+                frameFiles.clear()
 
     @staticmethod
     def clearCaches(brick_mesh=True, light_matrix=True, deep_matrix=True):
@@ -27,11 +27,15 @@ from ...functions import *
 from ..brickify import *
 from ..brickify import *
 from ...lib.bricksDict.functions import getDictKey
+from ...lib.caches import bricker_bfm_cache
 from ...lib.Brick.legal_brick_sizes import *
 from .undo_stack import *
 
 
 def drawUpdatedBricks(cm, bricksDict, keysToUpdate, action="redrawing", selectCreated=True, tempBrick=False):
+    # customize tools modify the cached bricksDict in place, so recompute its size in the cache
+    if cm.id in bricker_bfm_cache:
+        bricker_bfm_cache.updateSize(cm.id)
     if len(keysToUpdate) == 0: return
     if not isUnique(keysToUpdate): raise ValueError("keysToUpdate cannot contain duplicate values")
     if action is not None:
@@ -57,13 +61,13 @@ def drawUpdatedBricks(cm, bricksDict, keysToUpdate, action="redrawing", selectCr
 
 def getAdjKeysAndBrickVals(bricksDict, loc=None, key=None):
     assert loc or key
-    x, y, z = loc or getDictLoc(bricksDict, key)
-    adjKeys = [listToStr((x+1, y, z)),
-               listToStr((x-1, y, z)),
-               listToStr((x, y+1, z)),
-               listToStr((x, y-1, z)),
-               listToStr((x, y, z+1)),
-               listToStr((x, y, z-1))]
+    key = packKey(*loc) if loc else key
+    adjKeys = [key + keyStepX,
+               key - keyStepX,
+               key + keyStepY,
+               key - keyStepY,
+               key + keyStepZ,
+               key - keyStepZ]
     adjBrickVals = []
     for k in adjKeys.copy():
         try:
@@ -74,7 +78,7 @@ def getAdjKeysAndBrickVals(bricksDict, loc=None, key=None):
 
 
 def setCurBrickVal(bricksDict, loc, key=None, action="ADD"):
-    key = key or listToStr(loc)
+    key = key or packKey(*loc)
     _, adjBrickVals = getAdjKeysAndBrickVals(bricksDict, loc=loc)
     if action == "ADD" and (0 in adjBrickVals or len(adjBrickVals) < 6 or min(adjBrickVals) == 1):
         newVal = 1
@@ -93,7 +97,7 @@ def verifyBrickExposureAboveAndBelow(scn, zStep, origLoc, bricksDict, decriment=
         dictLocs.append((origLoc[0], origLoc[1], origLoc[2] - 1))
     # double check exposure of bricks above/below new adjacent brick
     for dictLoc in dictLocs:
-        k = listToStr(dictLoc)
+        k = packKey(*dictLoc)
         junk1 = k not in bricksDict
         try:
             junk2 = bricksDict[k]
@@ -147,7 +151,7 @@ def getAvailableTypes(by="SELECTION", includeSizes=[]):
         # build items list
         for obj_name in objNamesD[cm_id]:
             dictKey = getDictKey(obj_name)
-            objSize = bricksDict[dictKey]["size"]
+            objSize = list(bricksDict[dictKey]["size"])
             if objSize in objSizes:
                 continue
             objSizes.append(objSize)
@@ -176,27 +180,30 @@ def updateBrickSizeAndDict(dimensions, source_name, bricksDict, brickSize, key,
     targetHeight = targetHeight or (1 if targetType in getBrickTypes(height=1) else 3)
     assert curHeight is not None or curType is not None
     curHeight = curHeight or (1 if curType in getBrickTypes(height=1) else 3)
+    brickSize = list(brickSize)
     # adjust brick size if changing type from 3 tall to 1 tall
     if curHeight == 3 and targetHeight == 1:
         brickSize[2] = 1
+        brickD["size"] = brickSize
         for x in range(brickSize[0]):
             for y in range(brickSize[1]):
                 for z in range(1, curHeight):
                     newLoc = [loc[0] + x, loc[1] + y, loc[2] + z - dec]
-                    newKey = listToStr(newLoc)
+                    newKey = packKey(*newLoc)
                     bricksDict[newKey]["parent"] = None
                     bricksDict[newKey]["draw"] = False
                     setCurBrickVal(bricksDict, newLoc, newKey, action="REMOVE")
     # adjust brick size if changing type from 1 tall to 3 tall
     elif curHeight == 1 and targetHeight == 3:
         brickSize[2] = 3
+        brickD["size"] = brickSize
         full_d = Vector((dimensions["width"], dimensions["width"], dimensions["height"]))
         # update bricks dict entries above current brick
         for x in range(brickSize[0]):
             for y in range(brickSize[1]):
                 for z in range(1, targetHeight):
                     newLoc = [loc[0] + x, loc[1] + y, loc[2] + z]
-                    newKey = listToStr(newLoc)
+                    newKey = packKey(*newLoc)
                     # create new bricksDict entry if it doesn't exist
                     if newKey not in bricksDict:
                         bricksDict = createAddlBricksDictEntry(source_name, bricksDict, key, newKey, full_d, x, y, z)
@@ -214,11 +221,11 @@ def updateBrickSizeAndDict(dimensions, source_name, bricksDict, brickSize, key,
 
 def createAddlBricksDictEntry(source_name, bricksDict, source_key, key, full_d, x, y, z):
     brickD = bricksDict[source_key]
-    newName = "Bricker_%(source_name)s__%(key)s" % locals()
+    newName = "Bricker_%(source_name)s__%(keyStr)s" % {"source_name":source_name, "keyStr":keyToStr(key)}
     newCO = (Vector(brickD["co"]) + vec_mult(Vector((x, y, z)), full_d)).to_tuple()
     bricksDict[key] = createBricksDictEntry(
         name=              newName,
-        loc=               strToList(key),
+        loc=               unpackKey(key),
         co=                newCO,
         near_face=         brickD["near_face"],
         near_intersection= tuple(brickD["near_intersection"]),
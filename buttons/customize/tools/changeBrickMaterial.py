@@ -71,7 +71,7 @@ class BRICKER_OT_change_brick_material(Operator):
                 cm = getItemByID(scn.cmlist, cm_id)
                 self.undo_stack.iterateStates(cm)
                 # initialize vars
-                bricksDict = json.loads(self.cached_bfm[cm_id])
+                bricksDict = loadBricksDictCache(self.cached_bfm[cm_id])
                 keysToUpdate = set()
                 cm.customized = True
 
@@ -111,7 +111,7 @@ class BRICKER_OT_change_brick_material(Operator):
         self.mat_name = "NONE"
         # push to undo stack
         self.undo_stack = UndoStack.get_instance()
-        self.cached_bfm = self.undo_stack.undo_push('change material', list(self.objNamesD.keys()))
+        self.cached_bfm = self.undo_stack.undo_push('change material', list(self.objNamesD.keys()), return_cache=True)
 
     ###################################################
     # class variables
@@ -142,7 +142,6 @@ class BRICKER_OT_change_brick_type(Operator):
         if self.orig_undo_stack_length == self.undo_stack.getLength():
             self.undo_stack.undo_push('change_type', affected_ids=list(self.objNamesD.keys()))
         scn = bpy.context.scene
-        legalBrickSizes = bpy.props.Bricker_legal_brick_sizes
         # get original active and selected objects
         active_obj = bpy.context.active_object
         initial_active_obj_name = active_obj.name if active_obj else ""
@@ -157,7 +156,7 @@ class BRICKER_OT_change_brick_type(Operator):
             cm = getItemByID(scn.cmlist, cm_id)
             self.undo_stack.iterateStates(cm)
             # initialize vars
-            bricksDict = deepcopy(self.bricksDicts[cm_id])
+            bricksDict = copyBricksDict(self.bricksDicts[cm_id])
             keysToUpdate = set()
             updateHasCustomObjs(cm, targetBrickType)
             cm.customized = True
@@ -182,12 +181,12 @@ class BRICKER_OT_change_brick_type(Operator):
                              and bricksDict[dictKey]["rotated"] == self.rotateBrick))):
                     continue
                 # skip bricks that can't be turned into the chosen brick type
-                if size[:2] not in legalBrickSizes[3 if targetBrickType in getBrickTypes(height=3) else 1][targetBrickType]:
+                if not legalBrickSize(size=[size[0], size[1], 3 if targetBrickType in getBrickTypes(height=3) else 1], type=targetBrickType):
                     continue
 
                 # verify locations above are not obstructed
                 if targetBrickType in getBrickTypes(height=3) and size[2] == 1:
-                    aboveKeys = [listToStr((x0 + x, y0 + y, z0 + z)) for z in range(1, 3) for y in range(size[1]) for x in range(size[0])]
+                    aboveKeys = [packKey(x0 + x, y0 + y, z0 + z) for z in range(1, 3) for y in range(size[1]) for x in range(size[0])]
                     obstructed = False
                     for curKey in aboveKeys:
                         if curKey in bricksDict and bricksDict[curKey]["draw"]:
@@ -215,8 +214,8 @@ class BRICKER_OT_change_brick_type(Operator):
                 for curLoc in brickLocs:
                     bricksDict = verifyBrickExposureAboveAndBelow(scn, cm.zStep, curLoc, bricksDict, decriment=3 if bAndPBrick else 1)
                     # add bricks to keysToUpdate
-                    keysToUpdate |= set([getParentKey(bricksDict, listToStr((x0 + x, y0 + y, z0 + z))) for z in (-1, 0, 3 if bAndPBrick else 1) for y in range(size[1]) for x in range(size[0])])
-                objNamesToSelect += [bricksDict[listToStr(loc)]["name"] for loc in brickLocs]
+                    keysToUpdate |= set([getParentKey(bricksDict, packKey(x0 + x, y0 + y, z0 + z)) for z in (-1, 0, 3 if bAndPBrick else 1) for y in range(size[1]) for x in range(size[0])])
+                objNamesToSelect += [bricksDict[packKey(*loc)]["name"] for loc in brickLocs]
 
             # remove null keys
             keysToUpdate = [x for x in keysToUpdate if x != None]
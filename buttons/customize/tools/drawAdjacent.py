@@ -207,7 +207,7 @@ class BRICKER_OT_draw_adjacent(Operator):
     @staticmethod
     def getBrickD(bricksDict, dkl):
         """ set up adjBrickD """
-        adjacent_key = listToStr(dkl)
+        adjacent_key = packKey(*dkl)
         try:
             brickD = bricksDict[adjacent_key]
             return adjacent_key, brickD
@@ -254,7 +254,7 @@ class BRICKER_OT_draw_adjacent(Operator):
         if not adjBrickD:
             co = BRICKER_OT_draw_adjacent.getNewCoord(cm, bricksDict, dictKey, dictLoc, adjacent_key, adjacent_loc, dimensions)
             bricksDict[adjacent_key] = createBricksDictEntry(
-                name=              'Bricker_%(n)s__%(adjacent_key)s' % locals(),
+                name=              'Bricker_%(n)s__%(adjacentKeyStr)s' % {"n":n, "adjacentKeyStr":keyToStr(adjacent_key)},
                 loc=               adjacent_loc,
                 co=                co,
                 near_face=         bricksDict[dictKey]["near_face"],
@@ -278,7 +278,7 @@ class BRICKER_OT_draw_adjacent(Operator):
             elif adjBrickD["created_from"] == dictKey:
                 # update bricksDict values for brick being removed
                 x0, y0, z0 = adjacent_loc
-                brickKeys = [listToStr((x0, y0, z0 + z)) for z in range((cm.zStep + 2) % 4 if side in (4, 5) else 1)]
+                brickKeys = [packKey(x0, y0, z0 + z) for z in range((cm.zStep + 2) % 4 if side in (4, 5) else 1)]
                 for k in brickKeys:
                     bricksDict[k]["draw"] = False
                     setCurBrickVal(bricksDict, getDictLoc(bricksDict, k), k, action="REMOVE")
@@ -299,7 +299,7 @@ class BRICKER_OT_draw_adjacent(Operator):
             if checkTwoMoreAbove:
                 x0, y0, z0 = adjacent_loc
                 for z in range(1, 3):
-                    newKey = listToStr((x0, y0, z0 + z))
+                    newKey = packKey(x0, y0, z0 + z)
                     # if brick drawn in next loc and not just rerunning based on new direction selection
                     if (newKey in bricksDict and bricksDict[newKey]["draw"] and
                         (not BRICKER_OT_draw_adjacent.isBrickAlreadyCreated(adjDKLs, adjBricksCreated, brickNum, side) or
@@ -141,14 +141,15 @@ class BRICKER_OT_merge_bricks(Operator):
         height3Only = mergeVertical and not anyHeight
 
         # sort keys
-        keys.sort(key=lambda k: (strToList(k)[0] * strToList(k)[1] * strToList(k)[2]))
+        keys.sort(key=lambda k: (unpackKey(k)[0] * unpackKey(k)[1] * unpackKey(k)[2]))
+        availableKeys = set(keys)
 
         for key in keys:
             # skip keys already merged to another brick
             if bricksDict[key]["parent"] not in (None, "self"):
                 continue
             # attempt to merge current brick with other bricks in keys, according to available brick types
-            brickSize,_ = attemptMerge(bricksDict, key, keys, bricksDict[key]["size"], cm.zStep, randState, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, mergeInternalsV, materialType, mergeInconsistentMats=mergeInconsistentMats, preferLargest=True, mergeVertical=mergeVertical, targetType=targetType, height3Only=height3Only)
+            brickSize,_ = attemptMerge(bricksDict, key, availableKeys, bricksDict[key]["size"], cm.zStep, randState, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, mergeInternalsV, materialType, mergeInconsistentMats=mergeInconsistentMats, preferLargest=True, mergeVertical=mergeVertical, targetType=targetType, height3Only=height3Only)
             updatedKeys.append(key)
         return updatedKeys
 
@@ -67,7 +67,7 @@ class BRICKER_OT_set_exposure(Operator):
             for cm_id in self.objNamesD.keys():
                 cm = getItemByID(scn.cmlist, cm_id)
                 self.undo_stack.iterateStates(cm)
-                bricksDict = json.loads(self.cached_bfm[cm_id])
+                bricksDict = loadBricksDictCache(self.cached_bfm[cm_id])
                 keysToUpdate = []
                 cm.customized = True
                 zStep = cm.zStep
@@ -112,7 +112,7 @@ class BRICKER_OT_set_exposure(Operator):
         self.objNamesD, self.bricksDicts = createObjNamesAndBricksDictsDs(selected_objects)
         # push to undo stack
         self.undo_stack = UndoStack.get_instance()
-        self.cached_bfm = self.undo_stack.undo_push('exposure', affected_ids=list(self.objNamesD.keys()))
+        self.cached_bfm = self.undo_stack.undo_push('exposure', affected_ids=list(self.objNamesD.keys()), return_cache=True)
 
     ###################################################
     # class variables
@@ -126,7 +126,7 @@ class BRICKER_OT_split_bricks(Operator):
             self.undo_stack.matchPythonToBlenderState()
             # push to undo stack
             if self.orig_undo_stack_length == self.undo_stack.getLength():
-                self.cached_bfm = self.undo_stack.undo_push('split', affected_ids=list(self.objNamesD.keys()))
+                self.cached_bfm = self.undo_stack.undo_push('split', affected_ids=list(self.objNamesD.keys()), return_cache=True)
             # initialize vars
             scn = bpy.context.scene
             objsToSelect = []
@@ -134,7 +134,7 @@ class BRICKER_OT_split_bricks(Operator):
             for cm_id in self.objNamesD.keys():
                 cm = getItemByID(scn.cmlist, cm_id)
                 self.undo_stack.iterateStates(cm)
-                bricksDict = json.loads(self.cached_bfm[cm_id]) if deepCopyMatrix else self.bricksDicts[cm_id]
+                bricksDict = loadBricksDictCache(self.cached_bfm[cm_id]) if deepCopyMatrix else self.bricksDicts[cm_id]
                 keysToUpdate = set()
                 cm.customized = True
 
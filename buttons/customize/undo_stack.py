@@ -16,7 +16,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # System imports
-# NONE!
+import copy
+import json
 
 # Blender imports
 import bpy
@@ -24,6 +25,8 @@ import bpy
 # Addon imports
 from ...functions import *
 from ...lib.caches import bricker_bfm_cache
+from ...lib.bricksDict.columns import BricksDict
+from ...lib.bricksDict.frame_cache import FrameFiles
 
 python_undo_state = {}
 
@@ -55,6 +58,10 @@ class UndoStack():
         assert hasattr(UndoStack, 'creating'), 'Do not create new UndoStack directly!  Use UndoStack.new()'
         self.undo = []  # undo stack of causing actions, FSM state, tool states, and rftargets
         self.redo = []  # redo stack of causing actions, FSM state, tool states, and rftargets
+        # store changed bricksDict entries in undo states rather than full bricksDicts
+        prefs = get_addon_preferences()
+        self.use_deltas = prefs is None or prefs.undoMode == "DELTA"
+        self.shadows = {}  # copies of bricksDicts for each model when changes were last recorded
 
     ###################################################
     # class variables
@@ -86,41 +93,61 @@ class UndoStack():
 
     def isUpdating(self): return bpy.props.bricker_updating_undo_state
 
-    def _create_state(self, action, bfm_cache):
-        return {
+    def _create_state(self, action, bfm_cache, deltas=None):
+        state = {
             'action':       action,
-            'bfm_cache':    bfm_cache
+            'bfm_cache':    bfm_cache,
+            'deltas':       deltas,
             }
+        state['size'] = self._get_state_size(state)
+        return state
+
+    def _get_state_size(self, state):
+        """ returns approximate size of undo state in bytes """
+        if state['deltas'] is not None:
+            return sum(len(before or "") + len(after or "") for delta in state['deltas'].values() for before, after in delta.values())
+        return sum(len(cache) for cache in state['bfm_cache'].values() if type(cache) is str)
 
     def _restore_state(self, state):
         global bricker_bfm_cache
         for key in state['bfm_cache'].keys():
-            bricker_bfm_cache[key] = json.loads(state['bfm_cache'][key])
+            cache = state['bfm_cache'][key]
+            bricker_bfm_cache[key] = cache if isinstance(cache, FrameFiles) else loadBricksDictCache(cache)
 
-    def appendState(self, action, stackType, affected_ids="ALL"):
+    def appendState(self, action, stackType, affected_ids="ALL", return_cache=False):
         global bricker_bfm_cache
         stack = getattr(self, stackType)
+        if self.use_deltas:
+            # record changes since last state, then start new state with no changes
+            self._sync_deltas(affected_ids)
+            stack.append(self._create_state(action, {}, deltas={}))
+            # only serialize full bricksDicts for tools that reload them
+            if not return_cache:
+                return None
+            return {cm_id:json.dumps(shadow, default=dict) for cm_id, shadow in self.shadows.items() if affected_ids == "ALL" or cm_id in affected_ids}
         bfm_cached = stack[-1]["bfm_cache"] if len(stack) > 0 else {}
         # perform append state in active Blender session
         new_bfm_cache = {}
         for cm_id in bricker_bfm_cache:
             if affected_ids != "ALL" and cm_id not in affected_ids and cm_id in bfm_cached:
                 new_bfm_cache[cm_id] = bfm_cached[cm_id]
+            elif isinstance(bricker_bfm_cache[cm_id], FrameFiles):
+                # frame files aren't modified by customization tools, so don't load them to copy
+                new_bfm_cache[cm_id] = bricker_bfm_cache[cm_id]
             else:
-                new_bfm_cache[cm_id] = json.dumps(bricker_bfm_cache[cm_id])
+                new_bfm_cache[cm_id] = json.dumps(bricker_bfm_cache[cm_id], default=dict)
         stack.append(self._create_state(action, new_bfm_cache))
         return new_bfm_cache
 
-    def undo_push(self, action, affected_ids="ALL", repeatable=False):
+    def undo_push(self, action, affected_ids="ALL", repeatable=False, return_cache=False):
         # skip pushing to undo if action is repeatable and we are repeating actions
         if repeatable and self.undo and self.undo[-1]['action'] == action:
             return
         # skip pushing to undo if bricker not initialized
         if not bpy.props.bricker_initialized:
             return
-        new_bfm_cache = self.appendState(action, 'undo', affected_ids=affected_ids)
-        while len(self.undo) > self.undo_depth:
-            self.undo.pop(0)  # limit stack size
+        new_bfm_cache = self.appendState(action, 'undo', affected_ids=affected_ids, return_cache=return_cache)
+        self._limit_stack_size()
         self.redo.clear()
         self.instrument_write(action)
         return new_bfm_cache
@@ -128,8 +155,14 @@ class UndoStack():
     def undo_pop(self):
         if not self.undo:
             return
-        self.appendState('undo', 'redo')
-        self._restore_state(self.undo.pop())
+        if self.use_deltas:
+            self._sync_deltas()
+            state = self.undo.pop()
+            self._apply_deltas(state['deltas'], undo=True)
+            self.redo.append(state)
+        else:
+            self.appendState('undo', 'redo')
+            self._restore_state(self.undo.pop())
         self.instrument_write('undo')
         # iterate undo states
         global python_undo_state
@@ -139,23 +172,147 @@ class UndoStack():
     def undo_pop_clean(self):
         if not self.undo:
             return
-        self.undo.pop()
+        if self.use_deltas:
+            # keep changes of popped state undoable with the previous state
+            self._sync_deltas()
+            state = self.undo.pop()
+            if self.undo:
+                self._merge_deltas(self.undo[-1], state['deltas'])
+        else:
+            self.undo.pop()
 
     def undo_cancel(self):
-        self._restore_state(self.undo.pop())
+        if self.use_deltas:
+            self._sync_deltas()
+            self._apply_deltas(self.undo.pop()['deltas'], undo=True)
+        else:
+            self._restore_state(self.undo.pop())
         self.instrument_write('cancel (undo)')
 
     def redo_pop(self):
         if not self.redo:
             return
-        self.appendState('redo', 'undo')
-        self._restore_state(self.redo.pop())
+        if self.use_deltas:
+            self._sync_deltas()
+            state = self.redo.pop()
+            self._apply_deltas(state['deltas'], undo=False)
+            self.undo.append(state)
+        else:
+            self.appendState('redo', 'undo')
+            self._restore_state(self.redo.pop())
         self.instrument_write('redo')
         # iterate undo states
         global python_undo_state
         scn, cm, _ = getActiveContextInfo()
         python_undo_state[cm.id] += 1
 
+    def _limit_stack_size(self):
+        """ pop oldest undo states until stack fits in 'undo_depth' and the undo memory limit """
+        prefs = get_addon_preferences()
+        budget = prefs.undoMemoryLimit * 1000000 if prefs else 0
+        totalSize = sum(state['size'] for state in self.undo)
+        while len(self.undo) > self.undo_depth or (budget > 0 and totalSize > budget and len(self.undo) > 1):
+            totalSize -= self.undo.pop(0)['size']
+
+    ###################################################
+    # delta undo states
+
+    def _copy_bricksDict(self, bricksDict):
+        """ returns copy of bricksDict (or dict of bricksDicts by frame) to diff later changes against """
+        return bricksDict.copy() if isinstance(bricksDict, BricksDict) else copy.deepcopy(bricksDict)
+
+    def _get_changed_keys(self, bricksDict, shadow):
+        """ returns set of keys whose entries may differ between bricksDict and its shadow """
+        if isinstance(bricksDict, BricksDict) and isinstance(shadow, BricksDict):
+            changedKeys = bricksDict.getChangedKeys(shadow)
+            if changedKeys is not None:
+                return changedKeys
+        # compare entries directly if columns of shadow don't line up with those of the bricksDict
+        return {key for key in bricksDict.keys() | shadow.keys() if key not in bricksDict or key not in shadow or bricksDict[key] != shadow[key]}
+
+    def _serialize_entry(self, bricksDict, key):
+        """ returns JSON string of bricksDict entry (None if it doesn't exist) """
+        return json.dumps(bricksDict[key], default=dict) if key in bricksDict else None
+
+    def _sync_deltas(self, affected_ids="ALL"):
+        """ record changes to bricksDicts since they were last synced in the current undo state """
+        deltas = {}
+        for cm_id in bricker_bfm_cache:
+            if affected_ids != "ALL" and cm_id not in affected_ids:
+                continue
+            bricksDict = bricker_bfm_cache.peek(cm_id)
+            # skip bricksDicts moved to deep cache and frame files (not modified by customization tools)
+            if bricksDict is None or isinstance(bricksDict, FrameFiles):
+                continue
+            shadow = self.shadows.get(cm_id)
+            if shadow is None:
+                self.shadows[cm_id] = self._copy_bricksDict(bricksDict)
+                continue
+            # only serialize entries that changed since last sync
+            changedKeys = self._get_changed_keys(bricksDict, shadow)
+            if len(changedKeys) == 0:
+                continue
+            delta = {}
+            for key in changedKeys:
+                before = self._serialize_entry(shadow, key)
+                after = self._serialize_entry(bricksDict, key)
+                if before != after:
+                    delta[key] = (before, after)
+            if len(delta) > 0:
+                deltas[cm_id] = delta
+            if isinstance(bricksDict, BricksDict) or isinstance(shadow, BricksDict):
+                self.shadows[cm_id] = self._copy_bricksDict(bricksDict)
+            else:
+                for key in changedKeys:
+                    if key in bricksDict:
+                        shadow[key] = copy.deepcopy(bricksDict[key])
+                    else:
+                        shadow.pop(key, None)
+        if len(deltas) > 0 and self.undo:
+            self._merge_deltas(self.undo[-1], deltas)
+
+    def _merge_deltas(self, state, deltas):
+        """ add later changes in 'deltas' to changes of 'state' """
+        for cm_id, delta in deltas.items():
+            stateDelta = state['deltas'].setdefault(cm_id, {})
+            for key, (before, after) in delta.items():
+                before = stateDelta[key][0] if key in stateDelta else before
+                if before == after:
+                    stateDelta.pop(key, None)
+                else:
+                    stateDelta[key] = (before, after)
+        state['size'] = self._get_state_size(state)
+
+    def _apply_delta(self, bricksDict, delta, undo):
+        """ revert (undo=True) or reapply (undo=False) changes in 'delta' to bricksDict """
+        for key, (before, after) in delta.items():
+            entry = before if undo else after
+            if entry is None:
+                bricksDict.pop(key, None)
+            else:
+                bricksDict[key] = json.loads(entry)
+
+    def _apply_deltas(self, deltas, undo):
+        """ revert (undo=True) or reapply (undo=False) changes in 'deltas' to bricksDicts """
+        global bricker_bfm_cache
+        for cm_id, delta in deltas.items():
+            shadow = self.shadows.get(cm_id)
+            bricksDict = bricker_bfm_cache.peek(cm_id)
+            if bricksDict is not None:
+                self._apply_delta(bricksDict, delta, undo)
+                bricker_bfm_cache.updateSize(cm_id)
+            if isinstance(bricksDict, BricksDict):
+                self.shadows[cm_id] = bricksDict.copy()
+            elif shadow is not None:
+                self._apply_delta(shadow, delta, undo)
+                if bricksDict is None:
+                    bricker_bfm_cache[cm_id] = self._copy_bricksDict(shadow)
+        if undo:
+            # restore bricksDicts cleared from cache (but not those moved to deep cache) to their last recorded state
+            for cm_id, shadow in self.shadows.items():
+                if cm_id in bricker_bfm_cache and bricker_bfm_cache.peek(cm_id) is None:
+                    bricker_bfm_cache[cm_id] = self._copy_bricksDict(shadow)
+
     def instrument_write(self, action):
         if True:
             return # disabled for now...
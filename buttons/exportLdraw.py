@@ -80,7 +80,7 @@ class BRICKER_OT_export_ldraw(Operator):
             # get dictionary of keys based on z value
             keysDict = getKeysDict(bricksDict)
             # get sorted keys for random merging
-            seedKeys = sorted(list(bricksDict.keys())) if materialType == "RANDOM" else None
+            seedKeys = sorted(bricksDict.keys(), key=keyToStr) if materialType == "RANDOM" else None
             # iterate through z locations in bricksDict (bottom to top)
             for z in sorted(keysDict.keys()):
                 for key in keysDict[z]:
@@ -88,7 +88,7 @@ class BRICKER_OT_export_ldraw(Operator):
                     if not bricksDict[key]["draw"] or bricksDict[key]["parent"] != "self":
                         continue
                     # initialize brick size and typ
-                    size = bricksDict[key]["size"]
+                    size = list(bricksDict[key]["size"])
                     typ = bricksDict[key]["type"]
                     # get matrix for rotation of brick
                     matrices = [" 0 0 -1 0 1 0  1 0  0",
@@ -141,7 +141,7 @@ class BRICKER_OT_export_ldraw(Operator):
 
     def blendToLdrawUnits(self, cm, bricksDict, zStep, key, idx):
         """ convert location of brick from blender units to ldraw units """
-        size = bricksDict[key]["size"]
+        size = list(bricksDict[key]["size"])
         loc = getBrickCenter(bricksDict, key, zStep)
         dimensions = Bricks.get_dimensions(cm.brickHeight, zStep, cm.gap)
         h = 8 * zStep
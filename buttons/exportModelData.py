@@ -60,7 +60,7 @@ class BRICKER_OT_export_model_data(Operator):
                                 "# Number of %(bType)s:  %(numBs)s" % locals(),
                                 ""]
             # get bricksDict and separate into strings
-            bricksDictStrings = json.dumps(bricksDict).split("}, ")
+            bricksDictStrings = json.dumps(self.getReadableBricksDict(bricksDict)).split("}, ")
             for i,string in enumerate(bricksDictStrings):
                 whitespace = " " if string.startswith("\"") else ""
                 bricksDictStrings[i] = "%(whitespace)s%(string)s}," % locals()
@@ -75,6 +75,17 @@ class BRICKER_OT_export_model_data(Operator):
     #############################################
     # class methods
 
+    def getReadableBricksDict(self, bricksDict):
+        """ returns copy of bricksDict with packed keys written as 'x,y,z' strings """
+        readableDict = {}
+        for key, entry in bricksDict.items():
+            entry = dict(entry)
+            for field in ("parent", "created_from"):
+                if type(entry[field]) is int:
+                    entry[field] = keyToStr(entry[field])
+            readableDict[keyToStr(key)] = entry
+        return readableDict
+
     def writeToFile(self, strings, filePath):
         # write error to log text object
         file = open(filePath, "w")
@@ -105,7 +105,7 @@ class BRICKER_OT_apply_material(bpy.types.Operator):
                 if mat is None: self.report({"WARNING"}, "Specified material doesn't exist")
 
                 for brick in bricks:
-                    if self.action == "CUSTOM" or (self.action == "INTERNAL" and not isOnShell(bricksDict, brick.name.split("__")[-1], zStep=cm.zStep, shellDepth=cm.matShellDepth) and cm.matShellDepth <= cm.lastMatShellDepth):
+                    if self.action == "CUSTOM" or (self.action == "INTERNAL" and not isOnShell(bricksDict, getDictKey(brick.name), zStep=cm.zStep, shellDepth=cm.matShellDepth) and cm.matShellDepth <= cm.lastMatShellDepth):
                         if len(brick.material_slots) == 0:
                             # Assign material to object data
                             brick.data.materials.append(mat)
@@ -116,7 +116,7 @@ class BRICKER_OT_apply_material(bpy.types.Operator):
                         brick.material_slots[0].material = mat
                     # update bricksDict mat_name values for split models
                     if lastSplitModel:
-                        bricksDict[brick.name.split("__")[-1]]["mat_name"] = mat.name
+                        bricksDict[getDictKey(brick.name)]["mat_name"] = mat.name
                 # update bricksDict mat_name values for not split models
                 if self.action == "CUSTOM" and not cm.lastSplitModel:
                     for k in bricksDict.keys():
@@ -141,9 +141,9 @@ class BRICKER_OT_apply_material(bpy.types.Operator):
         randomMatSeed = cm.randomMatSeed
         if cm.lastSplitModel:
             # apply a random material to each brick
-            dictKeys = sorted(list(bricksDict.keys()))
+            dictKeys = sorted(bricksDict.keys(), key=keyToStr)
             for brick in bricks:
-                curKey = brick.name.split("__")[-1]
+                curKey = getDictKey(brick.name)
                 # iterate seed and set random index
                 randS0.seed(randomMatSeed + dictKeys.index(curKey))
                 randIdx = randS0.randint(0, len(brick_mats)) if len(brick_mats) > 1 else 0
@@ -77,14 +77,19 @@ class BRICKER_OT_revert_settings(Operator):
         cm.brickShell = settings[14]
         cm.calculationAxes = settings[15]
         if cm.lastIsSmoke:
-            cm.smokeDensity = settings[16]
-            cm.smokeQuality = settings[17]
-            cm.smokeBrightness = settings[18]
-            cm.smokeSaturation = settings[19]
-            cm.flameColor[0] = settings[20]
-            cm.flameColor[1] = settings[21]
-            cm.flameColor[2] = settings[22]
-            cm.flameIntensity = settings[23]
+            cm.smokeDensity = float(settings[16])
+            cm.smokeQuality = float(settings[17])
+            cm.smokeBrightness = float(settings[18])
+            cm.smokeSaturation = float(settings[19])
+            cm.flameColor[0] = float(settings[20])
+            cm.flameColor[1] = float(settings[21])
+            cm.flameColor[2] = float(settings[22])
+            cm.flameIntensity = float(settings[23])
+        # settings stored by older versions end here, so use defaults matching their behavior
+        newSettings = settings[24 if cm.lastIsSmoke else 16:]
+        cm.rayBackend = newSettings[0] if len(newSettings) > 0 else "OBJECT"
+        cm.voxelizationMode = newSettings[1] if len(newSettings) > 1 else "PER_CELL"
+        cm.queryNearestFaces = str_to_bool(newSettings[2]) if len(newSettings) > 2 else False
         cm.matrixIsDirty = False
 
     ################################################
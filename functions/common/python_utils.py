@@ -152,8 +152,8 @@ def str_to_bool(s:str):
 
 
 def deepcopy(object):
-    """ efficient way to deepcopy json loadable object """
-    jsonObj = json.dumps(object)
+    """ efficient way to deepcopy json loadable object (mappings are copied as dicts) """
+    jsonObj = json.dumps(object, default=dict)
     newObj = json.loads(jsonObj)
     return newObj
 
@@ -19,6 +19,7 @@
 import collections
 import json
 import math
+import sys
 import numpy as np
 import bmesh
 
@@ -187,7 +188,11 @@ def getMatrixSettings(cm=None):
                      round(cm.flameColor[1], 6),
                      round(cm.flameColor[2], 6),
                      round(cm.flameIntensity, 6)] if cm.lastIsSmoke else []
-    return listToStr(regularSettings + smokeSettings)
+    # settings added since the original list go last, so settings stored by older versions keep their positions
+    newSettings = [cm.rayBackend,
+                   cm.voxelizationMode,
+                   cm.queryNearestFaces]
+    return listToStr(regularSettings + smokeSettings + newSettings)
 
 
 def matrixReallyIsDirty(cm, include_lost_matrix=True):
@@ -215,6 +220,66 @@ def strToTuple(string, item_type=int, split_on=","):
     return tuple(strToList(string, item_type, split_on))
 
 
+# bricksDict keys are packed into a single int: (x << 42) | (y << 21) | z, with coordinates offset by 'keyOffset'
+keyBits = 21
+keyMask = (1 << keyBits) - 1
+keyOffset = 1 << (keyBits - 1)
+keyStepX = 1 << (keyBits * 2)
+keyStepY = 1 << keyBits
+keyStepZ = 1
+
+
+def packKey(x:int, y:int, z:int):
+    """ returns packed bricksDict key for lattice location (x, y, z) """
+    return ((x + keyOffset) << (keyBits * 2)) | ((y + keyOffset) << keyBits) | (z + keyOffset)
+
+
+def unpackKey(key:int):
+    """ returns lattice location [x, y, z] of packed bricksDict key """
+    return [(key >> (keyBits * 2)) - keyOffset, ((key >> keyBits) & keyMask) - keyOffset, (key & keyMask) - keyOffset]
+
+
+def keyToStr(key:int):
+    """ returns 'x,y,z' string of packed bricksDict key (used in brick object names) """
+    return listToStr(unpackKey(key))
+
+
+def strToKey(string:str):
+    """ returns packed bricksDict key from 'x,y,z' string """
+    return packKey(*strToList(string))
+
+
+def parseKey(key):
+    """ returns packed bricksDict key from 'x,y,z' string, packed key, or JSON object key of packed key """
+    if type(key) is int:
+        return key
+    return strToKey(key) if "," in key else int(key)
+
+
+def migrateBricksDictKeys(cache):
+    """ converts keys of bricksDict (or dict of bricksDicts by frame) loaded from JSON to packed keys (also migrates 'x,y,z' keys of older caches) """
+    if any(type(v) is dict and "loc" not in v for v in cache.values()):
+        return {frame:migrateBricksDictKeys(bricksDict) for frame, bricksDict in cache.items()}
+    for entry in cache.values():
+        for field in ("parent", "created_from"):
+            if type(entry.get(field)) is str and entry[field] != "self":
+                entry[field] = parseKey(entry[field])
+    return {parseKey(key):entry for key, entry in cache.items()}
+
+
+def loadBricksDictCache(cacheStr:str):
+    """ returns bricksDict (or dict of bricksDicts by frame) stored in JSON string 'cacheStr' """
+    return migrateBricksDictKeys(json.loads(cacheStr))
+
+
+def copyBricksDict(bricksDict):
+    """ returns copy of bricksDict with new entry dictionaries (faster than deepcopy, and preserves packed keys) """
+    if not isinstance(bricksDict, dict):
+        # columnar BricksDict (see 'lib/bricksDict/columns.py') copies its own columns
+        return bricksDict.copy()
+    return {key:{field:(value.copy() if type(value) is list else value) for field, value in entry.items()} for key, entry in bricksDict.items()}
+
+
 def getZStep(cm):
     return 1 if flatBrickType(cm.brickType) else 3
 
@@ -252,15 +317,15 @@ def createdWithNewerVersion(cm):
 
 
 # loc is more efficient than key, but one or the other must be passed
-def getLocsInBrick(bricksDict, size, zStep, loc:list=None, key:str=None):
+def getLocsInBrick(bricksDict, size, zStep, loc:list=None, key:int=None):
     x0, y0, z0 = loc or getDictLoc(bricksDict, key)
     return [[x0 + x, y0 + y, z0 + z] for z in range(0, size[2], zStep) for y in range(size[1]) for x in range(size[0])]
 
 
 # loc is more efficient than key, but one or the other must be passed
-def getKeysInBrick(bricksDict, size, zStep:int, loc:list=None, key:str=None):
-    x0, y0, z0 = loc or getDictLoc(bricksDict, key)
-    return [listToStr((x0 + x, y0 + y, z0 + z)) for z in range(0, size[2], zStep) for y in range(size[1]) for x in range(size[0])]
+def getKeysInBrick(bricksDict, size, zStep:int, loc:list=None, key:int=None):
+    key0 = packKey(*loc) if loc else key
+    return [key0 + x * keyStepX + y * keyStepY + z for z in range(0, size[2], zStep) for y in range(size[1]) for x in range(size[0])]
 
 
 def isOnShell(bricksDict, key, loc=None, zStep=None, shellDepth=1):
@@ -275,15 +340,18 @@ def isOnShell(bricksDict, key, loc=None, zStep=None, shellDepth=1):
 
 
 def getDictKey(name):
-    """ get dict key details of obj """
-    dictKey = name.split("__")[-1]
+    """ get dict key details of obj (None if name doesn't end with a lattice location) """
+    try:
+        dictKey = strToKey(name.split("__")[-1])
+    except (ValueError, TypeError):
+        dictKey = None
     return dictKey
 
 def getDictLoc(bricksDict, key):
     try:
         loc = bricksDict[key]["loc"]
     except KeyError:
-        loc = strToList(key)
+        loc = unpackKey(key)
     return loc
 
 
@@ -353,7 +421,19 @@ def getFlipRot(dir):
 
 
 def legalBrickSize(size, type):
-     return size[:2] in bpy.props.Bricker_legal_brick_sizes[size[2]][type]
+    """ returns True if size [width, depth, height] is legal for brick type 'type' """
+    legal = bpy.props.Bricker_legal_brick_size_tables[size[2]][type]
+    w, d = size[0], size[1]
+    return 0 <= w < len(legal) and 0 <= d < len(legal) and legal[w][d]
+
+
+def canSpawnWorkers():
+    """ returns True if worker processes can be spawned without re-running the main module (which requires bpy) in each worker """
+    if bpy.app.background:
+        return False
+    # spawned processes re-run the main module if it was loaded from a file or module (e.g. a background job script)
+    mainModule = sys.modules.get("__main__")
+    return getattr(mainModule, "__file__", None) is None and getattr(mainModule, "__spec__", None) is None
 
 
 def getExportPath(fn, ext, basePath, frame=-1, subfolder=False):
@@ -18,6 +18,7 @@
 # System imports
 import bmesh
 import math
+import numpy as np
 
 # Blender imports
 import bpy
@@ -27,8 +28,49 @@ from mathutils import Vector
 from .common import *
 
 
+def getLatticeRes(vertDist:Vector, scale:Vector, offset:Vector):
+    """ return shifted lattice offset, half resolution, and number of lattice verts along each axis """
+    # shift offset to ensure lattice surrounds object
+    offset = offset - vec_remainder(offset, vertDist)
+    # calculate res of lattice
+    res = Vector((scale.x / vertDist.x,
+                  scale.y / vertDist.y,
+                  scale.z / vertDist.z))
+    # round up lattice res
+    res = Vector(round_up(round(val), 2) for val in res)
+    h_res = res / 2
+    dims = (int(res.x) + 2, int(res.y) + 2, int(res.z) + 2)
+    return offset, h_res, dims
+
+
+def generateLatticeArray(vertDist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0))):
+    """ return lattice coordinates surrounding object of size 'scale' as (nx, ny, nz, 3) float32 array
+
+    Keyword arguments:
+    vertDist  -- distance between lattice verts in 3D space
+    scale     -- lattice scale in 3D space
+    offset    -- offset lattice center from origin
+
+    """
+
+    offset, h_res, dims = getLatticeRes(vertDist, scale, offset)
+    # populate coord matrix (each coordinate component only depends on the index along its own axis)
+    coordMatrix = np.empty(dims + (3,), dtype=np.float32)
+    for axis in range(3):
+        axisCoords = (np.arange(dims[axis], dtype=np.float32) - np.float32(h_res[axis])) * np.float32(vertDist[axis]) + np.float32(offset[axis])
+        shape = [1, 1, 1]
+        shape[axis] = dims[axis]
+        coordMatrix[..., axis] = axisCoords.reshape(shape)
+    return coordMatrix
+
+
+def getLatticeCoord(coordMatrix, x:int, y:int, z:int):
+    """ return lattice coordinate at (x, y, z) of array from 'generateLatticeArray' as a Vector """
+    return Vector(coordMatrix[x, y, z])
+
+
 def generateLattice(vertDist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0)), visualize:bool=False):
-    """ return lattice coordinate matrix surrounding object of size 'scale'
+    """ return lattice coordinate matrix surrounding object of size 'scale' (nested lists of Vectors)
 
     Keyword arguments:
     vertDist  -- distance between lattice verts in 3D space
@@ -38,19 +80,8 @@ def generateLattice(vertDist:Vector, scale:Vector, offset:Vector=Vector((0, 0, 0
 
     """
 
-    # shift offset to ensure lattice surrounds object
-    offset = offset - vec_remainder(offset, vertDist)
-    # calculate res of lattice
-    res = Vector((scale.x / vertDist.x,
-                  scale.y / vertDist.y,
-                  scale.z / vertDist.z))
-    # round up lattice res
-    res = Vector(round_up(round(val), 2) for val in res)
-    h_res = res / 2
     # populate coord matrix
-    nx, ny, nz = int(res.x) + 2, int(res.y) + 2, int(res.z) + 2
-    create_coord = lambda v: vec_mult(v - h_res, vertDist) + offset
-    coordMatrix = [[[create_coord(Vector((x, y, z))) for z in range(nz)] for y in range(ny)] for x in range(nx)]
+    coordMatrix = [[[Vector(co) for co in col] for col in plane] for plane in generateLatticeArray(vertDist, scale, offset).tolist()]
 
     if visualize:
         # create bmesh
@@ -53,6 +53,7 @@ def makeBricks(source, parent, logo, logo_details, dimensions, bricksDict, actio
     cm.zStep = getZStep(cm)
 
     mergeVertical = (keys != "ALL" and "PLATES" in cm.brickType) or cm.brickType == "BRICKS AND PLATES"
+    reportConnectivity = keys == "ALL"
 
     # get brick collection
     coll_name = coll_name or 'Bricker_%(n)s_bricks' % locals()
@@ -128,7 +129,13 @@ def makeBricks(source, parent, logo, logo_details, dimensions, bricksDict, actio
     availableKeys = []
     bricksCreated = []
     maxBrickHeight = 1 if cm.zStep == 3 else max(legalBricks.keys())
+    # connectivity optimizer merges whole layers, so sample random variations if bricks can merge vertically
+    if mergeType == "CONNECTIVITY" and mergeVertical:
+        mergeType = "RANDOM"
     connectThresh = cm.connectThresh if mergableBrickType(brickType) and mergeType == "RANDOM" else 1
+    # merge whole layers at once if bricks can't merge vertically
+    useLayerMerge = connectThresh == 1 and not mergeVertical and buildIsDirty
+    useParallelMerge = cm.parallelMerge and mergeType != "CONNECTIVITY" and not mergeVertical and buildIsDirty and len(keysDict) > 1 and canSpawnWorkers()
     # set up internal material for this object
     internalMat = None if len(source.data.materials) == 0 else cm.internalMat or bpy.data.materials.get("Bricker_%(n)s_internal" % locals()) or bpy.data.materials.new("Bricker_%(n)s_internal" % locals())
     if internalMat is not None and cm.materialType == "SOURCE" and cm.matShellDepth < cm.shellThickness:
@@ -152,80 +159,93 @@ def makeBricks(source, parent, logo, logo_details, dimensions, bricksDict, actio
     else:
         # initialize progress bar around cursor
         old_percent = updateProgressBars(printStatus, cursorStatus, 0, -1, "Merging")
-        # run merge operations (twice if flat brick type)
-        for timeThrough in range(numIters):
-            # iterate through z locations in bricksDict (bottom to top)
-            for z in sorted(keysDict.keys()):
-                # skip second and third rows on first time through
-                if numIters == 2 and alignBricks:
-                    # initialize lowestZ if not done already
-                    if lowestZ == -0.1:
-                        lowestZ = z
-                    if skipThisRow(timeThrough, lowestZ, z, offsetBrickLayers):
-                        continue
-                # get availableKeys for attemptMerge
-                availableKeysBase = []
-                for ii in range(maxBrickHeight):
-                    if ii + z in keysDict:
-                        availableKeysBase += keysDict[z + ii]
-                # get small duplicate of bricksDict for variations
-                if connectThresh > 1:
-                    bricksDictsBase = {}
-                    for k4 in availableKeysBase:
-                        bricksDictsBase[k4] = bricksDict[k4]
-                    bricksDicts = [deepcopy(bricksDictsBase) for j in range(connectThresh)]
-                    numAlignedEdges = [0 for idx in range(connectThresh)]
-                else:
-                    bricksDicts = [bricksDict]
-                # calculate build variations for current z level
-                for j in range(connectThresh):
-                    availableKeys = availableKeysBase.copy()
-                    numBricks = 0
-                    if mergeType == "RANDOM":
-                        random.seed(mergeSeed + i)
-                        random.shuffle(keysDict[z])
-                    # iterate through keys on current z level
-                    for key in keysDict[z]:
-                        i += 1 / connectThresh
-                        brickD = bricksDicts[j][key]
-                        # skip keys that are already drawn or have attempted merge
-                        if brickD["attempted_merge"] or brickD["parent"] not in (None, "self"):
-                            # remove ignored key if it exists in availableKeys (for attemptMerge)
-                            remove_item(availableKeys, key)
+        # merge layers in worker processes (merge in the active process if workers can't be spawned or fail)
+        mergedInParallel = useParallelMerge and mergeLayersParallel(bricksDict, keysDict, zStep, mergeSeed, connectThresh, getNumMergeProcesses(), brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, mergeType, bricksAndPlates, printStatus=printStatus, cursorStatus=cursorStatus)
+        if not mergedInParallel:
+            # run merge operations (twice if flat brick type)
+            for timeThrough in range(numIters):
+                # iterate through z locations in bricksDict (bottom to top)
+                for z in sorted(keysDict.keys()):
+                    # skip second and third rows on first time through
+                    if numIters == 2 and alignBricks:
+                        # initialize lowestZ if not done already
+                        if lowestZ == -0.1:
+                            lowestZ = z
+                        if skipThisRow(timeThrough, lowestZ, z, offsetBrickLayers):
                             continue
+                    if useLayerMerge and mergeType == "CONNECTIVITY":
+                        optimizeLayer(bricksDict, keysDict[z], keysDict.get(z - 1), zStep, mergeSeed + i, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, cm.connectTimeLimit)
+                        i += len(keysDict[z])
+                        old_percent = updateProgressBars(printStatus, cursorStatus, i / denom, old_percent, "Merging")
+                        continue
+                    elif useLayerMerge:
+                        if mergeType == "RANDOM":
+                            random.seed(mergeSeed + i)
+                            random.shuffle(keysDict[z])
+                        mergeLayer(bricksDict, keysDict[z], zStep, randS1, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, mergeType)
+                        i += len(keysDict[z])
+                        old_percent = updateProgressBars(printStatus, cursorStatus, i / denom, old_percent, "Merging")
+                        continue
+                    # get availableKeys for attemptMerge
+                    availableKeysBase = set()
+                    for ii in range(maxBrickHeight):
+                        if ii + z in keysDict:
+                            availableKeysBase.update(keysDict[z + ii])
+                    # get copy-on-write views of bricksDict for variations
+                    if connectThresh > 1:
+                        bricksDicts = [BricksDictOverlay(bricksDict, availableKeysBase) for j in range(connectThresh)]
+                        numAlignedEdges = [0 for idx in range(connectThresh)]
+                    else:
+                        bricksDicts = [bricksDict]
+                    # calculate build variations for current z level
+                    for j in range(connectThresh):
+                        availableKeys = availableKeysBase.copy()
+                        numBricks = 0
+                        if mergeType == "RANDOM":
+                            random.seed(mergeSeed + i)
+                            random.shuffle(keysDict[z])
+                        elif mergeType == "LARGEST" and buildIsDirty:
+                            keysDict[z] = getLargestFirstOrder(bricksDict, keysDict[z], zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH)
+                        # iterate through keys on current z level
+                        for key in keysDict[z]:
+                            i += 1 / connectThresh
+                            brickD = bricksDicts[j][key]
+                            # skip keys that are already drawn or have attempted merge
+                            if brickD["attempted_merge"] or brickD["parent"] not in (None, "self"):
+                                # remove ignored key if it exists in availableKeys (for attemptMerge)
+                                availableKeys.discard(key)
+                                continue
 
-                        # initialize loc
-                        loc = getDictLoc(bricksDict, key)
+                            # initialize loc
+                            loc = getDictLoc(bricksDict, key)
 
-                        # merge current brick with available adjacent bricks
-                        brickSize, keysInBrick = mergeWithAdjacentBricks(brickD, bricksDicts[j], key, loc, availableKeys, [1, 1, zStep], zStep, randS1, buildIsDirty, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, mergeInternalsV, materialType, mergeVertical=mergeVertical)
-                        brickD["size"] = brickSize
-                        # iterate number aligned edges and bricks if generating multiple variations
-                        if connectThresh > 1:
-                            numAlignedEdges[j] += getNumAlignedEdges(bricksDict, brickSize, key, loc, bricksAndPlates)
-                            numBricks += 1
+                            # merge current brick with available adjacent bricks
+                            brickSize, keysInBrick = mergeWithAdjacentBricks(brickD, bricksDicts[j], key, loc, availableKeys, [1, 1, zStep], zStep, randS1, buildIsDirty, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternalsH, mergeInternalsV, materialType, mergeVertical=mergeVertical, preferLargest=mergeType == "LARGEST")
+                            brickD["size"] = brickSize
+                            # iterate number aligned edges and bricks if generating multiple variations
+                            if connectThresh > 1:
+                                numAlignedEdges[j] += getNumAlignedEdges(bricksDict, brickSize, key, loc, bricksAndPlates)
+                                numBricks += 1
 
-                        # print status to terminal and cursor
-                        cur_percent = (i / denom)
-                        old_percent = updateProgressBars(printStatus, cursorStatus, cur_percent, old_percent, "Merging")
+                            # print status to terminal and cursor
+                            cur_percent = (i / denom)
+                            old_percent = updateProgressBars(printStatus, cursorStatus, cur_percent, old_percent, "Merging")
 
-                        # remove keys in new brick from availableKeys (for attemptMerge)
-                        for k in keysInBrick:
-                            remove_item(availableKeys, k)
+                            # remove keys in new brick from availableKeys (for attemptMerge)
+                            availableKeys.difference_update(keysInBrick)
 
-                    if connectThresh > 1:
-                        # if no aligned edges / bricks found, skip to next z level
-                        if numAlignedEdges[j] == 0:
-                            i += (len(keysDict[z]) * connectThresh - 1) / connectThresh
-                            break
-                        # add double the number of bricks so connectivity threshold is weighted towards larger bricks
-                        numAlignedEdges[j] += numBricks * 2
+                        if connectThresh > 1:
+                            # if no aligned edges / bricks found, skip to next z level
+                            if numAlignedEdges[j] == 0:
+                                i += (len(keysDict[z]) * connectThresh - 1) / connectThresh
+                                break
+                            # add double the number of bricks so connectivity threshold is weighted towards larger bricks
+                            numAlignedEdges[j] += numBricks * 2
 
-                # choose optimal variation from above for current z level
-                if connectThresh > 1:
-                    optimalTest = numAlignedEdges.index(min(numAlignedEdges))
-                    for k3 in bricksDicts[optimalTest]:
-                        bricksDict[k3] = bricksDicts[optimalTest][k3]
+                    # choose optimal variation from above for current z level
+                    if connectThresh > 1:
+                        optimalTest = numAlignedEdges.index(min(numAlignedEdges))
+                        bricksDicts[optimalTest].commit()
 
         # update cm.brickSizesUsed and cm.brickTypesUsed
         for key in keys:
@@ -240,11 +260,15 @@ def makeBricks(source, parent, logo, logo_details, dimensions, bricksDict, actio
         # end 'Merging' progress bar
         updateProgressBars(printStatus, cursorStatus, 1, 0, "Merging", end=True)
 
+    # report connectivity of merged model
+    if reportConnectivity:
+        cm.numAlignedEdges = getNumAlignedEdgesInModel(bricksDict, keysDict)
+
     # begin 'Building' progress bar
     old_percent = updateProgressBars(printStatus, cursorStatus, 0, -1, "Building")
 
     # draw merged bricks
-    seedKeys = sorted(list(bricksDict.keys())) if materialType == "RANDOM" else None
+    seedKeys = sorted(bricksDict.keys(), key=keyToStr) if materialType == "RANDOM" else None
     for z in sorted(keysDict.keys()):
         for k2 in keysDict[z]:
             if bricksDict[k2]["parent"] != "self" or not bricksDict[k2]["draw"]:
@@ -16,8 +16,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # System imports
+import lzma
 import os
 import re
+import struct
+import numpy as np
 
 # Blender imports
 import bpy
@@ -43,23 +46,9 @@ def getCachedFrames(obj, point_cache):
     if not use_disk_cache:
         point_cache.use_disk_cache = True
 
-    # helper functions
-    def cacheName(ob, point_cache):
-        name = point_cache.name
-        if name == "":
-            name = "".join(["%02X" % ord(c) for c in ob.name])
-        return name
-    def cachePath():
-        file_path = bpy.data.filepath
-        path, name = os.path.split(file_path)
-        root, ext = os.path.splitext(name)
-        return path + os.sep + "blendcache_" + root # need an API call for that
-
-
     # get cache paths and pattern vars
-    default_path = cachePath()
-    cache_path = bpy.path.abspath(point_cache.filepath) if point_cache.use_external else default_path
-    name = cacheName(obj, point_cache)
+    cache_path = getCacheDirectory(point_cache)
+    name = getCacheName(obj, point_cache)
     index = "%02i" % point_cache.index
 
     # protect against nonexistent cache
@@ -81,3 +70,258 @@ def getCachedFrames(obj, point_cache):
         point_cache.use_disk_cache = False
 
     return cache_frames
+
+
+def getCacheName(obj, point_cache):
+    """ returns name used for point cache files of 'obj' """
+    name = point_cache.name
+    if name == "":
+        name = "".join(["%02X" % ord(c) for c in obj.name])
+    return name
+
+
+def getCacheDirectory(point_cache):
+    """ returns absolute path to directory containing point cache files """
+    if point_cache.use_external:
+        return bpy.path.abspath(point_cache.filepath)
+    file_path = bpy.data.filepath
+    path, name = os.path.split(file_path)
+    root, ext = os.path.splitext(name)
+    return path + os.sep + "blendcache_" + root # need an API call for that
+
+
+def getCacheFilePath(obj, point_cache, frame, cache_dir=None):
+    """ returns path to point cache file of 'obj' for 'frame' (None if frame is not cached to disk)
+
+    Keyword Arguments:
+        obj         -- object the point cache belongs to
+        point_cache -- point cache of physics modifier on 'obj'
+        frame       -- frame to get cache file for
+        cache_dir   -- directory containing cache files (defaults to current directory of 'point_cache')
+    """
+    cache_dir = cache_dir or getCacheDirectory(point_cache)
+    name = getCacheName(obj, point_cache)
+    file_name = "%(name)s_%(frame)06i_%(index)02i.bphys" % {"name":name, "frame":frame, "index":point_cache.index}
+    file_path = os.path.join(cache_dir, file_name)
+    return file_path if os.path.isfile(file_path) else None
+
+
+# point cache file constants (see 'blenkernel/intern/pointcache.c')
+bphysFileId = b"BPHYSICS"
+ptcacheTypeSmokeDomain = 3
+ptcacheTypeMask = 0x0000FFFF
+bphysDataSmokeLow = 1
+bphysDataSmokeHigh = 2
+smokeCacheVersion = b"1.04"
+smActiveHeat = 1 << 0
+smActiveFire = 1 << 1
+smActiveColors = 1 << 2
+
+
+def readSmokeCacheFile(file_path, highResScale=None):
+    """ returns dictionary of smoke domain channels decoded from '.bphys' point cache file (None if file can't be decoded)
+
+    Keyword Arguments:
+        file_path    -- path to smoke domain point cache file
+        highResScale -- if not None, read high resolution channels (smoke 'amplify' + 1)
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    try:
+        return decodeSmokeCache(data, highResScale)
+    except (struct.error, IndexError, ValueError, lzma.LZMAError):
+        return None
+
+
+def decodeSmokeCache(data, highResScale=None):
+    """ returns dictionary of smoke domain channels decoded from contents of '.bphys' point cache file """
+    # read file header
+    if data[:8] != bphysFileId:
+        return None
+    typeflag, totpoint, data_types = struct.unpack_from("<3I", data, 8)
+    if typeflag & ptcacheTypeMask != ptcacheTypeSmokeDomain or not data_types & (1 << bphysDataSmokeLow):
+        return None
+    offset = 20
+    if data[offset:offset + 4] != smokeCacheVersion:
+        return None
+    cache_fields, active_fields = struct.unpack_from("<2i", data, offset + 4)
+    res = struct.unpack_from("<3i", data, offset + 12)
+    offset += 28
+    numCells = res[0] * res[1] * res[2]
+    # read low resolution channels
+    channels = {}
+    fieldNames = ["shadow", "density"]
+    if cache_fields & smActiveHeat:
+        fieldNames += ["heat", "heat_old"]
+    if cache_fields & smActiveFire:
+        fieldNames += ["flame", "fuel", "react"]
+    if cache_fields & smActiveColors:
+        fieldNames += ["r", "g", "b"]
+    fieldNames += ["vx", "vy", "vz"]
+    for fieldName in fieldNames:
+        channels[fieldName], offset = readCompressedChannel(data, offset, numCells * 4)
+    _, offset = readCompressedChannel(data, offset, numCells)  # obstacles
+    offset += 4 * (1 + 1 + 3 + 3 + 3 + 3 + 3 + 16)  # dt, dx, p0, p1, dp0, shift, obj_shift_f, obmat
+    base_res = struct.unpack_from("<3i", data, offset)
+    res_min = struct.unpack_from("<3i", data, offset + 12)
+    res_max = struct.unpack_from("<3i", data, offset + 24)
+    active_color = struct.unpack_from("<3f", data, offset + 36)
+    offset += 48
+    # read high resolution channels
+    if highResScale is not None:
+        if not data_types & (1 << bphysDataSmokeHigh):
+            return None
+        res = tuple(i * highResScale for i in res)
+        numCells = res[0] * res[1] * res[2]
+        fieldNames = ["density"]
+        if cache_fields & smActiveFire:
+            fieldNames += ["flame", "fuel", "react"]
+        if cache_fields & smActiveColors:
+            fieldNames += ["r", "g", "b"]
+        for fieldName in fieldNames:
+            channels[fieldName], offset = readCompressedChannel(data, offset, numCells * 4)
+    # convert channels to float arrays
+    for fieldName in ("density", "flame", "r", "g", "b"):
+        if fieldName in channels:
+            channels[fieldName] = np.frombuffer(channels[fieldName], dtype="<f4")
+            if len(channels[fieldName]) != numCells:
+                return None
+    density = channels["density"]
+    # get rgba color grid (matches 'color_grid' of smoke domain settings)
+    color = np.zeros((numCells, 4), dtype=np.float32)
+    nonzero = density != 0
+    if cache_fields & smActiveColors:
+        for i, fieldName in enumerate("rgb"):
+            color[nonzero, i] = channels[fieldName][nonzero] / density[nonzero]
+    else:
+        color[nonzero, :3] = active_color
+    color[:, 3] = density
+    return {"res":res,
+            "density":density,
+            "flame":channels.get("flame", np.zeros(numCells, dtype=np.float32)),
+            "color":color.ravel(),
+            "base_res":base_res,
+            "res_min":res_min,
+            "res_max":res_max,
+           }
+
+
+def readCompressedChannel(data, offset, length):
+    """ returns bytes of point cache channel starting at 'offset' and offset following the channel """
+    compressed = data[offset]
+    offset += 1
+    if compressed == 0:
+        return data[offset:offset + length], offset + length
+    size, = struct.unpack_from("<I", data, offset)
+    offset += 4
+    inData = data[offset:offset + size]
+    offset += size
+    if size == 0:
+        return bytes(length), offset
+    if compressed == 1:
+        return decompressLZO(inData), offset
+    elif compressed == 2:
+        propsSize, = struct.unpack_from("<I", data, offset)
+        props = data[offset + 4:offset + 4 + propsSize]
+        return decompressLZMA(inData, props, length), offset + 4 + propsSize
+    raise ValueError("Unknown point cache compression type: %(compressed)s" % locals())
+
+
+def decompressLZMA(data, props, length):
+    """ decompress raw LZMA stream with 5 byte LZMA properties header """
+    d = props[0]
+    lc = d % 9
+    d //= 9
+    filters = [{"id":lzma.FILTER_LZMA1, "lc":lc, "lp":d % 5, "pb":d // 5, "dict_size":struct.unpack_from("<I", props, 1)[0]}]
+    decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=filters)
+    return decompressor.decompress(data, length)
+
+
+def decompressLZO(data):
+    """ decompress LZO1X stream (see 'lzo1x_decompress_safe') """
+    dst = bytearray()
+    ip = 0
+    state = 0
+    # first byte may encode a literal run
+    if data[0] > 17:
+        t = data[0] - 17
+        ip = 1
+        dst += data[ip:ip + t]
+        ip += t
+        state = t if t < 4 else 4
+    while True:
+        t = data[ip]
+        ip += 1
+        if t < 16:
+            if state == 0:
+                # copy long literal run
+                if t == 0:
+                    while data[ip] == 0:
+                        t += 255
+                        ip += 1
+                    t += 15 + data[ip]
+                    ip += 1
+                t += 3
+                dst += data[ip:ip + t]
+                ip += t
+                state = 4
+                continue
+            nextT = t & 3
+            if state != 4:
+                # copy 2 byte match
+                mPos = len(dst) - 1 - (t >> 2) - (data[ip] << 2)
+                t = 2
+            else:
+                # copy 3 byte match
+                mPos = len(dst) - 0x801 - (t >> 2) - (data[ip] << 2)
+                t = 3
+            ip += 1
+        elif t >= 64:
+            nextT = t & 3
+            mPos = len(dst) - 1 - ((t >> 2) & 7) - (data[ip] << 3)
+            ip += 1
+            t = (t >> 5) + 1
+        elif t >= 32:
+            t &= 31
+            if t == 0:
+                while data[ip] == 0:
+                    t += 255
+                    ip += 1
+                t += 31 + data[ip]
+                ip += 1
+            t += 2
+            nextT = data[ip] | (data[ip + 1] << 8)
+            ip += 2
+            mPos = len(dst) - 1 - (nextT >> 2)
+            nextT &= 3
+        else:
+            mPos = len(dst) - ((t & 8) << 11)
+            t &= 7
+            if t == 0:
+                while data[ip] == 0:
+                    t += 255
+                    ip += 1
+                t += 7 + data[ip]
+                ip += 1
+            t += 2
+            nextT = data[ip] | (data[ip + 1] << 8)
+            ip += 2
+            mPos -= nextT >> 2
+            nextT &= 3
+            # end of stream marker
+            if mPos == len(dst):
+                break
+            mPos -= 0x4000
+        if mPos < 0:
+            raise ValueError("Invalid LZO match distance")
+        # copy match (may overlap output)
+        dist = len(dst) - mPos
+        if t <= dist:
+            dst += dst[mPos:mPos + t]
+        else:
+            dst += (dst[mPos:] * (t // dist + 1))[:t]
+        # copy trailing literals
+        state = nextT
+        dst += data[ip:ip + nextT]
+        ip += nextT
+    return bytes(dst)
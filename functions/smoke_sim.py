@@ -17,13 +17,23 @@
 
 # System imports
 import time
+import numpy as np
 
 # Addon imports
 from .common import *
 from .general import *
+from .point_cache import readSmokeCacheFile
+from ..lib.caches import bricker_smoke_cache
 
 # code adapted from https://github.com/bwrsandman/blender-addons/blob/master/render_povray/render.py
-def getSmokeInfo(smoke_obj):
+def getSmokeInfo(smoke_obj, cache_key=None, cache_file=None):
+    """ returns smoke channel grids, resolution info, and active region of adaptive domain (if read from 'cache_file')
+
+    Keyword Arguments:
+        smoke_obj  -- smoke domain object
+        cache_key  -- key for reusing smoke grid arrays across frames
+        cache_file -- '.bphys' point cache file to read smoke channels from instead of current simulation state
+    """
     smoke_data = None
     # Search smoke domain target for smoke modifiers
     for mod in smoke_obj.modifiers:
@@ -32,19 +42,61 @@ def getSmokeInfo(smoke_obj):
             break
 
     if smoke_data is not None:
-        # get channel data
-        density_grid = tuple(smoke_data.density_grid)
-        flame_grid = tuple(smoke_data.flame_grid)
-        color_grid = tuple(smoke_data.color_grid)
-        # get resolution
-        domain_res = getAdjustedRes(smoke_data, tuple(smoke_data.domain_resolution))
         adapt = smoke_data.use_adaptive_domain
+        adapt_range = None
+        cache_info = readSmokeCacheFile(cache_file, highResScale=smoke_data.amplify + 1 if smoke_data.use_high_resolution else None) if cache_file else None
+        if cache_info is not None:
+            # get resolution and channel data from point cache file
+            domain_res = cache_info["res"]
+            density_grid, flame_grid, color_grid = cache_info["density"], cache_info["flame"], cache_info["color"]
+            if adapt:
+                base_res = cache_info["base_res"]
+                adapt_range = (Vector([min(max(cache_info["res_min"][i] / base_res[i], 0), 1) for i in range(3)]),
+                               Vector([min(max(cache_info["res_max"][i] / base_res[i], 0), 1) for i in range(3)]))
+        else:
+            # get resolution
+            domain_res = getAdjustedRes(smoke_data, tuple(smoke_data.domain_resolution))
+            # get channel data
+            density_grid, flame_grid, color_grid = getSmokeGrids(smoke_data, domain_res, cache_key)
         max_res_i = smoke_data.resolution_max
         max_res = Vector(domain_res) * (max_res_i / max(domain_res))
         max_res = getAdjustedRes(smoke_data, max_res)
-        return density_grid, flame_grid, color_grid, domain_res, max_res, adapt
+        return density_grid, flame_grid, color_grid, domain_res, max_res, adapt, adapt_range
     else:
-        return [None]*6
+        return [None]*7
+
+
+def getSmokeGrids(smoke_data, domain_res, cache_key=None):
+    """ returns density, flame, and color grids of smoke domain as float32 arrays
+
+    Keyword Arguments:
+        smoke_data -- domain settings of the smoke modifier
+        domain_res -- adjusted resolution of the smoke domain
+        cache_key  -- if not None, arrays are reused for subsequent calls with this key and resolution (returned arrays are overwritten on the next call)
+    """
+    grids = (smoke_data.density_grid, smoke_data.flame_grid, smoke_data.color_grid)
+    lengths = tuple(len(grid) for grid in grids)
+    res_key = tuple(domain_res)
+    arrays = bricker_smoke_cache.get(cache_key, {}).get(res_key) if cache_key is not None else None
+    if arrays is None or tuple(len(arr) for arr in arrays) != lengths:
+        arrays = tuple(np.empty(length, dtype=np.float32) for length in lengths)
+        if cache_key is not None:
+            # only keep arrays for the most recent resolution (adaptive domains change resolution every frame)
+            bricker_smoke_cache[cache_key] = {res_key: arrays}
+    for grid, arr in zip(grids, arrays):
+        readSmokeGrid(grid, arr)
+    return arrays
+
+
+def readSmokeGrid(grid, arr):
+    """ copy values of smoke 'grid' into preallocated float32 array 'arr' """
+    if len(arr) == 0:
+        return
+    try:
+        grid.foreach_get(arr)
+    except (AttributeError, TypeError):
+        # 'foreach_get' not available for property arrays in older versions of Blender
+        arr[:] = grid
 
 
 def getAdjustedRes(smoke_data, smoke_res):
@@ -0,0 +1,69 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for decoding smoke domain point cache ('.bphys') files
+
+The files in 'point_cache_fixtures' hold one frame of a 4x3x2 smoke domain with colors each,
+cached without compression (frame 1), with LZO (frame 2), and with LZMA (frame 3).
+'smoke_grids.json' holds the 'density_grid' and 'color_grid' values of each frame.
+
+Usage (from Blender's python, with Bricker enabled):
+    blender -b --python-expr "import pytest; pytest.main(['<path to Bricker>/functions/test_point_cache.py'])"
+"""
+
+# System imports
+import json
+import os
+import numpy as np
+import pytest
+
+# Addon imports
+from .point_cache import decodeSmokeCache, readSmokeCacheFile
+
+fixturesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "point_cache_fixtures")
+
+
+def getExpectedGrids():
+    with open(os.path.join(fixturesDir, "smoke_grids.json")) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("fileName", ["smoke_000001_00.bphys", "smoke_000002_00.bphys", "smoke_000003_00.bphys"])
+def test_decode_smoke_cache(fileName):
+    expected = getExpectedGrids()
+    with open(os.path.join(fixturesDir, fileName), "rb") as f:
+        data = f.read()
+    cacheInfo = decodeSmokeCache(data)
+    assert cacheInfo is not None
+    assert list(cacheInfo["res"]) == expected["res"]
+    assert np.allclose(cacheInfo["density"], expected["frames"][fileName]["density_grid"], atol=1e-6)
+    assert np.allclose(cacheInfo["color"], expected["frames"][fileName]["color_grid"], atol=1e-6)
+    assert not cacheInfo["flame"].any()
+
+
+def test_read_smoke_cache_file(tmp_path):
+    filePath = os.path.join(fixturesDir, "smoke_000002_00.bphys")
+    assert readSmokeCacheFile(filePath) is not None
+    # high resolution channels weren't cached
+    assert readSmokeCacheFile(filePath, highResScale=2) is None
+    # truncated files can't be decoded
+    with open(filePath, "rb") as f:
+        data = f.read()
+    truncatedPath = str(tmp_path / "smoke_000002_00.bphys")
+    with open(truncatedPath, "wb") as f:
+        f.write(data[:len(data) // 2])
+    assert readSmokeCacheFile(truncatedPath) is None
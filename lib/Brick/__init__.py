@@ -34,6 +34,7 @@ class Bricks:
     @staticmethod
     def new_mesh(dimensions:list, brickType:str, size:list=[1,1,3], type:str="BRICK", flip:bool=False, rotate90:bool=False, loopCut:bool=False, logo=False, logoType="NONE", logoScale=1, logoInset=None, all_vars=False, logo_details=None, undersideDetail:str="FLAT", stud:bool=True, circleVerts:int=16):
         """ create unlinked Brick at origin """
+        size = list(size)
         # create brick mesh
         if type in ("BRICK", "PLATE") or "CUSTOM" in type:
             brickBM = makeStandardBrick(dimensions, size, type, brickType, loopCut, circleVerts=circleVerts, detail=undersideDetail, stud=stud)
@@ -94,7 +95,7 @@ class Bricks:
         # set up unspecified paramaters
         loc = loc or getDictLoc(bricksDict, key)
         # initialize vars
-        size = bricksDict[key]["size"]
+        size = list(bricksDict[key]["size"])
         newSize = [1, 1, size[2]]
         if flatBrickType(brickType):
             if not v:
@@ -161,6 +161,24 @@ def getLegalBrickSizes():
     return legalBrickSizes
 
 
+def getLegalBrickSizeTables():
+    """ returns lookup tables of legal brick sizes by height and type
+
+    Each [height][type] holds a tuple of tuples indexed by [width][depth] up to the largest
+    legal dimension of the type, True where the size is legal (in either orientation).
+    """
+    legalBrickSizeTables = {}
+    for heightKey, types in getLegalBrickSizes().items():
+        legalBrickSizeTables[heightKey] = {}
+        for typ, sizes in types.items():
+            maxDim = max(max(size) for size in sizes)
+            legal = [[False] * (maxDim + 1) for w in range(maxDim + 1)]
+            for w, d in sizes:
+                legal[w][d] = True
+            legalBrickSizeTables[heightKey][typ] = tuple(map(tuple, legal))
+    return legalBrickSizeTables
+
+
 def getLegalBricks():
     """ returns a list of legal brick sizes and part numbers """
     return legalBricks
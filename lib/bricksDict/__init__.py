@@ -22,7 +22,11 @@
 # NONE!
 
 # Addon imports
+from .columns import *
 from .generate import *
 from .modify import *
 from .functions import *
+from .overlay import *
+from .merge_layer import *
+from .serialize import *
 from .storage import *
@@ -0,0 +1,444 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+from collections.abc import MutableMapping
+import numpy as np
+
+# Blender imports
+# NONE!
+
+# Addon imports
+from ...functions.general import keyToStr
+
+
+# fields of each bricksDict entry (see 'createBricksDictEntry')
+bricksDictFields = ("name", "loc", "val", "draw", "co", "near_face", "near_intersection", "near_normal", "rgba", "mat_name", "custom_mat_name", "parent", "size", "attempted_merge", "top_exposed", "bot_exposed", "obscures", "type", "flipped", "rotated", "created_from")
+
+# typed columns of BricksDict -> (dtype, item shape, fill value for new rows)
+bricksDictColumns = {
+    "val":(np.float64, (), 0),
+    "loc":(np.int32, (3,), 0),
+    "co":(np.float64, (3,), 0),
+    "near_face":(np.int32, (), -1),
+    "near_intersection":(np.float64, (3,), np.nan),
+    "near_normal":(np.int16, (), -1),
+    "rgba":(np.float64, (4,), np.nan),
+    "mat_name":(np.int16, (), 0),
+    "parent":(np.int32, (), -1),
+    "size":(np.int16, (3,), -1),
+    "top_exposed":(np.int8, (), -1),
+    "bot_exposed":(np.int8, (), -1),
+    "obscures":(np.uint8, (), 0),
+    "type":(np.int16, (), -1),
+    "created_from":(np.int32, (), -1),
+    "flags":(np.uint8, (), 0),
+}
+
+# bits of the 'flags' column
+bricksDictFlags = {"draw":1 << 0, "custom_mat_name":1 << 1, "attempted_merge":1 << 2, "flipped":1 << 3, "rotated":1 << 4}
+intValFlag = 1 << 5
+
+# codes for 'parent' and 'created_from' columns
+noKeyRow = -1
+selfKeyRow = -2
+
+
+class UnencodableValue(Exception):
+    """ value can't be stored in typed column (stored in BricksDict.extra instead) """
+    pass
+
+
+class BricksDict(MutableMapping):
+    """ struct-of-arrays store of bricksDict entries with a dict-compatible interface
+
+    Each entry field is kept in a typed NumPy column (see 'bricksDictColumns'), rows
+    are indexed by the packed key of the lattice location (see 'packKey'). Indexing returns a
+    BricksDictEntry view of the row; sequence values are returned as tuples, so
+    assign whole values to modify them (e.g. 'bricksDict[key]["size"] = size').
+    """
+
+    def __init__(self, namePrefix=None, capacity=0):
+        self.namePrefix = namePrefix
+        self.keyRows = {}
+        self.deletedRows = {}
+        self.rowKeys = []
+        self.strings = [""]
+        self.stringIdxs = {"": 0}
+        self.extra = {}
+        self.numRows = 0
+        self.columns = {}
+        for col, (dtype, shape, fill) in bricksDictColumns.items():
+            self.columns[col] = np.full((capacity,) + shape, fill, dtype=dtype)
+
+    ################################################
+    # dict interface
+
+    def __getitem__(self, key):
+        return BricksDictEntry(self, self.keyRows[key])
+
+    def __setitem__(self, key, entry):
+        row = self.keyRows.get(key)
+        if row is None:
+            row = self.deletedRows.pop(key, None)
+            if row is None:
+                row = self.newRow(key)
+            self.keyRows[key] = row
+        elif isinstance(entry, BricksDictEntry) and entry.bricksDict is self and entry.row == row:
+            return
+        entry = dict(entry)
+        self.extra.pop(row, None)
+        for field in bricksDictFields:
+            self.setValue(row, field, entry.pop(field, None))
+        # store any additional fields verbatim
+        for field, value in entry.items():
+            self.setValue(row, field, value)
+
+    def __delitem__(self, key):
+        self.deletedRows[key] = self.keyRows.pop(key)
+
+    def __iter__(self):
+        return iter(self.keyRows)
+
+    def __len__(self):
+        return len(self.keyRows)
+
+    def __contains__(self, key):
+        return key in self.keyRows
+
+    def keys(self):
+        return self.keyRows.keys()
+
+    def toDict(self):
+        """ returns copy of BricksDict as dictionary of entry dictionaries """
+        return {key:dict(BricksDictEntry(self, row)) for key, row in self.keyRows.items()}
+
+    @classmethod
+    def fromDict(cls, bricksDict):
+        """ returns new BricksDict with copies of entries in 'bricksDict' """
+        newBricksDict = cls(capacity=len(bricksDict))
+        # allocate rows for all keys first so 'parent' and 'created_from' keys can be encoded as rows
+        newBricksDict.addRows(list(bricksDict.keys()))
+        for key, entry in bricksDict.items():
+            newBricksDict[key] = entry
+        return newBricksDict
+
+    def copy(self):
+        """ returns copy of BricksDict with its own columns """
+        newBricksDict = BricksDict(self.namePrefix)
+        newBricksDict.keyRows = self.keyRows.copy()
+        newBricksDict.deletedRows = self.deletedRows.copy()
+        newBricksDict.rowKeys = self.rowKeys.copy()
+        newBricksDict.strings = self.strings.copy()
+        newBricksDict.stringIdxs = self.stringIdxs.copy()
+        newBricksDict.extra = {row:fields.copy() for row, fields in self.extra.items()}
+        newBricksDict.numRows = self.numRows
+        newBricksDict.columns = {col:values[:self.numRows].copy() for col, values in self.columns.items()}
+        return newBricksDict
+
+    def getChangedKeys(self, orig):
+        """ returns set of keys added, deleted or modified since 'orig' was copied from this BricksDict (None if 'orig' wasn't) """
+        numOrig = orig.numRows
+        # rows and strings are only ever appended, so rows of 'orig' must still hold the same keys
+        if self.namePrefix != orig.namePrefix or self.numRows < numOrig or self.rowKeys[:numOrig] != orig.rowKeys or self.strings[:len(orig.strings)] != orig.strings:
+            return None
+        changed = np.zeros(numOrig, dtype=bool)
+        for col, origValues in orig.columns.items():
+            values = self.columns[col][:numOrig]
+            diff = values != origValues[:numOrig]
+            if values.dtype.kind == "f":
+                diff &= ~(np.isnan(values) & np.isnan(origValues[:numOrig]))
+            changed |= diff.any(axis=1) if diff.ndim > 1 else diff
+        if self.extra != orig.extra:
+            for row in self.extra.keys() | orig.extra.keys():
+                if row < numOrig and self.extra.get(row) != orig.extra.get(row):
+                    changed[row] = True
+        rowKeys = self.rowKeys
+        changedKeys = {rowKeys[row] for row in np.flatnonzero(changed).tolist()}
+        changedKeys.update(rowKeys[numOrig:self.numRows])
+        # keys of earlier rows deleted or restored since 'orig' was copied
+        changedKeys.update(self.deletedRows.keys() ^ orig.deletedRows.keys())
+        return changedKeys
+
+    ################################################
+    # column access
+
+    def newRow(self, key):
+        """ allocates new row for 'key' """
+        row = self.numRows
+        self.reserve(row + 1)
+        self.rowKeys.append(key)
+        self.numRows += 1
+        return row
+
+    def rowIdx(self, key):
+        """ returns row allocated for 'key' (None if not allocated) """
+        row = self.keyRows.get(key)
+        return self.deletedRows.get(key) if row is None else row
+
+    def reserve(self, capacity):
+        """ grow columns to hold at least 'capacity' rows """
+        curCapacity = len(self.columns["val"])
+        if capacity <= curCapacity:
+            return
+        capacity = max(capacity, curCapacity * 2, 16)
+        for col, (dtype, shape, fill) in bricksDictColumns.items():
+            newCol = np.full((capacity,) + shape, fill, dtype=dtype)
+            newCol[:self.numRows] = self.columns[col][:self.numRows]
+            self.columns[col] = newCol
+
+    def column(self, col):
+        """ returns typed column for all allocated rows (including rows of deleted keys) """
+        return self.columns[col][:self.numRows]
+
+    def rows(self, keys):
+        """ returns array of rows for 'keys' """
+        keyRows = self.keyRows
+        return np.array([keyRows[key] for key in keys], dtype=np.int64)
+
+    def getStringIdx(self, string):
+        idx = self.stringIdxs.get(string)
+        if idx is None:
+            idx = len(self.strings)
+            if idx > np.iinfo(np.int16).max:
+                raise UnencodableValue()
+            self.strings.append(string)
+            self.stringIdxs[string] = idx
+        return idx
+
+    def getKeyRow(self, key):
+        if key is None:
+            return noKeyRow
+        elif key == "self":
+            return selfKeyRow
+        row = self.rowIdx(key)
+        if row is None:
+            raise UnencodableValue()
+        return row
+
+    def getValue(self, row, field):
+        """ returns decoded value of 'field' for 'row' """
+        extra = self.extra.get(row)
+        if extra is not None and field in extra:
+            return extra[field]
+        cols = self.columns
+        if field in bricksDictFlags:
+            return bool(cols["flags"][row] & bricksDictFlags[field])
+        elif field == "val":
+            val = float(cols["val"][row])
+            return int(val) if cols["flags"][row] & intValFlag else val
+        elif field in ("loc", "size"):
+            value = cols[field][row]
+            return None if value[0] == -1 and field == "size" else tuple(value.tolist())
+        elif field in ("co", "near_intersection"):
+            value = cols[field][row]
+            return None if np.isnan(value[0]) else tuple(value.tolist())
+        elif field == "rgba":
+            value = cols["rgba"][row]
+            return None if np.isnan(value[0]) else tuple(value.tolist())
+        elif field == "near_face":
+            value = int(cols["near_face"][row])
+            return None if value == -1 else value
+        elif field in ("near_normal", "mat_name", "type"):
+            idx = int(cols[field][row])
+            return None if idx == -1 else self.strings[idx]
+        elif field in ("parent", "created_from"):
+            keyRow = int(cols[field][row])
+            return None if keyRow == noKeyRow else ("self" if keyRow == selfKeyRow else self.rowKeys[keyRow])
+        elif field in ("top_exposed", "bot_exposed"):
+            value = int(cols[field][row])
+            return None if value == -1 else bool(value)
+        elif field == "obscures":
+            mask = int(cols["obscures"][row])
+            return tuple(bool(mask & (1 << i)) for i in range(6))
+        elif field == "name":
+            return None if self.namePrefix is None else self.namePrefix + keyToStr(self.rowKeys[row])
+        raise KeyError(field)
+
+    def setValue(self, row, field, value):
+        """ encode 'value' of 'field' into typed column for 'row' """
+        extra = self.extra.get(row)
+        if extra is not None:
+            extra.pop(field, None)
+        try:
+            self.encodeValue(row, field, value)
+        except (UnencodableValue, TypeError, ValueError, OverflowError):
+            self.extra.setdefault(row, {})[field] = value
+
+    def encodeValue(self, row, field, value):
+        cols = self.columns
+        if field in bricksDictFlags:
+            if type(value) not in (bool, np.bool_) and value is not None:
+                raise UnencodableValue()
+            flags = int(cols["flags"][row])
+            cols["flags"][row] = (flags | bricksDictFlags[field]) if value else (flags & ~bricksDictFlags[field])
+        elif field == "val":
+            if not isinstance(value, (int, float)) or type(value) is bool:
+                raise UnencodableValue()
+            cols["val"][row] = value
+            flags = int(cols["flags"][row])
+            cols["flags"][row] = (flags | intValFlag) if type(value) is int else (flags & ~intValFlag)
+        elif field in ("loc", "size"):
+            if value is None and field == "size":
+                cols["size"][row] = -1
+            elif len(value) != 3 or not all(type(v) is int for v in value) or (field == "size" and min(value) < 0):
+                raise UnencodableValue()
+            else:
+                cols[field][row] = value
+        elif field in ("co", "near_intersection", "rgba"):
+            if value is None and field != "co":
+                cols[field][row] = np.nan
+            elif len(value) != len(cols[field][row]) or not all(isinstance(v, (int, float)) and type(v) is not bool for v in value):
+                raise UnencodableValue()
+            else:
+                cols[field][row] = value
+        elif field == "near_face":
+            if value is not None and type(value) is not int:
+                raise UnencodableValue()
+            cols["near_face"][row] = -1 if value is None else value
+        elif field in ("near_normal", "mat_name", "type"):
+            if value is not None and type(value) is not str:
+                raise UnencodableValue()
+            cols[field][row] = -1 if value is None else self.getStringIdx(value)
+        elif field in ("parent", "created_from"):
+            cols[field][row] = self.getKeyRow(value)
+        elif field in ("top_exposed", "bot_exposed"):
+            if value is not None and type(value) is not bool:
+                raise UnencodableValue()
+            cols[field][row] = -1 if value is None else int(value)
+        elif field == "obscures":
+            if len(value) != 6 or not all(type(v) is bool for v in value):
+                raise UnencodableValue()
+            cols["obscures"][row] = sum(1 << i for i, v in enumerate(value) if v)
+        elif field == "name":
+            key = keyToStr(self.rowKeys[row])
+            if self.namePrefix is None and type(value) is str and value.endswith(key):
+                self.namePrefix = value[:-len(key)]
+            if self.namePrefix is None or value != self.namePrefix + key:
+                raise UnencodableValue()
+        else:
+            raise UnencodableValue()
+
+    def addRows(self, keys, **fields):
+        """ add entries for 'keys' with values from per-field sequences (unspecified fields use 'createBricksDictEntry' defaults)
+
+        Keyword Arguments:
+            keys   -- list of new keys (must not exist in BricksDict)
+            fields -- sequence of values for each new key, by field name
+        """
+        numNew = len(keys)
+        start = self.numRows
+        self.reserve(start + numNew)
+        rows = slice(start, start + numNew)
+        cols = self.columns
+        self.rowKeys += keys
+        self.numRows += numNew
+        self.keyRows.update(zip(keys, range(start, start + numNew)))
+        for field, values in fields.items():
+            if field in bricksDictFlags:
+                cols["flags"][rows] |= np.where(np.asarray(values, dtype=bool), bricksDictFlags[field], 0).astype(np.uint8)
+            elif field == "val":
+                values = list(values)
+                cols["val"][rows] = values
+                cols["flags"][rows] |= np.array([type(v) is int for v in values], dtype=np.uint8) * np.uint8(intValFlag)
+            elif field in ("loc", "co"):
+                cols[field][rows] = values
+            else:
+                try:
+                    cols[field][rows] = self.encodeValues(field, values)
+                except (UnencodableValue, TypeError, ValueError, OverflowError, KeyError):
+                    for row, value in zip(range(start, start + numNew), values):
+                        self.setValue(row, field, value)
+
+    def setRows(self, rows, **fields):
+        """ set values of existing 'rows' from per-field sequences
+
+        Keyword Arguments:
+            rows   -- array of rows to set (see 'rows')
+            fields -- sequence of values for each row, by field name
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = self.columns
+        if self.extra:
+            for row in rows.tolist():
+                extra = self.extra.get(row)
+                if extra is not None:
+                    for field in fields:
+                        extra.pop(field, None)
+        for field, values in fields.items():
+            try:
+                if field in bricksDictFlags:
+                    flag = np.uint8(bricksDictFlags[field])
+                    flags = cols["flags"][rows]
+                    cols["flags"][rows] = np.where(np.asarray(values, dtype=bool), flags | flag, flags & ~flag)
+                elif field == "size":
+                    sizes = np.asarray(values)
+                    if sizes.dtype.kind != "i" or sizes.shape != (len(rows), 3) or (len(sizes) > 0 and sizes.min() < 0):
+                        raise UnencodableValue()
+                    cols["size"][rows] = sizes
+                elif field in ("parent", "created_from"):
+                    getKeyRow = self.getKeyRow
+                    cols[field][rows] = [getKeyRow(value) for value in values]
+                else:
+                    cols[field][rows] = self.encodeValues(field, values)
+            except (UnencodableValue, TypeError, ValueError, OverflowError, KeyError):
+                for row, value in zip(rows.tolist(), values):
+                    self.setValue(row, field, value)
+
+    def encodeValues(self, field, values):
+        """ returns column values for sequence of 'field' values (raises UnencodableValue if values must be encoded individually) """
+        if field == "near_face":
+            return np.array([-1 if value is None else value for value in values], dtype=np.int64)
+        elif field in ("near_intersection", "rgba"):
+            noneValue = [np.nan] * bricksDictColumns[field][1][0]
+            return np.array([noneValue if value is None else value for value in values], dtype=np.float64)
+        elif field in ("near_normal", "mat_name", "type"):
+            if not all(value is None or type(value) is str for value in values):
+                raise UnencodableValue()
+            getStringIdx = self.getStringIdx
+            return np.array([-1 if value is None else getStringIdx(value) for value in values], dtype=np.int64)
+        raise UnencodableValue()
+
+
+class BricksDictEntry(MutableMapping):
+    """ dict-compatible view of a single BricksDict row """
+
+    def __init__(self, bricksDict, row):
+        self.bricksDict = bricksDict
+        self.row = row
+
+    def __getitem__(self, field):
+        return self.bricksDict.getValue(self.row, field)
+
+    def __setitem__(self, field, value):
+        self.bricksDict.setValue(self.row, field, value)
+
+    def __delitem__(self, field):
+        extra = self.bricksDict.extra.get(self.row)
+        if extra is None or field in bricksDictFields or field not in extra:
+            raise KeyError(field)
+        del extra[field]
+
+    def __iter__(self):
+        extra = self.bricksDict.extra.get(self.row, {})
+        return iter(bricksDictFields + tuple(field for field in extra if field not in bricksDictFields))
+
+    def __len__(self):
+        return len(tuple(iter(self)))
+
+    def __repr__(self):
+        return repr(dict(self))
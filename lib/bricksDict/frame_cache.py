@@ -0,0 +1,195 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+from collections.abc import MutableMapping
+import mmap
+import os
+import shutil
+import weakref
+import numpy as np
+
+# Blender imports
+import bpy
+
+# Addon imports
+from .columns import *
+from .serialize import *
+from ..caches import bricker_frame_cache
+from ...functions.common import temp_path
+
+# prefix of 'cm.BFMCache' for animations cached to frame files (followed by the cache directory)
+frameCacheStrPrefix = "FRAMES:"
+frameFileExt = ".bfmc"
+# memory maps of frame files by path -> (mmap, weak reference to the BricksDict reading its columns from it)
+frameFileMaps = {}
+
+
+def getFrameCacheDirectory(cm):
+    """ returns default directory for frame files of animated model (next to the .blend file if saved) """
+    file_path = bpy.data.filepath
+    if file_path == "":
+        return os.path.join(temp_path(), "brickercache_untitled_%(pid)s" % {"pid":os.getpid()}, str(cm.id))
+    path, name = os.path.split(file_path)
+    root, ext = os.path.splitext(name)
+    return os.path.join(path, "brickercache_" + root, str(cm.id))
+
+
+def readFrameFile(file_path):
+    """ returns BricksDict with columns memory-mapped from frame file (pages are read on access and copied on write) """
+    unmapFrameFile(file_path)
+    with open(file_path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    bricksDict = deserializeBFMCache(data)
+    frameFileMaps[file_path] = (data, weakref.ref(bricksDict))
+    return bricksDict
+
+
+def unmapFrameFile(file_path):
+    """ copy columns of the BricksDict read from frame file into memory and close its memory map (files can't be replaced or removed while mapped on Windows) """
+    mapped = frameFileMaps.pop(file_path, None)
+    if mapped is None:
+        return
+    data, bricksDictRef = mapped
+    bricksDict = bricksDictRef()
+    if bricksDict is not None:
+        bricksDict.columns = {col:np.array(values) for col, values in bricksDict.columns.items()}
+        del bricksDict
+    try:
+        data.close()
+    except BufferError:
+        # arrays still viewing the map keep it open until they are freed
+        pass
+
+
+def unmapFrameFiles(cacheDir):
+    """ close memory maps of all frame files in 'cacheDir' """
+    for file_path in [file_path for file_path in frameFileMaps if os.path.dirname(file_path) == cacheDir]:
+        unmapFrameFile(file_path)
+
+
+def writeFrameFile(file_path, bricksDict):
+    """ write bricksDict to uncompressed frame file (so it can be memory-mapped) """
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(serializeBFMCache(bricksDict, compress=False))
+    unmapFrameFile(file_path)
+    os.replace(tmp_path, file_path)
+
+
+def uncacheFrames(cacheDir):
+    """ remove frames of 'cacheDir' from frame cache """
+    for key in [key for key in bricker_frame_cache if key[0] == cacheDir]:
+        del bricker_frame_cache[key]
+    unmapFrameFiles(cacheDir)
+
+
+class FrameFiles(MutableMapping):
+    """ dict of bricksDicts by frame stored in one file per frame
+
+    Frames are memory-mapped from their files on access and kept in 'bricker_frame_cache'
+    under the 'Frame Cache Memory Limit' preference. Assigned frames are written to disk
+    immediately, so frames can be evicted from memory at any time.
+    """
+
+    def __init__(self, cacheDir):
+        self.cacheDir = cacheDir
+
+    def framePath(self, frame):
+        return os.path.join(self.cacheDir, "frame_%(frame)s%(frameFileExt)s" % {"frame":frame, "frameFileExt":frameFileExt})
+
+    def __getitem__(self, frame):
+        key = (self.cacheDir, str(frame))
+        bricksDict = bricker_frame_cache.get(key)
+        if bricksDict is not None:
+            return bricksDict
+        file_path = self.framePath(frame)
+        if not os.path.isfile(file_path):
+            raise KeyError(frame)
+        bricksDict = readFrameFile(file_path)
+        bricker_frame_cache[key] = bricksDict
+        return bricksDict
+
+    def __setitem__(self, frame, bricksDict):
+        if not isinstance(bricksDict, BricksDict):
+            bricksDict = BricksDict.fromDict(bricksDict)
+        os.makedirs(self.cacheDir, exist_ok=True)
+        writeFrameFile(self.framePath(frame), bricksDict)
+        bricker_frame_cache[(self.cacheDir, str(frame))] = bricksDict
+
+    def __delitem__(self, frame):
+        file_path = self.framePath(frame)
+        if not os.path.isfile(file_path):
+            raise KeyError(frame)
+        bricker_frame_cache.pop((self.cacheDir, str(frame)), None)
+        unmapFrameFile(file_path)
+        os.remove(file_path)
+
+    def __iter__(self):
+        if not os.path.isdir(self.cacheDir):
+            return iter(())
+        frames = [f[6:-len(frameFileExt)] for f in os.listdir(self.cacheDir) if f.startswith("frame_") and f.endswith(frameFileExt)]
+        frames.sort(key=int)
+        return iter(frames)
+
+    def __len__(self):
+        return len(tuple(iter(self)))
+
+    def __contains__(self, frame):
+        return os.path.isfile(self.framePath(frame))
+
+    def __bool__(self):
+        # don't list directory to check if cache exists
+        return True
+
+    def relocate(self, cacheDir):
+        """ copy frame files to 'cacheDir' and use them from there (e.g. when .blend file is saved to new location) """
+        if cacheDir == self.cacheDir:
+            return
+        uncacheFrames(self.cacheDir)
+        if os.path.isdir(self.cacheDir):
+            if os.path.isdir(cacheDir):
+                uncacheFrames(cacheDir)
+                shutil.rmtree(cacheDir)
+            os.makedirs(os.path.dirname(cacheDir), exist_ok=True)
+            shutil.copytree(self.cacheDir, cacheDir)
+        self.cacheDir = cacheDir
+
+    def clear(self):
+        """ remove all frame files """
+        uncacheFrames(self.cacheDir)
+        for frame in tuple(iter(self)):
+            os.remove(self.framePath(frame))
+        try:
+            os.rmdir(self.cacheDir)
+        except OSError:
+            pass
+
+    def toCacheStr(self):
+        """ returns string for storage in 'cm.BFMCache' """
+        return frameCacheStrPrefix + self.cacheDir
+
+
+def getFrameFiles(cm):
+    """ returns FrameFiles referenced by 'cm.BFMCache' (None if BFMCache doesn't reference frame files or they can't be found) """
+    if not cm.BFMCache.startswith(frameCacheStrPrefix):
+        return None
+    # fall back to default directory if .blend file (and its frame cache) was moved
+    for cacheDir in (cm.BFMCache[len(frameCacheStrPrefix):], getFrameCacheDirectory(cm)):
+        if os.path.isdir(cacheDir):
+            return FrameFiles(cacheDir)
+    return None
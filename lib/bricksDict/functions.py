@@ -456,7 +456,7 @@ def isBrickExposed(bricksDict, zStep, key=None, loc=None):
     """ return top and bottom exposure of brick loc/key """
     assert key is not None or loc is not None
     # initialize vars
-    key = key or listToStr(loc)
+    key = key or packKey(*loc)
     loc = loc or getDictLoc(bricksDict, key)
     keysInBrick = getKeysInBrick(bricksDict, bricksDict[key]["size"], zStep, loc=loc)
     topExposed, botExposed = False, False
@@ -471,7 +471,7 @@ def setAllBrickExposures(bricksDict, zStep, key=None, loc=None):
     """ updates top_exposed/bot_exposed for all bricks in bricksDict """
     assert key is not None or loc is not None
     # initialize vars
-    key = key or listToStr(loc)
+    key = key or packKey(*loc)
     loc = loc or getDictLoc(bricksDict, key)
     keysInBrick = getKeysInBrick(bricksDict, bricksDict[key]["size"], zStep, loc=loc)
     topExposed, botExposed = False, False
@@ -488,13 +488,12 @@ def setBrickExposure(bricksDict, key=None, loc=None):
     assert key is not None or loc is not None
     # initialize parameters unspecified
     loc = loc or getDictLoc(bricksDict, key)
-    key = key or listToStr(loc)
+    key = key or packKey(*loc)
     # get size of brick and break conditions
     if key not in bricksDict: return None, None
     # get keys above and below
-    x, y, z = loc
-    keyBelow = listToStr((x, y, z - 1))
-    keyAbove = listToStr((x, y, z + 1))
+    keyBelow = key - keyStepZ
+    keyAbove = key + keyStepZ
     # check if brick top or bottom is exposed
     topExposed = checkExposure(bricksDict, keyAbove, obscuringTypes=getTypesObscuringBelow())
     botExposed = checkExposure(bricksDict, keyBelow, obscuringTypes=getTypesObscuringAbove())
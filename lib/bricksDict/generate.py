@@ -16,24 +16,30 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # System imports
+import os
+import sys
 import bmesh
 import math
 import time
+import multiprocessing
 import numpy as np
 
 # Blender imports
 import bpy
 from bpy.types import Object
 from mathutils import Matrix, Vector
+from mathutils.bvhtree import BVHTree
 
 # Addon imports
 from .functions import *
 from ...functions.common import *
 from ...functions.general import *
-from ...functions.generate_lattice import generateLattice
+from ...functions.generate_lattice import generateLatticeArray, getLatticeCoord
 from ...functions.wrappers import *
 from ...functions.smoke_sim import *
 from ..Brick import Bricks
+from .columns import BricksDict
+from .lattice_masks import *
 
 
 def VectorRound(vec, dec, roundType="ROUND"):
@@ -46,9 +52,76 @@ def VectorRound(vec, dec, roundType="ROUND"):
         lst = [(math.ceil(vec[i] * 10**dec)) / 10**dec for i in range(len(vec))]
     return Vector(lst)
 
-def castRays(obj_eval:Object, point:Vector, direction:Vector, miniDist:float, roundType:str="CEILING", edgeLen:int=0):
+# brickFreqMatrix values are stored as int8 codes (-1: inside, 0: outside, 1: shell, 50-99: internal depth of 0.50-0.99)
+bfmRemoved = np.iinfo(np.int8).min  # code for locations marked for removal (previously None)
+# record of nearest face intersection for each lattice location (idx is -1 if no face was found, queried is True if record came from a nearest face query)
+faceIdxDtype = np.dtype([("idx", np.int32), ("dist", np.float64), ("loc", np.float32, 3), ("normal", np.float32, 3), ("queried", np.bool_)])
+
+def newFaceIdxMatrix(shape:tuple):
+    """ returns empty faceIdxMatrix of 'shape' """
+    faceIdxMatrix = np.zeros(shape, dtype=faceIdxDtype)
+    faceIdxMatrix["idx"] = -1
+    return faceIdxMatrix
+
+def setNearestFace(faceIdxMatrix, x:int, y:int, z:int, idx:int, dist:float, loc, normal):
+    """ set or update nearest face to lattice location (x, y, z) """
+    if faceIdxMatrix["idx"][x, y, z] == -1 or faceIdxMatrix["dist"][x, y, z] > dist:
+        faceIdxMatrix[x, y, z] = (idx, dist, tuple(loc), tuple(normal), False)
+
+def getBFMVal(code:int):
+    """ returns brickFreqMatrix value for int8 'code' (None if location was marked for removal) """
+    if code == bfmRemoved:
+        return None
+    elif -1 <= code <= 1:
+        return int(code)
+    return int(code) / 100
+
+def getBFMCode(val:float):
+    """ returns int8 code for brickFreqMatrix value 'val' """
+    return int(round(val * 100)) if 0 < val < 1 else val
+
+def getEvaluatedObject(obj:Object):
+    """ returns evaluated copy of 'obj' from the active depsgraph (or 'obj' itself in Blender 2.79) """
+    if b280():
+        depsgraph = bpy.context.depsgraph
+        # try:
+        #     depsgraph = obj.users_scene[0].view_layers[0].depsgraph
+        # except Exception as e:
+        #     depsgraph = bpy.context.depsgraph
+        return depsgraph.objects.get(obj.name, None)
+    else:
+        return obj
+
+def getBVHTree(obj:Object):
+    """ returns BVHTree built from the evaluated mesh of 'obj' (in local space, with face indices matching mesh polygons) """
+    mesh = getEvaluatedObject(obj).data
+    verts = [v.co for v in mesh.vertices]
+    polys = [tuple(p.vertices) for p in mesh.polygons]
+    return BVHTree.FromPolygons(verts, polys)
+
+def getRayCaster(obj:Object, rayBackend:str="OBJECT"):
+    """ returns function 'rayCast(orig, direction)' that casts a ray against 'obj' in local space
+
+    the returned function returns (location, normal, index) for the first hit, where index is -1 if nothing was hit
+
+    obj        -- source object to test intersections for
+    rayBackend -- 'OBJECT' to cast rays with Object.ray_cast, 'BVH' to build one BVHTree and reuse it for every ray
+    """
+    if rayBackend == "BVH":
+        bvh = getBVHTree(obj)
+        def rayCast(orig, direction):
+            location, normal, index, _ = bvh.ray_cast(orig, direction)
+            return location, normal, -1 if index is None else index
+    else:
+        obj_eval = getEvaluatedObject(obj)
+        def rayCast(orig, direction):
+            _, location, normal, index = obj_eval.ray_cast(orig, direction)
+            return location, normal, index
+    return rayCast
+
+def castRays(rayCast, point:Vector, direction:Vector, miniDist:float, roundType:str="CEILING", edgeLen:int=0):
     """
-    obj_eval  -- source object to test intersections for
+    rayCast   -- function returned by 'getRayCaster' for the source object
     point     -- origin point for ray casting
     direction -- cast ray in this direction
     miniDist  -- Vector with miniscule amount to add after intersection
@@ -66,7 +139,7 @@ def castRays(obj_eval:Object, point:Vector, direction:Vector, miniDist:float, ro
     intersections = 0
     # cast rays until no more rays to cast
     while True:
-        _,location,normal,index = obj_eval.ray_cast(orig, direction)#distance=edgeLen*1.00000000001)
+        location,normal,index = rayCast(orig, direction)
         if index == -1: break
         if intersections == 0:
             firstDirection = direction.dot(normal)
@@ -92,13 +165,13 @@ def castRays(obj_eval:Object, point:Vector, direction:Vector, miniDist:float, ro
         return intersections, firstDirection
 
 
-def rayObjIntersections(scn, point, direction, miniDist:Vector, edgeLen, obj, useNormals, insidenessRayCastDir, castDoubleCheckRays):
+def rayObjIntersections(scn, point, direction, miniDist:Vector, edgeLen, rayCast, useNormals, insidenessRayCastDir, castDoubleCheckRays):
     """
     cast ray(s) from point in direction to determine insideness and whether edge intersects obj within edgeLen
 
     returned:
-    - not outside       - 'point' is inside object 'obj'
-    - edgeIntersects    - ray from 'point' in 'direction' of length 'edgeLen' intersects object 'obj'
+    - not outside       - 'point' is inside the object cast against by 'rayCast'
+    - edgeIntersects    - ray from 'point' in 'direction' of length 'edgeLen' intersects the object
     - intersections     - number of ray-obj intersections from 'point' in 'direction' to infinity
     - nextIntersection  - second ray intersection from 'point' in 'direction'
     - firstIntersection - dictionary containing 'idx':index of first intersection and 'distance:distance from point to first intersection within edgeLen
@@ -110,26 +183,17 @@ def rayObjIntersections(scn, point, direction, miniDist:Vector, edgeLen, obj, us
     intersections = 0
     noMoreChecks = False
     outsideL = []
-    if b280():
-        depsgraph = bpy.context.depsgraph
-        # try:
-        #     depsgraph = obj.users_scene[0].view_layers[0].depsgraph
-        # except Exception as e:
-        #     depsgraph = bpy.context.depsgraph
-        obj_eval = depsgraph.objects.get(obj.name, None)
-    else:
-        obj_eval = obj
     # set axis of direction
     axes = "XYZ" if direction[0] > 0 else ("YZX" if direction[1] > 0 else "ZXY")
     # run initial intersection check
-    intersections, firstDirection, firstIntersection, nextIntersection, lastIntersection, edgeIntersects = castRays(obj_eval, point, direction, miniDist, edgeLen=edgeLen)
+    intersections, firstDirection, firstIntersection, nextIntersection, lastIntersection, edgeIntersects = castRays(rayCast, point, direction, miniDist, edgeLen=edgeLen)
     if insidenessRayCastDir == "HIGH EFFICIENCY" or axes[0] in insidenessRayCastDir:
         outsideL.append(0)
         if intersections%2 == 0 and not (useNormals and firstDirection > 0):
             outsideL[0] = 1
         elif castDoubleCheckRays:
             # double check vert is inside mesh
-            count, firstDirection = castRays(obj_eval, point, -direction, -miniDist, roundType="FLOOR")
+            count, firstDirection = castRays(rayCast, point, -direction, -miniDist, roundType="FLOOR")
             if count%2 == 0 and not (useNormals and firstDirection > 0):
                 outsideL[0] = 1
 
@@ -145,12 +209,12 @@ def rayObjIntersections(scn, point, direction, miniDist:Vector, edgeLen, obj, us
                 outsideL.append(0)
                 direction = dirs[i][0]
                 miniDist = dirs[i][1]
-                count, firstDirection = castRays(obj_eval, point, direction, miniDist)
+                count, firstDirection = castRays(rayCast, point, direction, miniDist)
                 if count%2 == 0 and not (useNormals and firstDirection > 0):
                     outsideL[len(outsideL) - 1] = 1
                 elif castDoubleCheckRays:
                     # double check vert is inside mesh
-                    count, firstDirection = castRays(obj_eval, point, -direction, -miniDist, roundType="FLOOR")
+                    count, firstDirection = castRays(rayCast, point, -direction, -miniDist, roundType="FLOOR")
                     if count%2 == 0 and not (useNormals and firstDirection > 0):
                         outsideL[len(outsideL) - 1] = 1
 
@@ -160,34 +224,32 @@ def rayObjIntersections(scn, point, direction, miniDist:Vector, edgeLen, obj, us
     # return helpful information
     return not outside, edgeIntersects, intersections, nextIntersection, firstIntersection, lastIntersection
 
-def updateBFMatrix(scn, x0, y0, z0, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, source, x1, y1, z1, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays):
-    """ update brickFreqMatrix[x0][y0][z0] based on results from rayObjIntersections """
-    orig = coordMatrix[x0][y0][z0]
+def updateBFMatrix(scn, x0, y0, z0, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, rayCast, x1, y1, z1, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays):
+    """ update brickFreqMatrix[x0, y0, z0] based on results from rayObjIntersections """
+    orig = getLatticeCoord(coordMatrix, x0, y0, z0)
     try:
-        rayEnd = coordMatrix[x1][y1][z1]
+        rayEnd = getLatticeCoord(coordMatrix, x1, y1, z1)
     except IndexError:
         return -1, None, True
     # check if point can be thrown away
     ray = rayEnd - orig
     edgeLen = ray.length
 
-    origInside, edgeIntersects, intersections, nextIntersection, firstIntersection, lastIntersection = rayObjIntersections(scn, orig, ray, miniDist, edgeLen, source, useNormals, insidenessRayCastDir, castDoubleCheckRays)
-    if origInside and brickFreqMatrix[x0][y0][z0] == 0:
+    origInside, edgeIntersects, intersections, nextIntersection, firstIntersection, lastIntersection = rayObjIntersections(scn, orig, ray, miniDist, edgeLen, rayCast, useNormals, insidenessRayCastDir, castDoubleCheckRays)
+    if origInside and brickFreqMatrix[x0, y0, z0] == 0:
         # define brick as inside shell
-        brickFreqMatrix[x0][y0][z0] = -1
+        brickFreqMatrix[x0, y0, z0] = -1
     if edgeIntersects:
         if (brickShell == "INSIDE" and origInside) or (brickShell == "OUTSIDE" and not origInside) or brickShell == "INSIDE AND OUTSIDE":
             # define brick as part of shell
-            brickFreqMatrix[x0][y0][z0] = 1
+            brickFreqMatrix[x0, y0, z0] = 1
             # set or update nearest face to brick
-            if type(faceIdxMatrix[x0][y0][z0]) != dict or faceIdxMatrix[x0][y0][z0]["dist"] > firstIntersection["dist"]:
-                faceIdxMatrix[x0][y0][z0] = firstIntersection
+            setNearestFace(faceIdxMatrix, x0, y0, z0, **firstIntersection)
         if (brickShell == "INSIDE" and not origInside) or (brickShell == "OUTSIDE" and origInside) or brickShell == "INSIDE AND OUTSIDE":
             # define brick as part of shell
-            brickFreqMatrix[x1][y1][z1] = 1
+            brickFreqMatrix[x1, y1, z1] = 1
             # set or update nearest face to brick
-            if type(faceIdxMatrix[x1][y1][z1]) != dict or faceIdxMatrix[x1][y1][z1]["dist"] > lastIntersection["dist"]:
-                faceIdxMatrix[x1][y1][z1] = lastIntersection
+            setNearestFace(faceIdxMatrix, x1, y1, z1, **lastIntersection)
 
     return intersections, nextIntersection, edgeIntersects
 
@@ -255,29 +317,29 @@ def updateInternal(bricksDict, cm, keys="ALL", clearExisting=False):
 def getBrickMatrix(source, faceIdxMatrix, coordMatrix, brickShell, axes="xyz", printStatus=True, cursorStatus=False):
     """ returns new brickFreqMatrix """
     scn, cm, _ = getActiveContextInfo()
-    brickFreqMatrix = deepcopy(faceIdxMatrix)
+    brickFreqMatrix = np.zeros(faceIdxMatrix.shape, dtype=np.int8)
     axes = axes.lower()
-    dist = coordMatrix[1][1][1] - coordMatrix[0][0][0]
+    dist = getLatticeCoord(coordMatrix, 1, 1, 1) - getLatticeCoord(coordMatrix, 0, 0, 0)
     highEfficiency = cm.insidenessRayCastDir in ("HIGH EFFICIENCY", "XYZ") and not cm.verifyExposure
     # runs update functions only once
     useNormals = cm.useNormals
     insidenessRayCastDir = cm.insidenessRayCastDir
     castDoubleCheckRays = cm.castDoubleCheckRays
+    # get ray casting function for source (builds BVH tree once if necessary)
+    rayCast = getRayCaster(source, cm.rayBackend)
     # initialize Matix sizes
-    xL = len(brickFreqMatrix)
-    yL = len(brickFreqMatrix[0])
-    zL = len(brickFreqMatrix[0][0])
+    xL, yL, zL = brickFreqMatrix.shape
 
 
     # initialize values used for printing status
-    denom = (len(brickFreqMatrix[0][0]) + len(brickFreqMatrix[0]) + len(brickFreqMatrix))/100
+    denom = (zL + yL + xL)/100
     if cursorStatus:
         wm = bpy.context.window_manager
         wm.progress_begin(0, 100)
 
     def printCurStatus(percentStart, num0, denom0, lastPercent):
         # print status to terminal
-        percent = percentStart + (len(brickFreqMatrix)/denom * (num0/(denom0-1))) / 100
+        percent = percentStart + (xL/denom * (num0/(denom0-1))) / 100
         updateProgressBars(printStatus, cursorStatus, percent, 0, "Shell")
         return percent
 
@@ -292,12 +354,12 @@ def getBrickMatrix(source, faceIdxMatrix, coordMatrix, brickShell, axes="xyz", p
                 i = 0
                 for x in range(xL):
                     # skip current loc if casting ray is unnecessary (sets outside vals to last found val)
-                    if i == 2 and highEfficiency and nextIntersection is not None and coordMatrix[x][y][z].x + dist.x + miniDist.x < nextIntersection.x:
-                        brickFreqMatrix[x][y][z] = val
+                    if i == 2 and highEfficiency and nextIntersection is not None and float(coordMatrix[x, y, z, 0]) + dist.x + miniDist.x < nextIntersection.x:
+                        brickFreqMatrix[x, y, z] = val
                         continue
-                    intersections, nextIntersection, edgeIntersects = updateBFMatrix(scn, x, y, z, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, source, x+1, y, z, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays)
+                    intersections, nextIntersection, edgeIntersects = updateBFMatrix(scn, x, y, z, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, rayCast, x+1, y, z, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays)
                     i = 0 if edgeIntersects else (2 if i == 1 else 1)
-                    val = brickFreqMatrix[x][y][z]
+                    val = brickFreqMatrix[x, y, z]
                     if intersections == 0:
                         break
 
@@ -312,14 +374,14 @@ def getBrickMatrix(source, faceIdxMatrix, coordMatrix, brickShell, axes="xyz", p
                 i = 0
                 for y in range(yL):
                     # skip current loc if casting ray is unnecessary (sets outside vals to last found val)
-                    if i == 2 and highEfficiency and nextIntersection is not None and coordMatrix[x][y][z].y + dist.y + miniDist.y < nextIntersection.y:
-                        if brickFreqMatrix[x][y][z] == 0:
-                            brickFreqMatrix[x][y][z] = val
-                        if brickFreqMatrix[x][y][z] == val:
+                    if i == 2 and highEfficiency and nextIntersection is not None and float(coordMatrix[x, y, z, 1]) + dist.y + miniDist.y < nextIntersection.y:
+                        if brickFreqMatrix[x, y, z] == 0:
+                            brickFreqMatrix[x, y, z] = val
+                        if brickFreqMatrix[x, y, z] == val:
                             continue
-                    intersections, nextIntersection, edgeIntersects = updateBFMatrix(scn, x, y, z, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, source, x, y+1, z, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays)
+                    intersections, nextIntersection, edgeIntersects = updateBFMatrix(scn, x, y, z, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, rayCast, x, y+1, z, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays)
                     i = 0 if edgeIntersects else (2 if i == 1 else 1)
-                    val = brickFreqMatrix[x][y][z]
+                    val = brickFreqMatrix[x, y, z]
                     if intersections == 0:
                         break
 
@@ -334,15 +396,15 @@ def getBrickMatrix(source, faceIdxMatrix, coordMatrix, brickShell, axes="xyz", p
                 i = 0
                 for z in range(zL):
                     # skip current loc if casting ray is unnecessary (sets outside vals to last found val)
-                    if i == 2 and highEfficiency and nextIntersection is not None and coordMatrix[x][y][z].z + dist.z + miniDist.z < nextIntersection.z:
-                        if brickFreqMatrix[x][y][z] == 0:
-                            brickFreqMatrix[x][y][z] = val
-                        if brickFreqMatrix[x][y][z] == val:
+                    if i == 2 and highEfficiency and nextIntersection is not None and float(coordMatrix[x, y, z, 2]) + dist.z + miniDist.z < nextIntersection.z:
+                        if brickFreqMatrix[x, y, z] == 0:
+                            brickFreqMatrix[x, y, z] = val
+                        if brickFreqMatrix[x, y, z] == val:
                             continue
                     # cast rays and update brickFreqMatrix
-                    intersections, nextIntersection, edgeIntersects = updateBFMatrix(scn, x, y, z, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, source, x, y, z+1, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays)
+                    intersections, nextIntersection, edgeIntersects = updateBFMatrix(scn, x, y, z, coordMatrix, faceIdxMatrix, brickFreqMatrix, brickShell, rayCast, x, y, z+1, miniDist, useNormals, insidenessRayCastDir, castDoubleCheckRays)
                     i = 0 if edgeIntersects else (2 if i == 1 else 1)
-                    val = brickFreqMatrix[x][y][z]
+                    val = brickFreqMatrix[x, y, z]
                     if intersections == 0:
                         break
 
@@ -355,19 +417,519 @@ def getBrickMatrix(source, faceIdxMatrix, coordMatrix, brickShell, axes="xyz", p
     return brickFreqMatrix
 
 
-def getBrickMatrixSmoke(faceIdxMatrix, brickShell, source_details, printStatus=True, cursorStatus=False):
+def getColumnHits(rayCast, point:Vector, direction:Vector, miniDist:Vector, axis:int):
+    """ cast a single ray walk from 'point' along a full lattice column
+
+    returns list of intersections sorted by distance, each stored as (t, idx, loc, normal, facing)
+    t      -- distance from 'point' to the intersection along 'axis'
+    facing -- direction.dot(normal) (positive if the ray exits the mesh at the intersection)
+    """
+    hits = []
+    orig = point
+    while True:
+        location, normal, index = rayCast(orig, direction)
+        if index == -1: break
+        hits.append((location[axis] - point[axis], index, location, normal, direction.dot(normal)))
+        location = VectorRound(location, 5, roundType="CEILING")
+        orig = location + miniDist
+    return hits
+
+def getColumnOutsideVotes(hits:list, cellTs:list, useNormals:bool, castDoubleCheckRays:bool):
+    """ returns list with a vote for each column cell at distance in 'cellTs' (1: outside, 0: inside) based on parity of 'hits' """
+    votes = [0] * len(cellTs)
+    numHits = len(hits)
+    j = 0
+    for i, t in enumerate(cellTs):
+        # skip intersections behind current cell
+        while j < numHits and hits[j][0] < t:
+            j += 1
+        # check intersections ahead of current cell
+        firstDirection = hits[j][4] if j < numHits else 0
+        if (numHits - j) % 2 == 0 and not (useNormals and firstDirection > 0):
+            votes[i] = 1
+        elif castDoubleCheckRays:
+            # double check with intersections behind current cell
+            firstDirection = -hits[j - 1][4] if j > 0 else 0
+            if j % 2 == 0 and not (useNormals and firstDirection > 0):
+                votes[i] = 1
+    return votes
+
+def getColumnCellDists(coordMatrix, axis:int, u:int, v:int):
+    """ returns list of distances along 'axis' from the first cell of lattice column (u, v) to each of its cells """
+    column = coordMatrix[getColumnSlice(axis, u, v)][:, axis].astype(np.float64)
+    return (column - column[0]).tolist()
+
+def getColumnSlice(axis:int, u:int, v:int):
+    """ returns index into lattice matrices for every cell of lattice column (u, v) along 'axis' """
+    idx = [u, v]
+    idx.insert(axis, slice(None))
+    return tuple(idx)
+
+def getColumnIndex(axis:int, u:int, v:int, i:int):
+    """ returns matrix index of cell 'i' in lattice column (u, v) along 'axis' """
+    idx = [u, v]
+    idx.insert(axis, i)
+    return tuple(idx)
+
+def updateBFMColumn(hits:list, cellTs:list, axis:int, u:int, v:int, insideL:list, faceIdxMatrix, brickFreqMatrix, brickShell:str):
+    """ update brickFreqMatrix values in lattice column (u, v) along 'axis' based on its sorted ray intersections """
+    numHits = len(hits)
+    j = 0
+    for i in range(len(cellTs) - 1):
+        t0 = cellTs[i]
+        edgeLen = cellTs[i + 1] - t0
+        edgeLen2 = edgeLen * 1.00001
+        # skip intersections behind current cell
+        while j < numHits and hits[j][0] < t0:
+            j += 1
+        x0, y0, z0 = getColumnIndex(axis, u, v, i)
+        origInside = insideL[i]
+        if origInside and brickFreqMatrix[x0, y0, z0] == 0:
+            # define brick as inside shell
+            brickFreqMatrix[x0, y0, z0] = -1
+        # get intersections on edge between current cell and next cell
+        k = j
+        while k < numHits and hits[k][0] - t0 <= edgeLen2:
+            k += 1
+        if k > j:
+            t, idx, loc, normal, _ = hits[j]
+            if (brickShell == "INSIDE" and origInside) or (brickShell == "OUTSIDE" and not origInside) or brickShell == "INSIDE AND OUTSIDE":
+                # define brick as part of shell
+                brickFreqMatrix[x0, y0, z0] = 1
+                # set or update nearest face to brick
+                setNearestFace(faceIdxMatrix, x0, y0, z0, idx, t - t0, loc, normal)
+            t, idx, loc, normal, _ = hits[k - 1]
+            if (brickShell == "INSIDE" and not origInside) or (brickShell == "OUTSIDE" and origInside) or brickShell == "INSIDE AND OUTSIDE":
+                x1, y1, z1 = getColumnIndex(axis, u, v, i + 1)
+                # define brick as part of shell
+                brickFreqMatrix[x1, y1, z1] = 1
+                # set or update nearest face to brick
+                setNearestFace(faceIdxMatrix, x1, y1, z1, idx, edgeLen - (t - t0), loc, normal)
+        # no intersections left ahead of current cell
+        if j == numHits:
+            break
+
+def getColumnHitsSerial(rayCast, coordMatrix, castAxes:list, printStatus:bool=True, cursorStatus:bool=False):
+    """ returns dict of sorted ray intersections for each lattice column (u, v) along each axis in 'castAxes' """
+    dims = coordMatrix.shape[:3]
+    # initialize values used for printing status
+    old_percent = 0
+    numColumns = sum(dims[0] * dims[1] * dims[2] // dims[axis] for axis in castAxes)
+    curColumn = 0
+    # cast a single ray walk along each lattice column for every axis
+    columnHits = {}
+    for axis in castAxes:
+        columnHits[axis] = {}
+        u_axis, v_axis = [i for i in range(3) if i != axis]
+        step = [0, 0, 0]
+        step[axis] = 1
+        direction = getLatticeCoord(coordMatrix, *step) - getLatticeCoord(coordMatrix, 0, 0, 0)
+        miniDist = Vector(step) * 0.00015
+        for u in range(dims[u_axis]):
+            # print status to terminal
+            old_percent = updateProgressBars(printStatus, cursorStatus, curColumn / numColumns, old_percent, "Shell")
+            for v in range(dims[v_axis]):
+                point = getLatticeCoord(coordMatrix, *getColumnIndex(axis, u, v, 0))
+                columnHits[axis][(u, v)] = getColumnHits(rayCast, point, direction, miniDist, axis)
+                curColumn += 1
+    return columnHits
+
+def getSourceTriangles(obj:Object):
+    """ returns serialized triangles of evaluated 'obj' mesh as (verts, tris, polyIdxs) """
+    mesh = getEvaluatedObject(obj).data
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    if b280():
+        mesh.calc_loop_triangles()
+        tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        polyIdxs = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", tris)
+        mesh.loop_triangles.foreach_get("polygon_index", polyIdxs)
+    else:
+        tris, polyIdxs = [], []
+        for poly in mesh.polygons:
+            pVerts = poly.vertices
+            for i in range(1, len(pVerts) - 1):
+                tris += [pVerts[0], pVerts[i], pVerts[i + 1]]
+                polyIdxs.append(poly.index)
+        tris = np.array(tris, dtype=np.int32)
+        polyIdxs = np.array(polyIdxs, dtype=np.int32)
+    return verts.reshape(-1, 3), tris.reshape(-1, 3), polyIdxs
+
+def getVoxelizeWorker():
+    """ returns worker module for parallel voxelization (imported as top level module so spawned processes can import it without bpy) """
+    workersDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "workers")
+    if workersDir not in sys.path:
+        sys.path.append(workersDir)
+    import bricker_voxelize_worker
+    return bricker_voxelize_worker
+
+def getNumVoxelizeProcesses():
+    """ returns number of worker processes to use for parallel voxelization """
+    prefs = get_addon_preferences()
+    numProcesses = prefs.voxelizationCores if prefs is not None else 0
+    return numProcesses if numProcesses > 0 else multiprocessing.cpu_count()
+
+# seconds to wait for each result from voxelization worker processes before falling back to the active process
+voxelizeWorkerTimeout = 60
+
+def getColumnHitsParallel(source, coordMatrix, castAxes:list, numProcesses:int, printStatus:bool=True, cursorStatus:bool=False):
+    """ returns dict of sorted ray intersections for each lattice column (u, v) along each axis in 'castAxes', cast in worker processes against serialized source triangles (None if workers fail to return results) """
+    dims = coordMatrix.shape[:3]
+    verts, tris, polyIdxs = getSourceTriangles(source)
+    voxelizeWorker = getVoxelizeWorker()
+    # split lattice columns into bundles sharing the same first non-cast axis coordinate
+    tasks = []
+    for axis in castAxes:
+        u_axis, v_axis = [i for i in range(3) if i != axis]
+        step = [0, 0, 0]
+        step[axis] = 1
+        dirLen = float(coordMatrix[tuple(step)][axis]) - float(coordMatrix[0, 0, 0, axis])
+        for u in range(dims[u_axis]):
+            origins = [coordMatrix[getColumnIndex(axis, u, v, 0)].tolist() for v in range(dims[v_axis])]
+            tasks.append((axis, u, origins, dirLen, 0.00015))
+    # cast column bundles in worker processes
+    ctx = multiprocessing.get_context("spawn")
+    ctx.set_executable(bpy.app.binary_path_python)
+    old_percent = 0
+    columnHits = {axis:dict() for axis in castAxes}
+    try:
+        with ctx.Pool(processes=numProcesses, initializer=voxelizeWorker.initWorker, initargs=(verts, tris, polyIdxs)) as pool:
+            bundles = pool.imap_unordered(voxelizeWorker.castColumnBundle, tasks)
+            for i in range(len(tasks)):
+                # workers that fail to start are replaced indefinitely, so don't wait on them forever
+                axis, u, results = bundles.next(timeout=voxelizeWorkerTimeout)
+                # print status to terminal
+                old_percent = updateProgressBars(printStatus, cursorStatus, i / len(tasks), old_percent, "Shell")
+                # stitch bundle results back into lattice columns
+                for v, hits in enumerate(results):
+                    columnHits[axis][(u, v)] = [(t, idx, Vector(loc), Vector(normal), facing) for t, idx, loc, normal, facing in hits]
+    except (multiprocessing.TimeoutError, OSError):
+        print("[Bricker] Voxelization workers failed to return results; casting rays in the active process")
+        return None
+    return columnHits
+
+def getBrickMatrixScanline(source, faceIdxMatrix, coordMatrix, brickShell, axes="xyz", parallel=False, printStatus=True, cursorStatus=False):
+    """ returns new brickFreqMatrix (casts one ray walk per lattice column rather than one per lattice cell) """
+    scn, cm, _ = getActiveContextInfo()
+    brickFreqMatrix = np.zeros(faceIdxMatrix.shape, dtype=np.int8)
+    axes = axes.lower()
+    # runs update functions only once
+    useNormals = cm.useNormals
+    insidenessRayCastDir = cm.insidenessRayCastDir
+    castDoubleCheckRays = cm.castDoubleCheckRays
+    highEfficiency = insidenessRayCastDir == "HIGH EFFICIENCY"
+    # initialize Matix sizes
+    dims = brickFreqMatrix.shape
+    # get axes for shell calculations and insideness calculations
+    passAxes = [i for i in range(3) if "xyz"[i] in axes]
+    voteAxes = [] if highEfficiency else [i for i in range(3) if "XYZ"[i] in insidenessRayCastDir]
+    castAxes = sorted(set(passAxes + voteAxes))
+
+    # get sorted ray intersections along each lattice column
+    # worker processes can't be spawned safely from background jobs (see 'canSpawnWorkers')
+    numProcesses = getNumVoxelizeProcesses() if parallel and canSpawnWorkers() else 1
+    columnHits = None
+    if numProcesses > 1:
+        columnHits = getColumnHitsParallel(source, coordMatrix, castAxes, numProcesses, printStatus=printStatus, cursorStatus=cursorStatus)
+    if columnHits is None:
+        # get ray casting function for source (builds BVH tree once if necessary)
+        rayCast = getRayCaster(source, cm.rayBackend)
+        columnHits = getColumnHitsSerial(rayCast, coordMatrix, castAxes, printStatus=printStatus, cursorStatus=cursorStatus)
+
+    # get insideness of each cell from votes along 'insidenessRayCastDir' axes
+    if not highEfficiency:
+        outsideVotes = np.zeros(dims, dtype=np.int8)
+        for axis in voteAxes:
+            for (u, v), hits in columnHits[axis].items():
+                cellTs = getColumnCellDists(coordMatrix, axis, u, v)
+                outsideVotes[getColumnSlice(axis, u, v)] += np.array(getColumnOutsideVotes(hits, cellTs, useNormals, castDoubleCheckRays), dtype=np.int8)
+            # free intersections of axis once they're no longer needed
+            if axis not in passAxes:
+                del columnHits[axis]
+
+    # update brickFreqMatrix from intersections along each lattice column
+    for axis in passAxes:
+        for (u, v), hits in columnHits[axis].items():
+            cellTs = getColumnCellDists(coordMatrix, axis, u, v)
+            if highEfficiency:
+                insideL = [vote == 0 for vote in getColumnOutsideVotes(hits, cellTs, useNormals, castDoubleCheckRays)]
+            else:
+                insideL = (outsideVotes[getColumnSlice(axis, u, v)] / len(voteAxes) < 0.5).tolist()
+            updateBFMColumn(hits, cellTs, axis, u, v, insideL, faceIdxMatrix, brickFreqMatrix, brickShell)
+        del columnHits[axis]
+
+    # mark inside freqs as internal (-1) and outside next to outsides for removal
+    adjustBFM(brickFreqMatrix, matShellDepth=cm.matShellDepth, faceIdxMatrix=faceIdxMatrix, axes=axes)
+
+    # print status to terminal
+    updateProgressBars(printStatus, cursorStatus, 1, 0, "Shell", end=True)
+
+    return brickFreqMatrix
+
+
+def getBrickMatrixOctree(source, faceIdxMatrix, coordMatrix, brickShell, printStatus=True, cursorStatus=False):
+    """ returns new brickFreqMatrix (recursively subdivides lattice, only descending into nodes near source geometry) """
+    scn, cm, _ = getActiveContextInfo()
+    brickFreqMatrix = np.zeros(faceIdxMatrix.shape, dtype=np.int8)
+    dims = brickFreqMatrix.shape
+    bvh = getBVHTree(source)
+    halfCell = (coordMatrix[1, 1, 1] - coordMatrix[0, 0, 0]).astype(np.float64) / 2
+    # get serialized source triangles, and triangles of each polygon (for leaf overlap tests)
+    verts, tris, polyIdxs = getSourceTriangles(source)
+    triVerts = verts.astype(np.float64)[tris]
+    normals = getSourceTriangleNormals(triVerts)
+    polyTris = np.argsort(polyIdxs, kind="mergesort")
+    polyTriStarts = np.searchsorted(polyIdxs[polyTris], np.arange(polyIdxs.max() + 2 if len(polyIdxs) > 0 else 1))
+    leafCells = []
+    leafTris = []
+
+    # initialize values used for printing status
+    old_percent = 0
+    numCells = brickFreqMatrix.size
+    doneCells = 0
+
+    # subdivide lattice index ranges, skipping nodes with no source geometry inside their bounding sphere
+    nodes = [((0, 0, 0), dims)]
+    while nodes:
+        mins, maxs = nodes.pop()
+        nodeSize = [maxs[i] - mins[i] for i in range(3)]
+        lo = coordMatrix[mins].astype(np.float64) - halfCell
+        hi = coordMatrix[tuple(m - 1 for m in maxs)].astype(np.float64) + halfCell
+        center = (lo + hi) / 2
+        halfSize = (hi - lo) / 2
+        loc, normal, idx, dist = bvh.find_nearest(Vector(center), np.linalg.norm(halfSize))
+        if nodeSize == [1, 1, 1]:
+            # get triangles of faces within bounding sphere of cell (tested for overlap with the cell below)
+            if loc is not None:
+                cell = np.ravel_multi_index(mins, dims)
+                for _, _, polyIdx, _ in bvh.find_nearest_range(Vector(center), np.linalg.norm(halfSize)):
+                    curTris = polyTris[polyTriStarts[polyIdx]:polyTriStarts[polyIdx + 1]]
+                    leafTris.append(curTris)
+                    leafCells.append(np.full(len(curTris), cell, dtype=np.int64))
+            doneCells += 1
+        elif loc is None:
+            doneCells += nodeSize[0] * nodeSize[1] * nodeSize[2]
+        else:
+            # split node in half along each axis longer than one location
+            splits = [[(mins[i], mins[i] + nodeSize[i] // 2), (mins[i] + nodeSize[i] // 2, maxs[i])] if nodeSize[i] > 1 else [(mins[i], maxs[i])] for i in range(3)]
+            for xs in splits[0]:
+                for ys in splits[1]:
+                    for zs in splits[2]:
+                        nodes.append(((xs[0], ys[0], zs[0]), (xs[1], ys[1], zs[1])))
+            continue
+        # print status to terminal
+        old_percent = updateProgressBars(printStatus, cursorStatus, doneCells / numCells, old_percent, "Shell")
+
+    # define leaf locations overlapped by source triangles as part of shell
+    if len(leafCells) > 0:
+        leafCells = np.concatenate(leafCells)
+        centers = coordMatrix.reshape(-1, 3)[leafCells].astype(np.float64)
+        setOverlappingFaces(np.concatenate(leafTris), leafCells, centers, halfCell, triVerts, normals, polyIdxs, brickFreqMatrix.reshape(-1), faceIdxMatrix.reshape(-1))
+
+    # flood fill outside from lattice boundary (locations not reached from boundary are inside)
+    boundary = np.ones(dims, dtype=bool)
+    boundary[1:-1, 1:-1, 1:-1] = False
+    outside = floodFill(brickFreqMatrix != 1, boundary)
+    brickFreqMatrix[(brickFreqMatrix == 0) & ~outside] = -1
+
+    # only keep shell locations on the side of the source surface defined by 'brickShell'
+    setBrickShellSide(brickFreqMatrix, faceIdxMatrix, coordMatrix, brickShell)
+
+    # mark inside freqs as internal (-1) and outside next to outsides for removal
+    adjustBFM(brickFreqMatrix, matShellDepth=cm.matShellDepth, faceIdxMatrix=faceIdxMatrix, axes="xyz")
+
+    # print status to terminal
+    updateProgressBars(printStatus, cursorStatus, 1, 0, "Shell", end=True)
+
+    return brickFreqMatrix
+
+def setBrickShellSide(brickFreqMatrix, faceIdxMatrix, coordMatrix, brickShell:str):
+    """ reclassify shell locations on the wrong side of their nearest face for 'brickShell' ('INSIDE' or 'OUTSIDE') """
+    if brickShell == "INSIDE AND OUTSIDE":
+        return
+    shellIdxs = np.nonzero(brickFreqMatrix == 1)
+    toCenter = coordMatrix[shellIdxs] - faceIdxMatrix["loc"][shellIdxs]
+    centerInside = np.einsum("ij,ij->i", toCenter, faceIdxMatrix["normal"][shellIdxs]) < 0
+    if brickShell == "INSIDE":
+        wrongSide = tuple(idxs[~centerInside] for idxs in shellIdxs)
+        brickFreqMatrix[wrongSide] = 0
+        # close shell by marking inside locations next to outside locations as shell
+        newShell = (brickFreqMatrix == -1) & getAdjacentMask(brickFreqMatrix == 0)
+    else:
+        wrongSide = tuple(idxs[centerInside] for idxs in shellIdxs)
+        brickFreqMatrix[wrongSide] = -1
+        # close shell by marking outside locations next to inside locations as shell
+        newShell = (brickFreqMatrix == 0) & getAdjacentMask(brickFreqMatrix == -1)
+    brickFreqMatrix[newShell] = 1
+    # inherit nearest face of new shell locations from adjacent locations (can be queried with 'fillNearestFaces')
+    newShellIdxs = np.nonzero(newShell)
+    for axis in range(3):
+        for offset in (1, -1):
+            neighborIdxs = list(newShellIdxs)
+            neighborIdxs[axis] = np.clip(neighborIdxs[axis] + offset, 0, brickFreqMatrix.shape[axis] - 1)
+            neighborIdxs = tuple(neighborIdxs)
+            inherit = (faceIdxMatrix["idx"][newShellIdxs] == -1) & (faceIdxMatrix["idx"][neighborIdxs] != -1)
+            targetIdxs = tuple(idxs[inherit] for idxs in newShellIdxs)
+            faceIdxMatrix[targetIdxs] = faceIdxMatrix[tuple(idxs[inherit] for idxs in neighborIdxs)]
+            faceIdxMatrix["queried"][targetIdxs] = False
+    if brickShell == "INSIDE":
+        faceIdxMatrix["idx"][wrongSide] = -1
+
+def closestPointsOnTriangles(p, a, b, c):
+    """ returns closest point on each triangle (a, b, c) to each point in 'p' """
+    dot = lambda v1, v2: np.einsum("ij,ij->i", v1, v2)
+    ab, ac = b - a, c - a
+    d1, d2 = dot(ab, p - a), dot(ac, p - a)
+    d3, d4 = dot(ab, p - b), dot(ac, p - b)
+    d5, d6 = dot(ab, p - c), dot(ac, p - c)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # get closest point in each voronoi region of triangle (ordered from lowest to highest priority)
+        denom = va + vb + vc
+        regions = [(np.ones(len(p), dtype=bool), a + ab * (vb / denom)[:, None] + ac * (vc / denom)[:, None]),
+                   ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), b + (c - b) * ((d4 - d3) / ((d4 - d3) + (d5 - d6)))[:, None]),
+                   ((vb <= 0) & (d2 >= 0) & (d6 <= 0), a + ac * (d2 / (d2 - d6))[:, None]),
+                   ((d6 >= 0) & (d5 <= d6), c),
+                   ((vc <= 0) & (d1 >= 0) & (d3 <= 0), a + ab * (d1 / (d1 - d3))[:, None]),
+                   ((d3 >= 0) & (d4 <= d3), b),
+                   ((d1 <= 0) & (d2 <= 0), a)]
+    closest = np.empty_like(p)
+    for mask, points in regions:
+        closest[mask] = points[mask]
+    return closest
+
+def getSourceTriangleNormals(triVerts):
+    """ returns unit normals of triangles 'triVerts' """
+    normals = np.cross(triVerts[:, 1] - triVerts[:, 0], triVerts[:, 2] - triVerts[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    normals /= np.where(lengths > 0, lengths, 1)[:, None]
+    return normals
+
+def setOverlappingFaces(pairTris, flatCellIdxs, centers, halfSize, triVerts, normals, polyIdxs, flatBFM, flatFaceIdxMatrix):
+    """ mark lattice locations overlapped by their paired triangle as shell, and set or update their nearest face to the nearest overlapping triangle """
+    # keep pairs where triangle overlaps cell
+    overlap = trianglesOverlapBoxes(triVerts[pairTris, 0], triVerts[pairTris, 1], triVerts[pairTris, 2], centers, halfSize)
+    pairTris, flatCellIdxs, centers = pairTris[overlap], flatCellIdxs[overlap], centers[overlap]
+    if len(pairTris) == 0:
+        return
+    # get nearest overlapping triangle to center of each cell
+    closest = closestPointsOnTriangles(centers, triVerts[pairTris, 0], triVerts[pairTris, 1], triVerts[pairTris, 2])
+    dists = np.linalg.norm(closest - centers, axis=1)
+    order = np.lexsort((dists, flatCellIdxs))
+    firstIdxs = order[np.unique(flatCellIdxs[order], return_index=True)[1]]
+    cells = flatCellIdxs[firstIdxs]
+    # set or update nearest face to each shell location
+    nearer = (flatFaceIdxMatrix["idx"][cells] == -1) | (flatFaceIdxMatrix["dist"][cells] > dists[firstIdxs])
+    cells, firstIdxs = cells[nearer], firstIdxs[nearer]
+    flatBFM[cells] = 1
+    flatFaceIdxMatrix["idx"][cells] = polyIdxs[pairTris[firstIdxs]]
+    flatFaceIdxMatrix["dist"][cells] = dists[firstIdxs]
+    flatFaceIdxMatrix["loc"][cells] = closest[firstIdxs]
+    flatFaceIdxMatrix["normal"][cells] = normals[pairTris[firstIdxs]]
+
+def getBrickMatrixSurface(source, faceIdxMatrix, coordMatrix, brickShell, printStatus=True, cursorStatus=False, maxPairs=2000000):
+    """ returns new brickFreqMatrix (marks lattice cells overlapping source triangles as shell, then flood fills outside) """
+    scn, cm, _ = getActiveContextInfo()
+    brickFreqMatrix = np.zeros(faceIdxMatrix.shape, dtype=np.int8)
+    dims = np.array(brickFreqMatrix.shape)
+    flatBFM = brickFreqMatrix.reshape(-1)
+    flatFaceIdxMatrix = faceIdxMatrix.reshape(-1)
+    flatCoords = coordMatrix.reshape(-1, 3)
+    # get lattice origin and cell size
+    origin = coordMatrix[0, 0, 0].astype(np.float64)
+    spacing = coordMatrix[1, 1, 1].astype(np.float64) - origin
+    halfSize = spacing / 2
+    # get serialized source triangles
+    verts, tris, polyIdxs = getSourceTriangles(source)
+    triVerts = verts.astype(np.float64)[tris]
+    normals = getSourceTriangleNormals(triVerts)
+    # get range of lattice cells overlapping bounding box of each triangle
+    minIdxs = np.clip(np.ceil((triVerts.min(axis=1) - origin) / spacing - 0.5), 0, dims - 1).astype(np.int64)
+    maxIdxs = np.clip(np.floor((triVerts.max(axis=1) - origin) / spacing + 0.5), 0, dims - 1).astype(np.int64)
+    rangeSizes = np.maximum(maxIdxs - minIdxs + 1, 0)
+    numPairs = rangeSizes.prod(axis=1)
+
+    # initialize values used for printing status
+    old_percent = 0
+    numTris = len(tris)
+
+    # test triangles against candidate cells in chunks of at most 'maxPairs' triangle/cell pairs
+    cumPairs = np.cumsum(numPairs)
+    start = 0
+    while start < numTris:
+        end = max(start + 1, np.searchsorted(cumPairs, (cumPairs[start - 1] if start > 0 else 0) + maxPairs, side="right"))
+        # print status to terminal
+        old_percent = updateProgressBars(printStatus, cursorStatus, start / numTris, old_percent, "Shell")
+        # enumerate candidate triangle/cell pairs
+        chunkPairs = numPairs[start:end]
+        pairTris = np.repeat(np.arange(start, end), chunkPairs)
+        localIdxs = np.arange(chunkPairs.sum()) - np.repeat(np.cumsum(chunkPairs) - chunkPairs, chunkPairs)
+        sizes = rangeSizes[pairTris]
+        cellIdxs = minIdxs[pairTris] + np.stack((localIdxs // (sizes[:, 1] * sizes[:, 2]), (localIdxs // sizes[:, 2]) % sizes[:, 1], localIdxs % sizes[:, 2]), axis=1)
+        flatCellIdxs = np.ravel_multi_index(cellIdxs.T, brickFreqMatrix.shape)
+        centers = flatCoords[flatCellIdxs].astype(np.float64)
+        setOverlappingFaces(pairTris, flatCellIdxs, centers, halfSize, triVerts, normals, polyIdxs, flatBFM, flatFaceIdxMatrix)
+        start = end
+
+    # flood fill outside from lattice boundary (locations not reached from boundary are inside)
+    boundary = np.ones(brickFreqMatrix.shape, dtype=bool)
+    boundary[1:-1, 1:-1, 1:-1] = False
+    outside = floodFill(brickFreqMatrix != 1, boundary)
+    brickFreqMatrix[(brickFreqMatrix == 0) & ~outside] = -1
+
+    # only keep shell locations on the side of the source surface defined by 'brickShell'
+    setBrickShellSide(brickFreqMatrix, faceIdxMatrix, coordMatrix, brickShell)
+
+    # mark inside freqs as internal (-1) and outside next to outsides for removal
+    adjustBFM(brickFreqMatrix, matShellDepth=cm.matShellDepth, faceIdxMatrix=faceIdxMatrix, axes="xyz")
+
+    # print status to terminal
+    updateProgressBars(printStatus, cursorStatus, 1, 0, "Shell", end=True)
+
+    return brickFreqMatrix
+
+
+def getSmokeSampleWeights(start:float, end:float, res:int, quality:float):
+    """ returns (numLocations, res) matrix marking smoke voxels sampled for each brick location from 'start' to 'end' along an axis """
+    locs = range(int(start), int(end))
+    weights = np.zeros((len(locs), res))
+    res0 = res / (end - start)
+    for i, loc in enumerate(locs):
+        loc0 = loc - start
+        n = [int(res0 * loc0), int(res0 * (loc0 + 1))]
+        n[1] += 1 if n[1] == n[0] else 0
+        step = math.ceil((n[1] - n[0]) / quality)
+        # only sample voxels within the smoke domain
+        samples = np.arange(n[0], n[1], step)
+        weights[i, samples[(samples >= 0) & (samples < res)]] = 1
+    return weights
+
+def sumSmokeSamples(weights, grid):
+    """ returns sum of sampled values in (x, y, z) smoke 'grid' for each brick location given per axis sample 'weights' """
+    grid = np.tensordot(weights[0], grid, axes=(1, 0))
+    grid = np.tensordot(weights[1], grid, axes=(1, 1))
+    grid = np.tensordot(weights[2], grid, axes=(1, 2))
+    return grid.transpose(2, 1, 0)
+
+def getBrickMatrixSmoke(faceIdxMatrix, brickShell, source_details, printStatus=True, cursorStatus=False, smokeCacheFile=None):
     cm = getActiveContextInfo()[1]
     source = cm.source_obj
-    density_grid, flame_grid, color_grid, domain_res, max_res, adapt = getSmokeInfo(source)
-    brickFreqMatrix = deepcopy(faceIdxMatrix)
-    colorMatrix = deepcopy(faceIdxMatrix)
-    old_percent = 0
+    density_grid, flame_grid, color_grid, domain_res, max_res, adapt, adapt_range = getSmokeInfo(source, cache_key=cm.id, cache_file=smokeCacheFile)
+    brickFreqMatrix = np.zeros(faceIdxMatrix.shape, dtype=np.int8)
+    colorMatrix = np.zeros(faceIdxMatrix.shape + (4,), dtype=np.float64)
     brightness = Vector([(cm.smokeBrightness - 1) / 5]*3)
     sat_mat = getSaturationMatrix(cm.smokeSaturation)
     quality = cm.smokeQuality
 
     # get starting and ending idx
-    if adapt:
+    if adapt_range is not None:
+        start_percent, end_percent = adapt_range
+        s_idx = (faceIdxMatrix.shape[0] * start_percent.x, faceIdxMatrix.shape[1] * start_percent.y, faceIdxMatrix.shape[2] * start_percent.z)
+        e_idx = (faceIdxMatrix.shape[0] * end_percent.x,   faceIdxMatrix.shape[1] * end_percent.y,   faceIdxMatrix.shape[2] * end_percent.z)
+    elif adapt:
         source_details_adapt = bounds(source)
         adapt_min = source_details_adapt.min
         adapt_max = source_details_adapt.max
@@ -378,76 +940,49 @@ def getBrickMatrixSmoke(faceIdxMatrix, brickShell, source_details, printStatus=T
             return brickFreqMatrix, colorMatrix
         start_percent = vec_div(adapt_min - full_min, full_dist)
         end_percent   = vec_div(adapt_max - full_min, full_dist)
-        s_idx = (len(faceIdxMatrix) * start_percent.x, len(faceIdxMatrix[0]) * start_percent.y, len(faceIdxMatrix[0][0]) * start_percent.z)
-        e_idx = (len(faceIdxMatrix) * end_percent.x,   len(faceIdxMatrix[0]) * end_percent.y,   len(faceIdxMatrix[0][0]) * end_percent.z)
+        s_idx = (faceIdxMatrix.shape[0] * start_percent.x, faceIdxMatrix.shape[1] * start_percent.y, faceIdxMatrix.shape[2] * start_percent.z)
+        e_idx = (faceIdxMatrix.shape[0] * end_percent.x,   faceIdxMatrix.shape[1] * end_percent.y,   faceIdxMatrix.shape[2] * end_percent.z)
     else:
         s_idx = (0, 0, 0)
-        e_idx = (len(faceIdxMatrix), len(faceIdxMatrix[0]), len(faceIdxMatrix[0][0]))
+        e_idx = faceIdxMatrix.shape
 
     # get number of iterations from s_idx to e_idx for x, y, z
     d = Vector((e_idx[0] - s_idx[0], e_idx[1] - s_idx[1], e_idx[2] - s_idx[2]))
     # verify bounding box is larger than 0 in all directions
     if 0 in d:
         return brickFreqMatrix, colorMatrix
-    # get x/y/z distances
-    xn0 = domain_res[0] / d.x
-    yn0 = domain_res[1] / d.y
-    zn0 = domain_res[2] / d.z
-    denom = d.x
+    # get smoke voxels sampled for brick locations along each axis
+    weights = [getSmokeSampleWeights(s_idx[i], e_idx[i], domain_res[i], quality) for i in range(3)]
+    numSamples = np.maximum(np.einsum("i,j,k->ijk", *[w.sum(axis=1) for w in weights]), 1)
 
     # initialize variables
     flameIntensity = cm.flameIntensity
-    flameColor = cm.flameColor
+    flameColor = np.array(cm.flameColor)
     smokeDensity = cm.smokeDensity
+    # get smoke grids as (x, y, z) arrays
+    zyxRes = tuple(domain_res)[::-1]
+    density = np.asarray(density_grid, dtype=np.float64).reshape(zyxRes).transpose(2, 1, 0)
+    flame = np.asarray(flame_grid, dtype=np.float64).reshape(zyxRes).transpose(2, 1, 0) if len(flame_grid) > 0 else np.zeros(density.shape)
+    color = np.asarray(color_grid, dtype=np.float64).reshape(zyxRes + (4,)).transpose(2, 1, 0, 3)
+
+    # average density, flame and color over sampled smoke voxels
+    d_ave = sumSmokeSamples(weights, density) / numSamples
+    f_ave = sumSmokeSamples(weights, flame) / numSamples
+    alpha = d_ave + f_ave
+    cs_acc = np.stack([sumSmokeSamples(weights, density * color[..., i]) for i in range(3)], axis=-1)
+    cf_acc = sumSmokeSamples(weights, flame * flameIntensity * flame)[..., None] * flameColor
+    cs_ave = cs_acc / (numSamples * np.where(d_ave != 0, d_ave, 1))[..., None]
+    cf_ave = cf_acc / (numSamples * np.where(f_ave != 0, f_ave, 1))[..., None]
+    c_ave = cs_ave + cf_ave
+    # add brightness
+    c_ave += np.array(brightness)
+    # add saturation
+    c_ave = c_ave @ np.array(sat_mat)
 
     # set up brickFreqMatrix values
-    for x in range(int(s_idx[0]), int(e_idx[0])):
-        # print status to terminal
-        old_percent = updateProgressBars(printStatus, cursorStatus, x / denom, old_percent, "Shell")
-        for y in range(int(s_idx[1]), int(e_idx[1])):
-            for z in range(int(s_idx[2]), int(e_idx[2])):
-                d_acc = 0
-                f_acc = 0
-                cs_acc = Vector((0, 0, 0))
-                cf_acc = Vector((0, 0, 0))
-                # get indices for
-                x0 = x - s_idx[0]
-                y0 = y - s_idx[1]
-                z0 = z - s_idx[2]
-                xn = [int(xn0 * x0), int(xn0 * (x0 + 1))]
-                yn = [int(yn0 * y0), int(yn0 * (y0 + 1))]
-                zn = [int(zn0 * z0), int(zn0 * (z0 + 1))]
-                xn[1] += 1 if xn[1] == xn[0] else 0
-                yn[1] += 1 if yn[1] == yn[0] else 0
-                zn[1] += 1 if zn[1] == zn[0] else 0
-                stepX = math.ceil((xn[1] - xn[0]) / quality)
-                stepY = math.ceil((yn[1] - yn[0]) / quality)
-                stepZ = math.ceil((zn[1] - zn[0]) / quality)
-                ave_denom = 0
-                for x1 in range(xn[0], xn[1], stepX):
-                    for y1 in range(yn[0], yn[1], stepY):
-                        for z1 in range(zn[0], zn[1], stepZ):
-                            cur_idx = (z1 * domain_res[1] + y1) * domain_res[0] + x1
-                            _d = density_grid[cur_idx]
-                            f = flame_grid[cur_idx]
-                            d_acc += _d
-                            f_acc += f
-                            cur_idx_ext = cur_idx * 4
-                            cs_acc += _d * Vector((color_grid[cur_idx_ext], color_grid[cur_idx_ext + 1], color_grid[cur_idx_ext + 2]))
-                            cf_acc += Vector(f * flameIntensity * f * flameColor)
-                            ave_denom += 1
-                d_ave = d_acc / ave_denom
-                f_ave = f_acc / ave_denom
-                alpha = d_ave + f_ave
-                cs_ave = cs_acc / (ave_denom * (d_ave if d_ave != 0 else 1))
-                cf_ave = cf_acc / (ave_denom * (f_ave if f_ave != 0 else 1))
-                c_ave = (cs_ave + cf_ave)
-                # add brightness
-                c_ave += brightness
-                # add saturation
-                c_ave = mathutils_mult(c_ave, sat_mat)
-                brickFreqMatrix[x][y][z] = 0 if alpha < (1 - smokeDensity) else 1
-                colorMatrix[x][y][z] = list(c_ave) + [alpha]
+    idxRange = tuple(slice(int(s_idx[i]), int(e_idx[i])) for i in range(3))
+    brickFreqMatrix[idxRange] = np.where(alpha < (1 - smokeDensity), 0, 1)
+    colorMatrix[idxRange] = np.concatenate((c_ave, alpha[..., None]), axis=-1)
 
     # mark inside freqs as internal (-1) and outside next to outsides for removal
     adjustBFM(brickFreqMatrix, matShellDepth=cm.matShellDepth, axes=False)
@@ -458,33 +993,120 @@ def getBrickMatrixSmoke(faceIdxMatrix, brickShell, source_details, printStatus=T
     return brickFreqMatrix, colorMatrix
 
 
-def adjustBFM(brickFreqMatrix, matShellDepth, faceIdxMatrix=None, axes=""):
-    """ adjust brickFreqMatrix values """
+def adjustBFM(brickFreqMatrix, matShellDepth, faceIdxMatrix=None, axes="", method="ARRAY"):
+    """ adjust brickFreqMatrix values
+
+    Keyword Arguments:
+        brickFreqMatrix -- int8 brickFreqMatrix to adjust in place
+        matShellDepth   -- number of internal layers to inherit the nearest face of the shell
+        faceIdxMatrix   -- faceIdxMatrix to propagate nearest face records through (optional)
+        axes            -- axes used for the shell calculation
+        method          -- 'ARRAY' for shifted-array operations or 'LOOP' for per-location python loops (identical results)
+    """
+    if method == "ARRAY":
+        adjustBFMArray(brickFreqMatrix, matShellDepth, faceIdxMatrix, axes)
+    else:
+        adjustBFMLoop(brickFreqMatrix, matShellDepth, faceIdxMatrix, axes)
+
+
+def adjustBFMArray(brickFreqMatrix, matShellDepth, faceIdxMatrix=None, axes=""):
+    """ adjust brickFreqMatrix values with shifted-array comparisons and a multi-source BFS for internal depths """
+    shape = brickFreqMatrix.shape
+    # neighbor offsets in the order they are checked by 'adjustBFMLoop' (+x, -x, +y, -y, +z, -z)
+    neighborOffsets = ((0, 1), (0, -1), (1, 1), (1, -1), (2, 1), (2, -1))
+    if axes != "xyz":
+        axes = axes or ""
+        # if current location is inside (-1) and adjacent location is out of bounds, current location is shell (1)
+        outside = brickFreqMatrix == 0
+        adjacentToOutside = np.zeros(shape, dtype=bool)
+        for axis in range(3):
+            if "xyz"[axis] in axes:
+                continue
+            boundary = [slice(None)] * 3
+            boundary[axis] = [0, shape[axis] - 1]
+            adjacentToOutside[tuple(boundary)] = True
+            adjacentToOutside |= shiftArray(outside, axis, 1, False) | shiftArray(outside, axis, -1, False)
+        brickFreqMatrix[(brickFreqMatrix == -1) & adjacentToOutside] = 1
+
+    # If shell location (1) does not intersect outside location (0), make it inside (-1)
+    interior = np.zeros(shape, dtype=bool)
+    interior[1:-1, 1:-1, 1:-1] = True
+    shell = (brickFreqMatrix == 1) & interior
+    notOutside = brickFreqMatrix != 0
+    enclosed = np.ones(shape, dtype=bool)
+    for axis, offset in neighborOffsets:
+        enclosed &= shiftArray(notOutside, axis, offset, False)
+    brickFreqMatrix[shell & enclosed] = -1
+    shell &= ~enclosed
+
+    # mark outside and unused inside brickFreqMatrix values for removal
+    brickFreqMatrix[brickFreqMatrix == 0] = bfmRemoved
+
+    # Update internals (multi-source BFS over flat indices; frontier is kept in the discovery order of 'adjustBFMLoop')
+    flatBFM = brickFreqMatrix.reshape(-1)
+    flatFaceIdxMatrix = faceIdxMatrix.reshape(-1) if faceIdxMatrix is not None else None
+    strides = (shape[1] * shape[2], shape[2], 1)
+    frontier = np.flatnonzero(shell)
+    j = 1
+    setNF = True
+    for i in range(50):
+        j = round(j-0.01, 2)
+        if setNF:
+            setNF = (1 - j) * 100 < matShellDepth
+        # get inside (-1) neighbors of frontier locations, keyed by (frontier rank, neighbor offset)
+        frontierCoords = np.unravel_index(frontier, shape)
+        targets = []
+        keys = []
+        for k, (axis, offset) in enumerate(neighborOffsets):
+            neighborCoords = frontierCoords[axis] + offset
+            inBounds = np.flatnonzero((neighborCoords >= 0) & (neighborCoords < shape[axis]))
+            neighbors = frontier[inBounds] + offset * strides[axis]
+            inside = flatBFM[neighbors] == -1
+            targets.append(neighbors[inside])
+            keys.append(inBounds[inside] * 6 + k)
+        targets = np.concatenate(targets)
+        if len(targets) == 0:
+            break
+        keys = np.concatenate(keys)
+        # keep first frontier location to reach each new location
+        order = np.argsort(keys, kind="mergesort")
+        targets = targets[order]
+        keys = keys[order]
+        firstIdxs = np.sort(np.unique(targets, return_index=True)[1])
+        newFrontier = targets[firstIdxs]
+        flatBFM[newFrontier] = getBFMCode(j)
+        # inherit nearest face from frontier location that reached each new location first (not a queried result for the new location)
+        if flatFaceIdxMatrix is not None and setNF:
+            flatFaceIdxMatrix[newFrontier] = flatFaceIdxMatrix[frontier[keys[firstIdxs] // 6]]
+            flatFaceIdxMatrix["queried"][newFrontier] = False
+        frontier = newFrontier
+
+
+def adjustBFMLoop(brickFreqMatrix, matShellDepth, faceIdxMatrix=None, axes=""):
+    """ adjust brickFreqMatrix values with per-location python loops """
     shellVals = []
-    xL = len(brickFreqMatrix)
-    yL = len(brickFreqMatrix[0])
-    zL = len(brickFreqMatrix[0][0])
+    xL, yL, zL = brickFreqMatrix.shape
     if axes != "xyz":
         for x in range(xL):
             for y in range(yL):
                 for z in range(zL):
                     # if current location is inside (-1) and adjacent location is out of bounds, current location is shell (1)
-                    if (brickFreqMatrix[x][y][z] == -1 and
+                    if (brickFreqMatrix[x, y, z] == -1 and
                         (("z" not in axes and
                           (z in (0, zL-1) or
-                           brickFreqMatrix[x][y][z+1] == 0 or
-                           brickFreqMatrix[x][y][z-1] == 0)) or
+                           brickFreqMatrix[x, y, z+1] == 0 or
+                           brickFreqMatrix[x, y, z-1] == 0)) or
                          ("y" not in axes and
                           (y in (0, yL-1) or
-                           brickFreqMatrix[x][y+1][z] == 0 or
-                           brickFreqMatrix[x][y-1][z] == 0)) or
+                           brickFreqMatrix[x, y+1, z] == 0 or
+                           brickFreqMatrix[x, y-1, z] == 0)) or
                          ("x" not in axes and
                           (x in (0, xL-1) or
-                           brickFreqMatrix[x+1][y][z] == 0 or
-                           brickFreqMatrix[x-1][y][z] == 0))
+                           brickFreqMatrix[x+1, y, z] == 0 or
+                           brickFreqMatrix[x-1, y, z] == 0))
                       )):
-                        brickFreqMatrix[x][y][z] = 1
-                        # TODO: set faceIdxMatrix value to nearest shell value using some sort of built in nearest poly to point function
+                        brickFreqMatrix[x, y, z] = 1
+                        # NOTE: faceIdxMatrix value can be set with 'queryNearestFaces' (see 'fillNearestFaces')
 
     # # iterate through all values except boundaries
     # for x in range(1, xL - 1):
@@ -505,23 +1127,19 @@ def adjustBFM(brickFreqMatrix, matShellDepth, faceIdxMatrix=None, axes=""):
         for y in range(1, yL - 1):
             for z in range(1, zL - 1):
                 # If shell location (1) does not intersect outside location (0), make it inside (-1)
-                if brickFreqMatrix[x][y][z] == 1:
-                    if (brickFreqMatrix[x+1][y][z] != 0 and
-                        brickFreqMatrix[x-1][y][z] != 0 and
-                        brickFreqMatrix[x][y+1][z] != 0 and
-                        brickFreqMatrix[x][y-1][z] != 0 and
-                        brickFreqMatrix[x][y][z+1] != 0 and
-                        brickFreqMatrix[x][y][z-1] != 0):
-                        brickFreqMatrix[x][y][z] = -1
+                if brickFreqMatrix[x, y, z] == 1:
+                    if (brickFreqMatrix[x+1, y, z] != 0 and
+                        brickFreqMatrix[x-1, y, z] != 0 and
+                        brickFreqMatrix[x, y+1, z] != 0 and
+                        brickFreqMatrix[x, y-1, z] != 0 and
+                        brickFreqMatrix[x, y, z+1] != 0 and
+                        brickFreqMatrix[x, y, z-1] != 0):
+                        brickFreqMatrix[x, y, z] = -1
                     else:
                         shellVals.append((x, y, z))
 
     # mark outside and unused inside brickFreqMatrix values for removal
-    for x in range(xL):
-        for y in range(yL):
-            for z in range(zL):
-                if brickFreqMatrix[x][y][z] == 0:
-                    brickFreqMatrix[x][y][z] = None
+    brickFreqMatrix[brickFreqMatrix == 0] = bfmRemoved
 
     # Update internals
     j = 1
@@ -544,17 +1162,56 @@ def adjustBFM(brickFreqMatrix, matShellDepth, faceIdxMatrix=None, axes=""):
                 # print(str(idx))
                 # print(str(len(brickFreqMatrix)), str(len(brickFreqMatrix[0])), str(len(brickFreqMatrix[0][0])))
                 # print("*"*25)
-                curVal = brickFreqMatrix[idx[0]][idx[1]][idx[2]]
+                curVal = brickFreqMatrix[idx]
                 if curVal == -1:
                     newShellVals.append(idx)
-                    brickFreqMatrix[idx[0]][idx[1]][idx[2]] = j
-                    if faceIdxMatrix and setNF: faceIdxMatrix[idx[0]][idx[1]][idx[2]] = faceIdxMatrix[x][y][z]
+                    brickFreqMatrix[idx] = getBFMCode(j)
+                    if faceIdxMatrix is not None and setNF:
+                        faceIdxMatrix[idx] = faceIdxMatrix[x, y, z]
+                        faceIdxMatrix["queried"][idx] = False
                     gotOne = True
         if not gotOne:
             break
         shellVals = newShellVals
 
 
+def queryNearestFaces(bvh, faceIdxMatrix, coordMatrix, cells):
+    """ set faceIdxMatrix records of lattice locations in 'cells' to the nearest face in 'bvh' (results are cached in the 'queried' field)
+
+    Keyword Arguments:
+        bvh           -- BVHTree of the source mesh
+        faceIdxMatrix -- faceIdxMatrix to update in place
+        coordMatrix   -- lattice coordinates of faceIdxMatrix locations
+        cells         -- flat indices (or tuple of index arrays) of lattice locations to query
+    """
+    flatFaceIdxMatrix = faceIdxMatrix.reshape(-1)
+    if type(cells) == tuple:
+        cells = np.ravel_multi_index(cells, faceIdxMatrix.shape)
+    # skip lattice locations with cached results
+    cells = cells[~flatFaceIdxMatrix["queried"][cells]]
+    results = [bvh.find_nearest(co) for co in coordMatrix.reshape(-1, 3)[cells].tolist()]
+    found = np.array([result[0] is not None for result in results], dtype=bool)
+    foundResults = [result for result in results if result[0] is not None]
+    foundCells = cells[found]
+    if len(foundCells) > 0:
+        flatFaceIdxMatrix["idx"][foundCells] = [result[2] for result in foundResults]
+        flatFaceIdxMatrix["dist"][foundCells] = [result[3] for result in foundResults]
+        flatFaceIdxMatrix["loc"][foundCells] = [tuple(result[0]) for result in foundResults]
+        flatFaceIdxMatrix["normal"][foundCells] = [tuple(result[1]) for result in foundResults]
+    flatFaceIdxMatrix["idx"][cells[~found]] = -1
+    flatFaceIdxMatrix["queried"][cells] = True
+
+def fillNearestFaces(source, brickFreqMatrix, faceIdxMatrix, coordMatrix, matShellDepth):
+    """ query nearest faces for shell locations without one and internal locations within 'matShellDepth' of the shell """
+    # get internal depth codes within 'matShellDepth' (matches nearest face propagation in 'adjustBFM')
+    isDepthCode = np.zeros(256, dtype=bool)
+    isDepthCode[[code + 128 for code in range(50, 100) if (1 - code / 100) * 100 < matShellDepth]] = True
+    cells = np.flatnonzero(((brickFreqMatrix == 1) & (faceIdxMatrix["idx"] == -1)) | isDepthCode[brickFreqMatrix.astype(np.int16) + 128])
+    if len(cells) == 0:
+        return
+    queryNearestFaces(getBVHTree(source), faceIdxMatrix, coordMatrix, cells)
+
+
 def getThreshold(cm):
     """ returns threshold (draw bricks if returned val >= threshold) """
     return 1.01 - (cm.shellThickness / 100)
@@ -566,7 +1223,7 @@ def createBricksDictEntry(name:str, loc:list, val:float=0, draw:bool=False, co:t
 
     Keyword Arguments:
     name              -- name of the brick object
-    loc               -- strToList(key)
+    loc               -- unpackKey(key)
     val               -- location of brick in model (0: outside of model, 0.00-1.00: number of bricks away from shell / 100, 1: on shell)
     draw              -- draw the brick in 3D space
     co                -- 1x1 brick centered at this location
@@ -612,12 +1269,13 @@ def createBricksDictEntry(name:str, loc:list, val:float=0, draw:bool=False, co:t
            }
 
 @timed_call('Time Elapsed')
-def makeBricksDict(source, source_details, brickScale, uv_images, cursorStatus=False):
+def makeBricksDict(source, source_details, brickScale, uv_images, cursorStatus=False, smokeCacheFile=None):
     """ make dictionary with brick information at each coordinate of lattice surrounding source
     source         -- source object to construct lattice around
     source_details -- object details with subattributes for distance and midpoint of x, y, z axes
     brickScale     -- scale of bricks
     cursorStatus   -- update mouse cursor with status of matrix creation
+    smokeCacheFile -- smoke point cache file to read smoke channels from (optional)
     """
     scn, cm, n = getActiveContextInfo()
     # get lattice bmesh
@@ -627,69 +1285,79 @@ def makeBricksDict(source, source_details, brickScale, uv_images, cursorStatus=F
     if source.parent:
         offset = offset - source.parent.location
     # get coordinate list from intersections of edges with faces
-    coordMatrix = generateLattice(brickScale, lScale, offset)
-    if len(coordMatrix) == 0:
-        coordMatrix.append(source_details.mid)
+    coordMatrix = generateLatticeArray(brickScale, lScale, offset)
     # set calculationAxes
     calculationAxes = cm.calculationAxes if cm.brickShell != "INSIDE" else "XYZ"
     # set up faceIdxMatrix and brickFreqMatrix
-    faceIdxMatrix = np.zeros((len(coordMatrix), len(coordMatrix[0]), len(coordMatrix[0][0])), dtype=int).tolist()
+    faceIdxMatrix = newFaceIdxMatrix(coordMatrix.shape[:3])
     if cm.isSmoke:
-        brickFreqMatrix, smokeColors = getBrickMatrixSmoke(faceIdxMatrix, cm.brickShell, source_details, cursorStatus=cursorStatus)
+        brickFreqMatrix, smokeColors = getBrickMatrixSmoke(faceIdxMatrix, cm.brickShell, source_details, cursorStatus=cursorStatus, smokeCacheFile=smokeCacheFile)
+    elif cm.voxelizationMode == "SURFACE":
+        brickFreqMatrix = getBrickMatrixSurface(source, faceIdxMatrix, coordMatrix, cm.brickShell, cursorStatus=cursorStatus)
+        smokeColors = None
+    elif cm.voxelizationMode == "OCTREE":
+        brickFreqMatrix = getBrickMatrixOctree(source, faceIdxMatrix, coordMatrix, cm.brickShell, cursorStatus=cursorStatus)
+        smokeColors = None
+    elif cm.voxelizationMode in ("SCANLINE", "PARALLEL"):
+        brickFreqMatrix = getBrickMatrixScanline(source, faceIdxMatrix, coordMatrix, cm.brickShell, axes=calculationAxes, parallel=cm.voxelizationMode == "PARALLEL", cursorStatus=cursorStatus)
+        smokeColors = None
     else:
         brickFreqMatrix = getBrickMatrix(source, faceIdxMatrix, coordMatrix, cm.brickShell, axes=calculationAxes, cursorStatus=cursorStatus)
         smokeColors = None
+    # get nearest faces with direct queries rather than propagating them from the shell
+    if cm.queryNearestFaces and not cm.isSmoke:
+        fillNearestFaces(source, brickFreqMatrix, faceIdxMatrix, coordMatrix, cm.matShellDepth)
     # initialize active keys
     cm.activeKey = (-1, -1, -1)
 
     # create bricks dictionary with brickFreqMatrix values
-    bricksDict = {}
+    bricksDict = BricksDict(namePrefix="Bricker_%(n)s__" % locals())
     threshold = getThreshold(cm)
     brickType = cm.brickType  # prevents cm.brickType update function from running over and over in for loop
     uvImage = cm.uvImage
     sourceMats = cm.materialType == "SOURCE"
     noOffset = vec_round(offset, precision=5) == Vector((0, 0, 0))
-    for x in range(len(coordMatrix)):
-        for y in range(len(coordMatrix[0])):
-            for z in range(len(coordMatrix[0][0])):
-                # skip brickFreqMatrix values set to None
-                if brickFreqMatrix[x][y][z] is None:
-                    continue
-
-                # initialize variables
-                bKey = listToStr((x, y, z))
-
-                co = coordMatrix[x][y][z].to_tuple() if noOffset else (coordMatrix[x][y][z] - source_details.mid).to_tuple()
-
-                # get material from nearest face intersection point
-                nf = faceIdxMatrix[x][y][z]["idx"] if type(faceIdxMatrix[x][y][z]) == dict else None
-                ni = faceIdxMatrix[x][y][z]["loc"].to_tuple() if type(faceIdxMatrix[x][y][z]) == dict else None
-                nn = faceIdxMatrix[x][y][z]["normal"] if type(faceIdxMatrix[x][y][z]) == dict else None
-                norm_dir = getNormalDirection(nn, slopes=True)
-                bType = getBrickType(brickType)
-                flipped, rotated = getFlipRot("" if norm_dir is None else norm_dir[1:])
-                if sourceMats:
-                    rgba = smokeColors[x][y][z] if smokeColors else getUVPixelColor(scn, source, nf, ni if ni is None else Vector(ni), uv_images, uvImage)
-                else:
-                    rgba = (0, 0, 0, 1)
-                draw = brickFreqMatrix[x][y][z] >= threshold
-                # create bricksDict entry for current brick
-                bricksDict[bKey] = createBricksDictEntry(
-                    name= 'Bricker_%(n)s__%(bKey)s' % locals(),
-                    loc= [x, y, z],
-                    val= brickFreqMatrix[x][y][z],
-                    draw= draw,
-                    co= co,
-                    near_face= nf,
-                    near_intersection= ni,
-                    near_normal= norm_dir,
-                    rgba= rgba,
-                    # mat_name= "",  # defined in 'updateMaterials' function
-                    # obscures= [brickFreqMatrix[x][y][z] != 0]*6,
-                    bType= bType,
-                    flipped= flipped,
-                    rotated= rotated,
-                )
+    cos = coordMatrix if noOffset else coordMatrix - np.array(source_details.mid, dtype=np.float32)
+    # skip brickFreqMatrix values marked for removal
+    locs = np.argwhere(brickFreqMatrix != bfmRemoved)
+    keys = [packKey(x, y, z) for x, y, z in locs.tolist()]
+    vals = [getBFMVal(code) for code in brickFreqMatrix[tuple(locs.T)].tolist()]
+    nearestFaces = faceIdxMatrix[tuple(locs.T)]
+    bType = getBrickType(brickType)
+    nfs, nis, norm_dirs, rgbas, flips, rots = [], [], [], [], [], []
+    for i, (x, y, z) in enumerate(locs.tolist()):
+        # get material from nearest face intersection point
+        nearestFace = nearestFaces[i]
+        hasFace = nearestFace["idx"] != -1
+        nf = int(nearestFace["idx"]) if hasFace else None
+        ni = tuple(nearestFace["loc"].tolist()) if hasFace else None
+        nn = Vector(nearestFace["normal"]) if hasFace else None
+        norm_dir = getNormalDirection(nn, slopes=True)
+        flipped, rotated = getFlipRot("" if norm_dir is None else norm_dir[1:])
+        if sourceMats:
+            rgba = smokeColors[x, y, z].tolist() if smokeColors is not None else getUVPixelColor(scn, source, nf, ni if ni is None else Vector(ni), uv_images, uvImage)
+        else:
+            rgba = (0, 0, 0, 1)
+        nfs.append(nf)
+        nis.append(ni)
+        norm_dirs.append(norm_dir)
+        rgbas.append(rgba)
+        flips.append(flipped)
+        rots.append(rotated)
+    # create bricksDict entries for all bricks
+    bricksDict.addRows(keys,
+        loc=           locs,
+        val=           vals,
+        draw=          [val >= threshold for val in vals],
+        co=            cos[tuple(locs.T)],
+        near_face=     nfs,
+        near_intersection= nis,
+        near_normal=   norm_dirs,
+        rgba=          rgbas,
+        type=          [bType] * len(keys),
+        flipped=       flips,
+        rotated=       rots,
+    )
 
     # if buildIsDirty, this is done in drawBrick
     if not cm.buildIsDirty:
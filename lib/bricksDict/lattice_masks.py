@@ -0,0 +1,91 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# NOTE: This module must not depend on 'bpy', 'mathutils', or the Bricker package, so
+#       its lattice mask operations can be tested without Blender (see 'test_lattice_masks.py')
+
+# System imports
+import numpy as np
+
+
+def shiftArray(arr, axis:int, offset:int, fill):
+    """ returns copy of 'arr' shifted by 'offset' along 'axis' (out[i] = arr[i - offset]) with vacated locations set to 'fill' """
+    out = np.full_like(arr, fill)
+    src = [slice(None)] * arr.ndim
+    dst = [slice(None)] * arr.ndim
+    if offset > 0:
+        src[axis] = slice(None, -offset)
+        dst[axis] = slice(offset, None)
+    else:
+        src[axis] = slice(-offset, None)
+        dst[axis] = slice(None, offset)
+    out[tuple(dst)] = arr[tuple(src)]
+    return out
+
+
+def floodFill(passable, seeds):
+    """ returns mask of 'passable' locations 6-connected to 'seeds' through other passable locations """
+    shape = passable.shape
+    strides = (shape[1] * shape[2], shape[2], 1)
+    flatPassable = passable.reshape(-1)
+    reached = np.zeros(passable.size, dtype=bool)
+    frontier = np.flatnonzero(seeds.reshape(-1) & flatPassable)
+    reached[frontier] = True
+    while len(frontier) > 0:
+        frontierCoords = np.unravel_index(frontier, shape)
+        neighbors = []
+        for axis in range(3):
+            for offset in (1, -1):
+                neighborCoords = frontierCoords[axis] + offset
+                curNeighbors = frontier[(neighborCoords >= 0) & (neighborCoords < shape[axis])] + offset * strides[axis]
+                neighbors.append(curNeighbors[flatPassable[curNeighbors] & ~reached[curNeighbors]])
+        frontier = np.unique(np.concatenate(neighbors))
+        reached[frontier] = True
+    return reached.reshape(shape)
+
+
+def getAdjacentMask(mask):
+    """ returns mask of locations 6-adjacent to locations in 'mask' """
+    adjacent = np.zeros(mask.shape, dtype=bool)
+    for axis in range(3):
+        adjacent |= shiftArray(mask, axis, 1, False) | shiftArray(mask, axis, -1, False)
+    return adjacent
+
+
+def trianglesOverlapBoxes(v0, v1, v2, centers, halfSize):
+    """ returns mask of triangles (v0, v1, v2) overlapping axis aligned boxes at 'centers' with 'halfSize' (separating axis test) """
+    v0, v1, v2 = v0 - centers, v1 - centers, v2 - centers
+    verts = (v0, v1, v2)
+    edges = (v1 - v0, v2 - v1, v0 - v2)
+    overlap = np.ones(len(centers), dtype=bool)
+    # test box face normals
+    for i in range(3):
+        overlap &= (np.minimum(np.minimum(v0[:, i], v1[:, i]), v2[:, i]) <= halfSize[i]) & (np.maximum(np.maximum(v0[:, i], v1[:, i]), v2[:, i]) >= -halfSize[i])
+    # test triangle normal
+    normals = np.cross(edges[0], edges[1])
+    r = np.abs(normals) @ halfSize
+    overlap &= np.abs(np.einsum("ij,ij->i", normals, v0)) <= r
+    # test cross products of box face normals and triangle edges
+    for edge in edges:
+        for i in range(3):
+            unitAxis = np.zeros(3)
+            unitAxis[i] = 1
+            axes = np.cross(unitAxis, edge)
+            projections = [np.einsum("ij,ij->i", axes, v) for v in verts]
+            r = np.abs(axes) @ halfSize
+            overlap &= (np.minimum(np.minimum(*projections[:2]), projections[2]) <= r) & (np.maximum(np.maximum(*projections[:2]), projections[2]) >= -r)
+    return overlap
@@ -0,0 +1,372 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import multiprocessing
+import os
+import sys
+import numpy as np
+
+# Blender imports
+import bpy
+
+# Addon imports
+from .columns import *
+from .modify import *
+from ...functions.general import *
+
+"""
+Layer merge engine (for builds without vertical merging)
+
+All keys of a z-level are read into a grid of material labels and merged on flat lists
+indexed by grid cell (see 'bricker_merge_worker.mergeLayerTask'), then the merged bricks
+are written back to the bricksDict in bulk. Layers can be merged in the active process
+('mergeLayer') or all at once in worker processes ('mergeLayersParallel'), or optimized
+one at a time against the layer below ('optimizeLayer').
+"""
+
+def getLayerSizeTable(typ, zStep, maxWidth, maxDepth, legalBricksOnly):
+    """ returns (max depth by width, allowed depths by width) for merging bricks of type 'typ' (allowed depths are None if any size is allowed) """
+    maxL = max(maxWidth, maxDepth)
+    capDepths = [max(maxDepth if w <= maxWidth else 0, maxWidth if w <= maxDepth else 0) for w in range(1, maxL + 1)]
+    if not legalBricksOnly:
+        return capDepths, None
+    legal = bpy.props.Bricker_legal_brick_size_tables[zStep][typ]
+    maxDim = len(legal) - 1
+    allowedDepths = [[d for d in range(1, min(capDepths[w - 1], maxDim) + 1) if legal[w][d]] if w <= maxDim else [] for w in range(1, maxL + 1)]
+    return capDepths, allowedDepths
+
+
+def getLayerFields(bricksDict, keys):
+    """ returns (material labels, types, skip flags, vals) for 'keys' (label 0 is the internal material) """
+    if isinstance(bricksDict, BricksDict):
+        rows = bricksDict.rows(keys)
+        extra = bricksDict.extra
+        if not extra or not any(row in extra for row in rows.tolist()):
+            cols = bricksDict.columns
+            matIdxs = cols["mat_name"][rows].astype(np.int64)
+            labels = np.where(matIdxs == bricksDict.stringIdxs[""], 0, matIdxs + 2)
+            typeStrings = np.array(bricksDict.strings + [None], dtype=object)
+            types = typeStrings[cols["type"][rows]].tolist()
+            parents = cols["parent"][rows]
+            skip = (cols["flags"][rows] & bricksDictFlags["attempted_merge"] != 0) | ((parents != noKeyRow) & (parents != selfKeyRow))
+            return labels, types, skip, cols["val"][rows].tolist()
+    labelIdxs = {"": 0}
+    labels = np.empty(len(keys), dtype=np.int64)
+    types = []
+    skip = np.empty(len(keys), dtype=bool)
+    vals = []
+    for idx, key in enumerate(keys):
+        brickD = bricksDict[key]
+        labels[idx] = labelIdxs.setdefault(brickD["mat_name"], len(labelIdxs))
+        types.append(brickD["type"])
+        skip[idx] = brickD["attempted_merge"] or brickD["parent"] not in (None, "self")
+        vals.append(brickD["val"])
+    return labels, types, skip, vals
+
+
+def getMergeWorker():
+    """ returns worker module for layer merging (imported as top level module so spawned processes can import it without bpy) """
+    workersDir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "workers")
+    if workersDir not in sys.path:
+        sys.path.append(workersDir)
+    import bricker_merge_worker
+    return bricker_merge_worker
+
+
+def getNumMergeProcesses():
+    """ returns number of worker processes to use for parallel merging """
+    prefs = get_addon_preferences()
+    numProcesses = prefs.mergeCores if prefs is not None else 0
+    return numProcesses if numProcesses > 0 else multiprocessing.cpu_count()
+
+
+# seconds to wait for each result from merge worker processes before falling back to the active process
+mergeWorkerTimeout = 60
+
+
+def getLayerGrid(keys, belowKeys=[]):
+    """ returns (numX, numY, grid cells of 'keys', grid cells of 'belowKeys') for a grid covering the x/y locations of 'keys' and 'belowKeys' """
+    keysArr = np.array(list(keys) + list(belowKeys), dtype=np.int64)
+    xs = (keysArr >> (keyBits * 2)) - keyOffset
+    ys = ((keysArr >> keyBits) & keyMask) - keyOffset
+    x0, y0 = int(xs.min()), int(ys.min())
+    # pad grid with unavailable cells so bricks stop at its edges
+    numX = int(xs.max()) - x0 + 2
+    numY = int(ys.max()) - y0 + 2
+    cells = ((xs - x0) * numY + (ys - y0)).tolist()
+    return numX, numY, cells[:len(keys)], cells[len(keys):]
+
+
+def getLayerTask(bricksDict, keys, zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, mergeType, belowKeys=None):
+    """ returns (merge task for 'bricker_merge_worker.mergeLayerTask', brick type of each seed) for keys of a single z-level (merged in order of 'keys')
+
+    If 'belowKeys' is passed, the task also holds the ids of bricks in the layer below (for 'bricker_merge_worker.optimizeLayerTask')
+    """
+    numX, numY, cells, belowCells = getLayerGrid(keys, belowKeys or [])
+
+    labels, types, skip, vals = getLayerFields(bricksDict, keys)
+    mergable = np.array([mergableBrickType(typ) for typ in types], dtype=bool)
+    labelGrid = np.full(numX * numY, -1, dtype=np.int64)
+    labelGrid[cells] = labels
+    availGrid = np.zeros(numX * numY, dtype=bool)
+    availGrid[cells] = mergable & ~skip
+    skipGrid = np.ones(numX * numY, dtype=bool)
+    skipGrid[cells] = skip
+
+    # get size tables for each brick type in the layer
+    tables = []
+    tableIdxs = {}
+    seedTableIdxs = []
+    height3Only = []
+    brickTypes = []
+    tallTypes = getBrickTypes(height=3)
+    for typ in types:
+        tallType = getTallType({"type":typ})
+        shortType = getShortType({"type":typ})
+        sizeType = tallType if zStep == 3 else shortType
+        if sizeType not in tableIdxs:
+            tableIdxs[sizeType] = len(tables)
+            tables.append(getLayerSizeTable(sizeType, zStep, maxWidth, maxDepth, legalBricksOnly))
+        seedTableIdxs.append(tableIdxs[sizeType])
+        height3Only.append(zStep == 1 and typ in tallTypes)
+        brickTypes.append(shortType if zStep == 1 else tallType)
+
+    task = {
+        "id":None,
+        "numX":numX,
+        "numY":numY,
+        "cells":cells,
+        "order":list(range(len(keys))),
+        "labels":labelGrid,
+        "avail":availGrid,
+        "skip":skipGrid,
+        "tables":tables,
+        "tableIdxs":seedTableIdxs,
+        "height3Only":height3Only,
+        "preferLargest":[0 < val < 1 for val in vals],
+        "randOrders":None,
+        "maxWidth":maxWidth,
+        "maxDepth":maxDepth,
+        "mergeInternals":mergeInternals,
+        "largestFirst":mergeType == "LARGEST",
+    }
+    if belowKeys is not None:
+        belowGrid = np.full(numX * numY, -1, dtype=np.int64)
+        belowGrid[belowCells] = getLayerBrickIds(bricksDict, belowKeys)
+        task["below"] = belowGrid
+    return task, brickTypes
+
+
+def mergeLayer(bricksDict, keys, zStep, randState, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, mergeType="RANDOM"):
+    """ merge keys of a single z-level and write merged bricks to bricksDict in bulk (returns list of (key, size, type) for merged bricks)
+
+    Keyword Arguments:
+        bricksDict      -- dictionary of brick information
+        keys            -- keys on the z-level, in merge order
+        zStep           -- height of bricks in the layer (1 or 3)
+        randState       -- np.random.RandomState for brick size sort orders
+        brickType       -- cm.brickType
+        maxWidth        -- cm.maxWidth
+        maxDepth        -- cm.maxDepth
+        legalBricksOnly -- only merge into legal brick sizes
+        mergeInternals  -- merge internal bricks with bricks of any material
+        mergeType       -- cm.mergeType
+    """
+    if len(keys) == 0:
+        return []
+    task, brickTypes = getLayerTask(bricksDict, keys, zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, mergeType)
+    # draw brick size sort orders in the same sequence 'attemptMerge' would
+    if brickType != "CUSTOM":
+        randStateStart = randState.get_state()
+        task["randOrders"] = randState.randint(0, 2, size=len(keys)).tolist()
+    _, results = getMergeWorker().mergeLayerTask(task)
+    # only consume the sort orders that were used (one per merged brick)
+    if brickType != "CUSTOM":
+        randState.set_state(randStateStart)
+        randState.randint(0, 2, size=len(results))
+    bricks = [(keys[idx], [w, d, zStep], brickTypes[idx]) for idx, w, d in results]
+    setLayerBricks(bricksDict, bricks, zStep, brickType)
+    return bricks
+
+
+def getLargestFirstOrder(bricksDict, keys, zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals):
+    """ returns keys of a single z-level ordered by the area of the largest brick that fits at each key (for 'attemptMerge' with 'preferLargest') """
+    if len(keys) == 0:
+        return keys
+    task, _ = getLayerTask(bricksDict, keys, zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, "LARGEST")
+    return [keys[idx] for idx in getMergeWorker().getLargestFirstOrder(task)]
+
+
+def optimizeLayer(bricksDict, keys, belowKeys, zStep, seed, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, timeLimit):
+    """ merge keys of a single z-level, minimizing brick edges aligned with the layer below, and write merged bricks to bricksDict in bulk (returns list of (key, size, type) for merged bricks)
+
+    Keyword Arguments:
+        bricksDict      -- dictionary of brick information
+        keys            -- keys on the z-level
+        belowKeys       -- keys on the z-level below (None if there are none)
+        zStep           -- height of bricks in the layer (1 or 3)
+        seed            -- random seed for local search
+        brickType       -- cm.brickType
+        maxWidth        -- cm.maxWidth
+        maxDepth        -- cm.maxDepth
+        legalBricksOnly -- only merge into legal brick sizes
+        mergeInternals  -- merge internal bricks with bricks of any material
+        timeLimit       -- seconds to spend on local search
+    """
+    if len(keys) == 0:
+        return []
+    task, brickTypes = getLayerTask(bricksDict, keys, zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, "CONNECTIVITY", belowKeys=belowKeys or [])
+    # weight bricks like 'connectThresh' variations (double the number of bricks)
+    task.update(brickWeight=2, timeLimit=timeLimit, seed=seed)
+    _, results = getMergeWorker().optimizeLayerTask(task)
+    bricks = [(keys[idx], [w, d, zStep], brickTypes[idx]) for idx, w, d in results]
+    setLayerBricks(bricksDict, bricks, zStep, brickType)
+    return bricks
+
+
+def getLayerBrickIds(bricksDict, keys):
+    """ returns id of the brick containing each key (-1 for keys not in a brick) """
+    if isinstance(bricksDict, BricksDict):
+        rows = bricksDict.rows(keys)
+        extra = bricksDict.extra
+        if not extra or not any(row in extra for row in rows.tolist()):
+            parents = bricksDict.columns["parent"][rows].astype(np.int64)
+            return np.where(parents == selfKeyRow, rows, parents)
+        getBrickId = bricksDict.rowIdx
+    else:
+        getBrickId = lambda key: key
+    ids = np.empty(len(keys), dtype=np.int64)
+    for idx, key in enumerate(keys):
+        parent = bricksDict[key]["parent"]
+        brickId = None if parent is None else getBrickId(key if parent == "self" else parent)
+        ids[idx] = -1 if brickId is None else brickId
+    return ids
+
+
+def getNumAlignedEdgesInModel(bricksDict, keysDict):
+    """ returns number of brick edges aligned with edges of bricks in the layer below, summed over z-levels of 'keysDict' """
+    mergeWorker = getMergeWorker()
+    numAlignedEdges = 0
+    for z, keys in keysDict.items():
+        belowKeys = keysDict.get(z - 1)
+        if not keys or not belowKeys:
+            continue
+        numX, numY, cells, belowCells = getLayerGrid(keys, belowKeys)
+        ids = np.full(numX * numY, -1, dtype=np.int64)
+        ids[cells] = getLayerBrickIds(bricksDict, keys)
+        belowIds = np.full(numX * numY, -1, dtype=np.int64)
+        belowIds[belowCells] = getLayerBrickIds(bricksDict, belowKeys)
+        numAlignedEdges += mergeWorker.getLayerAlignedEdges(ids.reshape(numX, numY), belowIds.reshape(numX, numY))
+    return numAlignedEdges
+
+
+def getBestVariation(bricksDict, variations, bricksAndPlates):
+    """ returns the variation of a layer (list of (key, size, type) for merged bricks) with the best connectivity to the layer below """
+    scores = []
+    for bricks in variations:
+        numAlignedEdges = sum(getNumAlignedEdges(bricksDict, size, key, unpackKey(key), bricksAndPlates) for key, size, typ in bricks)
+        # if no aligned edges / bricks found, use this variation
+        if numAlignedEdges == 0:
+            return bricks
+        # add double the number of bricks so connectivity threshold is weighted towards larger bricks
+        scores.append(numAlignedEdges + len(bricks) * 2)
+    return variations[scores.index(min(scores))]
+
+
+def mergeLayersParallel(bricksDict, keysDict, zStep, mergeSeed, connectThresh, numProcesses, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, mergeType, bricksAndPlates, printStatus=True, cursorStatus=False):
+    """ merge z-levels of 'keysDict' (and their 'connectThresh' variations) in worker processes
+
+    Each layer is seeded independently (from 'mergeSeed' and its index), so results differ
+    from serial merging. Results are gathered in layer order, so each layer's variations
+    are scored against the layer below as soon as its bricks are written, while workers
+    merge the layers above.
+
+    Returns False if workers fail to return results (layers written so far are marked
+    'attempted_merge', so the remaining layers can be merged in the active process).
+    """
+    # build merge tasks for all layers and their variations
+    tasks = []
+    layers = []
+    for zIdx, z in enumerate(sorted(keysDict.keys())):
+        keys = keysDict[z]
+        task, brickTypes = getLayerTask(bricksDict, keys, zStep, brickType, maxWidth, maxDepth, legalBricksOnly, mergeInternals, mergeType)
+        layers.append((keys, brickTypes))
+        for j in range(connectThresh):
+            randState = np.random.RandomState([mergeSeed + 1, zIdx, j])
+            order = randState.permutation(len(keys)).tolist() if mergeType == "RANDOM" else task["order"]
+            randOrders = None if brickType == "CUSTOM" else randState.randint(0, 2, size=len(keys)).tolist()
+            tasks.append(dict(task, id=(zIdx, j), order=order, randOrders=randOrders))
+    # merge layers in worker processes
+    ctx = multiprocessing.get_context("spawn")
+    ctx.set_executable(bpy.app.binary_path_python)
+    mergeWorker = getMergeWorker()
+    old_percent = 0
+    variations = []
+    try:
+        with ctx.Pool(processes=numProcesses) as pool:
+            layerResults = pool.imap(mergeWorker.mergeLayerTask, tasks)
+            for i in range(len(tasks)):
+                # workers that fail to start are replaced indefinitely, so don't wait on them forever
+                (zIdx, j), results = layerResults.next(timeout=mergeWorkerTimeout)
+                keys, brickTypes = layers[zIdx]
+                variations.append([(keys[idx], [w, d, zStep], brickTypes[idx]) for idx, w, d in results])
+                if j < connectThresh - 1:
+                    continue
+                # write best variation of layer so the layer above can be scored against it
+                bricks = variations[0] if connectThresh == 1 else getBestVariation(bricksDict, variations, bricksAndPlates)
+                setLayerBricks(bricksDict, bricks, zStep, brickType)
+                variations = []
+                # print status to terminal and cursor
+                old_percent = updateProgressBars(printStatus, cursorStatus, (i + 1) / len(tasks), old_percent, "Merging")
+    except (multiprocessing.TimeoutError, OSError):
+        print("[Bricker] Merge workers failed to return results; merging remaining layers in the active process")
+        return False
+    return True
+
+
+def setLayerBricks(bricksDict, bricks, zStep, brickType):
+    """ write merged bricks (list of (key, size, type)) to bricksDict in bulk """
+    setType = flatBrickType(brickType)
+    keysInBricks = [getKeysInBrick(bricksDict, size, zStep, key=key) for key, size, typ in bricks]
+    allKeys = []
+    parents = []
+    brickTypes = []
+    for (key, size, typ), keysInBrick in zip(bricks, keysInBricks):
+        allKeys += keysInBrick
+        parents += ["self" if k == key else key for k in keysInBrick]
+        brickTypes += [typ] * len(keysInBrick)
+    if isinstance(bricksDict, BricksDict):
+        bricksDict.setRows(bricksDict.rows([key for key, size, typ in bricks]), size=np.array([size for key, size, typ in bricks], dtype=np.int64).reshape(-1, 3))
+        fields = {"attempted_merge":[True] * len(allKeys), "parent":parents}
+        if setType:
+            fields["type"] = brickTypes
+        bricksDict.setRows(bricksDict.rows(allKeys), **fields)
+    else:
+        for key, size, typ in bricks:
+            bricksDict[key]["size"] = size
+        for k, parent, typ in zip(allKeys, parents, brickTypes):
+            brickD = bricksDict[k]
+            brickD["attempted_merge"] = True
+            brickD["parent"] = parent
+            if setType:
+                brickD["type"] = typ
+    # set flipped, rotated, and slope types
+    for (key, size, typ), keysInBrick in zip(bricks, keysInBricks):
+        setFlippedAndRotated(bricksDict, key, keysInBrick)
+        if bricksDict[key]["type"] == "SLOPE" and brickType == "SLOPES":
+            setBrickTypeForSlope(bricksDict, key, keysInBrick)
@@ -95,7 +95,7 @@ def updateMaterials(bricksDict, source, uv_images, keys, curFrame=None):
 
 
 def updateBrickSizes(bricksDict, key, availableKeys, loc, brickSizes, zStep, maxL, height3Only, legalBricksOnly, mergeInternalsH, mergeInternalsV, materialType, mergeInconsistentMats=False, mergeVertical=False, tallType="BRICK", shortType="PLATE"):
-    """ update 'brickSizes' with available brick sizes surrounding bricksDict[key] """
+    """ update 'brickSizes' with available brick sizes surrounding bricksDict[key] ('availableKeys' should be a set) """
     if not mergeVertical:
         maxL[2] = 1
     newMax1 = maxL[1]
@@ -109,7 +109,7 @@ def updateBrickSizes(bricksDict, key, availableKeys, loc, brickSizes, zStep, max
             # break case 1
             if j >= newMax1: break
             # break case 2
-            key1 = listToStr((loc[0] + i, loc[1] + j, loc[2]))
+            key1 = packKey(loc[0] + i, loc[1] + j, loc[2])
             if not brickAvail(bricksDict, key, key1, mergeInternalsH, materialType, mergeInconsistentMats) or key1 not in availableKeys:
                 if j == 0: breakOuter2 = True
                 else:      newMax1 = j
@@ -119,7 +119,7 @@ def updateBrickSizes(bricksDict, key, availableKeys, loc, brickSizes, zStep, max
                 # break case 1
                 if k >= newMax2: break
                 # break case 2
-                key2 = listToStr((loc[0] + i, loc[1] + j, loc[2] + k))
+                key2 = key1 + k * keyStepZ
                 if not brickAvail(bricksDict, key, key2, mergeInternalsV, materialType, mergeInconsistentMats) or key2 not in availableKeys:
                     if k == 0: breakOuter1 = True
                     else:      newMax2 = k
@@ -183,7 +183,7 @@ def getNumAlignedEdges(bricksDict, size, key, loc, bricksAndPlates=False):
     for l in locs:
         # factor in height of brick (encourages)
         if bricksAndPlates and False:
-            k0 = listToStr(l)
+            k0 = packKey(*l)
             try:
                 p_brick0 = bricksDict[k0]["parent"]
             except KeyError:
@@ -196,7 +196,7 @@ def getNumAlignedEdges(bricksDict, size, key, loc, bricksAndPlates=False):
             numAlignedEdges -= p_brick_sz0[2] / 3
         # check number of aligned edges
         l[2] -= 1
-        k = listToStr(l)
+        k = packKey(*l)
         try:
             p_brick_key = bricksDict[k]["parent"]
         except KeyError:
@@ -0,0 +1,108 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+from collections.abc import MutableMapping
+
+# Blender imports
+# NONE!
+
+# Addon imports
+# NONE!
+
+
+class BricksDictOverlay(MutableMapping):
+    """ copy-on-write view of the entries of 'base' at 'keys'
+
+    Reads fall through to the base bricksDict, writes are recorded per field in the overlay
+    (the base is left untouched until 'commit' is called). Like BricksDict entries, list
+    values must be assigned whole to modify them (e.g. 'overlay[key]["size"] = size').
+    """
+
+    def __init__(self, base, keys):
+        self.base = base
+        self.visibleKeys = keys if isinstance(keys, (set, frozenset, dict)) else dict.fromkeys(keys)
+        self.entries = {}
+
+    def __getitem__(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            if key not in self.visibleKeys:
+                raise KeyError(key)
+            entry = BricksDictOverlayEntry(self.base[key])
+            self.entries[key] = entry
+        return entry
+
+    def __setitem__(self, key, entry):
+        self[key].changes.update(entry)
+
+    def __delitem__(self, key):
+        raise TypeError("Keys can't be deleted from BricksDictOverlay")
+
+    def __iter__(self):
+        return iter(self.visibleKeys)
+
+    def __len__(self):
+        return len(self.visibleKeys)
+
+    def __contains__(self, key):
+        return key in self.visibleKeys
+
+    def numChanged(self):
+        """ returns number of entries with recorded writes """
+        return sum(1 for entry in self.entries.values() if entry.changes)
+
+    def commit(self):
+        """ write recorded changes to the base bricksDict and reset the overlay """
+        base = self.base
+        for key, entry in self.entries.items():
+            if not entry.changes:
+                continue
+            baseEntry = base[key]
+            for field, value in entry.changes.items():
+                baseEntry[field] = value
+        self.entries = {}
+
+
+class BricksDictOverlayEntry(MutableMapping):
+    """ dict-compatible view of a base bricksDict entry with changed fields stored separately """
+
+    def __init__(self, baseEntry):
+        self.baseEntry = baseEntry
+        self.changes = {}
+
+    def __getitem__(self, field):
+        try:
+            return self.changes[field]
+        except KeyError:
+            return self.baseEntry[field]
+
+    def __setitem__(self, field, value):
+        self.changes[field] = value
+
+    def __delitem__(self, field):
+        raise TypeError("Fields can't be deleted from BricksDictOverlayEntry")
+
+    def __iter__(self):
+        fields = list(self.baseEntry)
+        return iter(fields + [field for field in self.changes if field not in self.baseEntry])
+
+    def __len__(self):
+        return len(tuple(iter(self)))
+
+    def __repr__(self):
+        return repr(dict(self))
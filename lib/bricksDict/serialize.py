@@ -0,0 +1,215 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# System imports
+import base64
+import json
+import struct
+import zlib
+import numpy as np
+
+# Blender imports
+# NONE!
+
+# Addon imports
+from .columns import *
+from ...functions.common import compress_str, decompress_str
+from ...functions.general import loadBricksDictCache
+
+"""
+Binary BFMCache format (little endian):
+
+    magic 'BFMC' | version (uint16) | flags (uint16) | payload
+
+The payload (zlib compressed if 'bfmFlagZlib' is set) is:
+
+    header length (uint32) | header (JSON) | padding to 8 bytes | column data
+
+The header holds an entry for each bricksDict in the cache (one per frame for
+animations) with its string table, name prefix, and 'extra' fields. Column data
+for each bricksDict follows in header order: the packed key of each row, the rows
+of current keys in iteration order (deleted keys keep their rows so 'parent' rows
+stay valid), then each column in 'bricksDictColumns', each padded to 8 bytes.
+"""
+
+bfmCacheMagic = b"BFMC"
+bfmCacheVersion = 1
+bfmFlagZlib = 1 << 0
+bfmPreamble = struct.Struct("<4sHH")
+bfmHeaderLen = struct.Struct("<I")
+# prefix of base64-encoded binary caches stored in 'cm.BFMCache' (legacy caches are hex strings)
+bfmCacheStrPrefix = "BFMC:"
+
+
+def isFramesCache(cache):
+    """ returns True if 'cache' is a dict of bricksDicts by frame (as opposed to a single bricksDict) """
+    if isinstance(cache, BricksDict):
+        return False
+    return any(isinstance(v, BricksDict) or (isinstance(v, dict) and "loc" not in v) for v in cache.values())
+
+
+def padLen(length):
+    return -length % 8
+
+
+def encodeExtraValue(value):
+    """ returns JSON compatible value for NumPy values in 'extra' fields (used as 'default' for 'json.dumps') """
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError("Value of type '%(typ)s' in bricksDict can't be cached" % {"typ":type(value).__name__})
+
+
+def packBricksDict(bricksDict, frame=None):
+    """ returns (header info, list of arrays) for binary serialization of 'bricksDict' """
+    if not isinstance(bricksDict, BricksDict):
+        bricksDict = BricksDict.fromDict(bricksDict)
+    numRows = bricksDict.numRows
+    arrays = [np.array(bricksDict.rowKeys, dtype="<i8"), np.array(list(bricksDict.keyRows.values()), dtype="<i8")]
+    columnInfo = []
+    for col in bricksDictColumns:
+        arr = bricksDict.column(col)
+        arr = arr.astype(arr.dtype.newbyteorder("<"), copy=False)
+        arrays.append(arr)
+        columnInfo.append([col, arr.dtype.str, list(arr.shape[1:])])
+    info = {
+        "frame":frame,
+        "numRows":numRows,
+        "numKeys":len(bricksDict),
+        "namePrefix":bricksDict.namePrefix,
+        "strings":bricksDict.strings,
+        "extra":[[row, fields] for row, fields in bricksDict.extra.items()],
+        "columns":columnInfo,
+    }
+    return info, arrays
+
+
+def unpackBricksDict(info, buffer, offset):
+    """ returns (BricksDict, offset of next data) read from 'buffer' at 'offset' using header 'info' (columns reference 'buffer') """
+    numRows = info["numRows"]
+    bricksDict = BricksDict(namePrefix=info["namePrefix"])
+    columns = [["keys", "<i8", [], numRows], ["keyRows", "<i8", [], info["numKeys"]]] + [col + [numRows] for col in info["columns"]]
+    arrays = {}
+    for col, dtype, shape, length in columns:
+        dtype = np.dtype(dtype)
+        count = length * int(np.prod(shape, dtype=np.int64))
+        arrays[col] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape([length] + shape)
+        offset += count * dtype.itemsize
+        offset += padLen(offset)
+    # columns missing from older versions keep the default fill values
+    for col, (dtype, shape, fill) in bricksDictColumns.items():
+        if col in arrays:
+            bricksDict.columns[col] = arrays[col].astype(dtype, copy=False)
+        else:
+            bricksDict.columns[col] = np.full((numRows,) + shape, fill, dtype=dtype)
+    bricksDict.numRows = numRows
+    rowKeys = arrays["keys"].tolist()
+    keyRows = arrays["keyRows"].tolist()
+    bricksDict.rowKeys = rowKeys
+    bricksDict.keyRows = {rowKeys[row]:row for row in keyRows}
+    if len(keyRows) < numRows:
+        live = np.zeros(numRows, dtype=bool)
+        live[keyRows] = True
+        bricksDict.deletedRows = {rowKeys[row]:row for row in np.flatnonzero(~live).tolist()}
+    bricksDict.strings = info["strings"]
+    bricksDict.stringIdxs = {string:idx for idx, string in enumerate(bricksDict.strings)}
+    bricksDict.extra = {row:fields for row, fields in info["extra"]}
+    return bricksDict, offset
+
+
+def serializeBFMCache(cache, compress=True, level=6):
+    """ returns bytes of bricksDict (or dict of bricksDicts by frame) in binary BFMCache format
+
+    Keyword Arguments:
+        cache    -- bricksDict, or dict of bricksDicts by frame
+        compress -- zlib compress the payload
+        level    -- zlib compression level
+    """
+    if isFramesCache(cache):
+        packed = [packBricksDict(bricksDict, frame=str(frame)) for frame, bricksDict in cache.items()]
+    else:
+        packed = [packBricksDict(cache)]
+    header = json.dumps({"bricksDicts":[info for info, _ in packed]}, default=encodeExtraValue).encode("utf-8")
+    chunks = [bfmHeaderLen.pack(len(header)), header]
+    length = bfmHeaderLen.size + len(header)
+    for _, arrays in packed:
+        for arr in arrays:
+            chunks.append(b"\0" * padLen(length))
+            length += padLen(length)
+            chunks.append(arr.tobytes())
+            length += arr.nbytes
+    chunks.append(b"\0" * padLen(length))
+    payload = b"".join(chunks)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, level)
+        flags |= bfmFlagZlib
+    return bfmPreamble.pack(bfmCacheMagic, bfmCacheVersion, flags) + payload
+
+
+def deserializeBFMCache(data):
+    """ returns bricksDict (or dict of bricksDicts by frame) from bytes (or buffer) in binary BFMCache format """
+    magic, version, flags = bfmPreamble.unpack_from(data, 0)
+    if magic != bfmCacheMagic:
+        raise ValueError("Not a BFMCache file")
+    if version > bfmCacheVersion:
+        raise ValueError("Unsupported BFMCache version: %(version)s" % locals())
+    if flags & bfmFlagZlib:
+        # decompress into writable buffer so columns can be modified in place
+        buffer = bytearray(zlib.decompress(memoryview(data)[bfmPreamble.size:]))
+        offset = 0
+    else:
+        buffer = data
+        offset = bfmPreamble.size
+    headerLen, = bfmHeaderLen.unpack_from(buffer, offset)
+    offset += bfmHeaderLen.size
+    header = json.loads(bytes(buffer[offset:offset + headerLen]).decode("utf-8"))
+    offset += headerLen
+    offset += padLen(offset)
+    bricksDicts = []
+    for info in header["bricksDicts"]:
+        bricksDict, offset = unpackBricksDict(info, buffer, offset)
+        bricksDicts.append((info["frame"], bricksDict))
+    if len(bricksDicts) == 1 and bricksDicts[0][0] is None:
+        return bricksDicts[0][1]
+    return {frame:bricksDict for frame, bricksDict in bricksDicts}
+
+
+def validateBFMCache(cacheStr):
+    """ raises ValueError if 'cacheStr' is not a supported BFMCache string (without decoding the cache) """
+    if cacheStr.startswith(bfmCacheStrPrefix):
+        # base64 encoded preamble (8 bytes) fits in first 12 characters
+        preamble = base64.b64decode(cacheStr[len(bfmCacheStrPrefix):len(bfmCacheStrPrefix) + 12])
+        magic, version, flags = bfmPreamble.unpack_from(preamble, 0)
+        if magic != bfmCacheMagic:
+            raise ValueError("Not a BFMCache string")
+        if version > bfmCacheVersion:
+            raise ValueError("Unsupported BFMCache version: %(version)s" % locals())
+    # legacy caches are hex-encoded zlib streams
+    elif bytes.fromhex(cacheStr[:2])[:1] != b"\x78":
+        raise ValueError("Not a BFMCache string")
+
+
+def encodeBFMCache(cache):
+    """ returns string of bricksDict (or dict of bricksDicts by frame) for storage in 'cm.BFMCache' """
+    return bfmCacheStrPrefix + base64.b64encode(serializeBFMCache(cache)).decode("ascii")
+
+
+def decodeBFMCache(cacheStr):
+    """ returns bricksDict (or dict of bricksDicts by frame) stored in 'cm.BFMCache' (supports legacy JSON caches) """
+    if cacheStr.startswith(bfmCacheStrPrefix):
+        return deserializeBFMCache(base64.b64decode(cacheStr[len(bfmCacheStrPrefix):]))
+    return loadBricksDictCache(decompress_str(cacheStr))
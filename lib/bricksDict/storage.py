@@ -17,6 +17,7 @@
 
 # System imports
 import json
+import threading
 
 # Blender imports
 import bpy
@@ -25,7 +26,9 @@ import bpy
 from .generate import *
 from .modify import *
 from .functions import *
-from ..caches import bricker_bfm_cache, cacheExists
+from .serialize import *
+from .frame_cache import *
+from ..caches import bricker_bfm_cache, bricker_bfm_prefetch, cacheExists
 from ...functions import *
 
 def getBricksDict(cm, dType="MODEL", curFrame=None):
@@ -33,8 +36,13 @@ def getBricksDict(cm, dType="MODEL", curFrame=None):
     scn = bpy.context.scene
     # if bricksDict can be pulled from cache
     if not matrixReallyIsDirty(cm) and cacheExists(cm) and not (cm.animIsDirty and "ANIM" in dType):
-        # try getting bricksDict from light cache, then deep cache
-        bricksDict = bricker_bfm_cache.get(cm.id) or json.loads(decompress_str(cm.BFMCache))
+        # try getting bricksDict from light cache, then deep cache (deep cache is loaded to light cache on first access)
+        bricksDict = bricker_bfm_cache.get(cm.id)
+        if bricksDict is None:
+            bricksDict = loadBFMCache(cm)
+            if bricksDict is None:
+                return None
+            bricker_bfm_cache[cm.id] = bricksDict
         # if animated, index into that dict
         if "ANIM" in dType:
             adjusted_frame_current = getAnimAdjustedFrame(curFrame, cm.lastStartFrame, cm.lastStopFrame)
@@ -53,28 +61,38 @@ def lightToDeepCache(bricker_bfm_cache):
         if not cm:
             continue
         # save last cache to cm.BFMCache
-        cm.BFMCache = compress_str(json.dumps(bricker_bfm_cache[cm_id]))
+        cache = bricker_bfm_cache[cm_id]
+        if cache is None:
+            continue
+        cm.BFMCache = cache.toCacheStr() if isinstance(cache, FrameFiles) else encodeBFMCache(cache)
         numPushedIDs += 1
     if numPushedIDs > 0:
         print("[Bricker] pushed {numKeys} {pluralized_dicts} from light cache to deep cache".format(numKeys=numPushedIDs, pluralized_dicts="dict" if numPushedIDs == 1 else "dicts"))
 
 def deepToLightCache(bricker_bfm_cache):
-    """ send bricksDict from python cache to blender cache for saving to file """
+    """ validate bricksDicts in blender cache (each is sent to python cache on first access, see 'getBricksDict') """
     scn = bpy.context.scene
-    numPulledIDs = 0
+    numValidIDs = 0
     for cm in scn.cmlist:
         # make sure there is something to store to light cache
         if cm.BFMCache == "":
             continue
         try:
-            bricksDict = json.loads(decompress_str(cm.BFMCache))
-            bricker_bfm_cache[cm.id] = bricksDict
-            numPulledIDs += 1
+            if cm.BFMCache.startswith(frameCacheStrPrefix):
+                if getFrameFiles(cm) is None:
+                    raise FileNotFoundError("Frame cache files not found for model '%(name)s'" % {"name":cm.name})
+            else:
+                validateBFMCache(cm.BFMCache)
+            numValidIDs += 1
         except Exception as e:
             print("ERROR in deepToLightCache:", e)
             cm.BFMCache = ""
-    if numPulledIDs > 0:
-        print("[Bricker] pulled {numKeys} {pluralized_dicts} from deep cache to light cache".format(numKeys=numPulledIDs, pluralized_dicts="dict" if numPulledIDs == 1 else "dicts"))
+    if numValidIDs > 0:
+        print("[Bricker] found {numKeys} {pluralized_dicts} in deep cache".format(numKeys=numValidIDs, pluralized_dicts="dict" if numValidIDs == 1 else "dicts"))
+    # start loading active model's bricksDict
+    prefs = get_addon_preferences()
+    if scn.cmlist_index != -1 and (prefs is None or prefs.prefetchActiveModel):
+        prefetchBricksDict(scn.cmlist[scn.cmlist_index])
 
 def cacheBricksDict(action, cm, bricksDict, curFrame=None):
     """ store bricksDict in light python cache for future access """
@@ -82,7 +100,68 @@ def cacheBricksDict(action, cm, bricksDict, curFrame=None):
     if action in ("CREATE", "UPDATE_MODEL"):
         bricker_bfm_cache[cm.id] = bricksDict
     elif action in ("ANIMATE", "UPDATE_ANIM"):
-        if (cm.id not in bricker_bfm_cache.keys() or
-           type(bricker_bfm_cache[cm.id]) != dict):
-            bricker_bfm_cache[cm.id] = {}
-        bricker_bfm_cache[cm.id][str(curFrame)] = bricksDict
+        frames = bricker_bfm_cache.get(cm.id)
+        # background processes send frames back to the host instead of writing frame files
+        if cm.useFrameCacheFiles and not bpy.app.background:
+            if not isinstance(frames, FrameFiles):
+                frameFiles = FrameFiles(getFrameCacheDirectory(cm))
+                if type(frames) == dict:
+                    frameFiles.update(frames)
+                frames = frameFiles
+        elif type(frames) != dict:
+            frames = dict(frames.items()) if isinstance(frames, FrameFiles) and not bpy.app.background else {}
+        # add frame before caching frames so cache size includes it
+        frames[str(curFrame)] = bricksDict
+        bricker_bfm_cache[cm.id] = frames
+
+def loadBFMCache(cm):
+    """ returns bricksDict (or dict of bricksDicts by frame) from deep cache (None if frame files can't be found) """
+    if cm.BFMCache.startswith(frameCacheStrPrefix):
+        return getFrameFiles(cm)
+    cacheStr = cm.BFMCache
+    prefetch = bricker_bfm_prefetch.pop(cm.id, None)
+    if prefetch is not None:
+        thread, prefetched = prefetch
+        thread.join()
+        # make sure deep cache hasn't changed since prefetch started
+        if prefetched.get("cacheStr") == cacheStr and "bricksDict" in prefetched:
+            return prefetched["bricksDict"]
+    return decodeBFMCache(cacheStr)
+
+def prefetchBricksDict(cm):
+    """ start decoding deep cache of 'cm' in background thread (result is used by next call to 'loadBFMCache') """
+    if cm.BFMCache in ("", "null") or cm.BFMCache.startswith(frameCacheStrPrefix) or bricker_bfm_cache.get(cm.id) is not None:
+        return
+    prefetched = {"cacheStr":cm.BFMCache}
+    def decode():
+        try:
+            prefetched["bricksDict"] = decodeBFMCache(prefetched["cacheStr"])
+        except Exception as e:
+            print("ERROR in prefetchBricksDict:", e)
+    thread = threading.Thread(target=decode, daemon=True)
+    thread.start()
+    bricker_bfm_prefetch[cm.id] = (thread, prefetched)
+
+def storeEvictedBricksDict(cm_id, cache):
+    """ send bricksDict evicted from python cache to blender cache (returns False if it can't be stored, so it isn't evicted) """
+    cm = getItemByID(bpy.context.scene.cmlist, cm_id)
+    if cm is None:
+        return False
+    if cache is None:
+        return True
+    try:
+        cm.BFMCache = cache.toCacheStr() if isinstance(cache, FrameFiles) else encodeBFMCache(cache)
+    except AttributeError:
+        # blender data can't be written in current context (e.g. while drawing the UI)
+        return False
+    return True
+
+bricker_bfm_cache.onEvict = storeEvictedBricksDict
+
+def relocateFrameFiles(bricker_bfm_cache):
+    """ copy frame files to directory next to .blend file (if saved to a new location) """
+    scn = bpy.context.scene
+    for cm_id, cache in bricker_bfm_cache.items():
+        cm = getItemByID(scn.cmlist, cm_id)
+        if cm and isinstance(cache, FrameFiles):
+            cache.relocate(getFrameCacheDirectory(cm))
@@ -0,0 +1,127 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for lattice mask operations used in shell classification (needs only NumPy, not Blender)
+
+Usage:
+    python lib/bricksDict/test_lattice_masks.py
+"""
+
+# System imports
+import importlib.util
+import os
+import numpy as np
+
+# load 'lattice_masks' by path so these tests run without importing the Bricker package (which requires 'bpy')
+_spec = importlib.util.spec_from_file_location("lattice_masks", os.path.join(os.path.dirname(os.path.abspath(__file__)), "lattice_masks.py"))
+lattice_masks = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lattice_masks)
+
+
+def getNeighbors(loc, shape):
+    """ returns 6-adjacent locations of 'loc' inside 'shape' """
+    for axis in range(3):
+        for offset in (1, -1):
+            neighbor = list(loc)
+            neighbor[axis] += offset
+            if 0 <= neighbor[axis] < shape[axis]:
+                yield tuple(neighbor)
+
+
+def referenceFloodFill(passable, seeds):
+    """ returns mask of 'passable' locations 6-connected to 'seeds' (breadth first search over single locations) """
+    reached = np.zeros(passable.shape, dtype=bool)
+    queue = [tuple(loc) for loc in np.argwhere(seeds & passable)]
+    for loc in queue:
+        reached[loc] = True
+    while queue:
+        loc = queue.pop()
+        for neighbor in getNeighbors(loc, passable.shape):
+            if passable[neighbor] and not reached[neighbor]:
+                reached[neighbor] = True
+                queue.append(neighbor)
+    return reached
+
+
+def test_flood_fill_hollow_box():
+    passable = np.ones((7, 7, 7), dtype=bool)
+    passable[1:6, 1:6, 1:6] = False
+    passable[2:5, 2:5, 2:5] = True
+    boundary = np.ones(passable.shape, dtype=bool)
+    boundary[1:-1, 1:-1, 1:-1] = False
+    # closed walls keep the inside from being reached
+    outside = lattice_masks.floodFill(passable, boundary)
+    assert not outside[2:5, 2:5, 2:5].any()
+    assert outside.sum() == 7 ** 3 - 5 ** 3
+    # a hole in one wall connects the inside to the outside
+    passable[1, 3, 3] = True
+    outside = lattice_masks.floodFill(passable, boundary)
+    assert outside[2:5, 2:5, 2:5].all()
+
+
+def test_flood_fill_matches_reference():
+    rand = np.random.RandomState(0)
+    for density in (0.2, 0.4, 0.6):
+        passable = rand.rand(12, 9, 10) > density
+        seeds = rand.rand(*passable.shape) > 0.97
+        assert np.array_equal(lattice_masks.floodFill(passable, seeds), referenceFloodFill(passable, seeds))
+
+
+def test_adjacent_mask_matches_reference():
+    rand = np.random.RandomState(1)
+    mask = rand.rand(8, 6, 7) > 0.9
+    # corner and edge locations only have neighbors inside the lattice
+    mask[0, 0, 0] = mask[-1, 3, -1] = True
+    expected = np.zeros(mask.shape, dtype=bool)
+    for loc in np.argwhere(mask):
+        for neighbor in getNeighbors(tuple(loc), mask.shape):
+            expected[neighbor] = True
+    assert np.array_equal(lattice_masks.getAdjacentMask(mask), expected)
+
+
+def test_triangles_overlap_boxes():
+    halfSize = np.array([0.5, 0.5, 0.5])
+    triangles = np.array([
+        # through box center
+        [[-1, -1, 0], [2, -1, 0], [-1, 2, 0]],
+        # parallel to box face just inside and just outside of box
+        [[-1, -1, 0.49], [2, -1, 0.49], [-1, 2, 0.49]],
+        [[-1, -1, 0.51], [2, -1, 0.51], [-1, 2, 0.51]],
+        # entirely inside box
+        [[-0.1, -0.1, -0.1], [0.1, -0.1, 0], [0, 0.1, 0.1]],
+        # bounding box overlaps box corner, but triangle doesn't (separated by cross product of edge and z axis)
+        [[1.2, 0.4, 0], [0.4, 1.2, 0], [1.2, 1.2, 0]],
+        # larger triangle covering box corner
+        [[1.2, -0.4, 0], [-0.4, 1.2, 0], [1.2, 1.2, 0]],
+        # tilted triangle passing near box edge (separated by triangle normal)
+        [[0.8, -1, 0.8], [0.8, 1, 0.8], [1.8, 0, -0.2]],
+    ], dtype=np.float64)
+    expected = [True, True, False, True, False, True, False]
+    centers = np.zeros((len(triangles), 3))
+    overlap = lattice_masks.trianglesOverlapBoxes(triangles[:, 0], triangles[:, 1], triangles[:, 2], centers, halfSize)
+    assert overlap.tolist() == expected
+    # results don't depend on where the boxes are in the lattice
+    offsets = np.array([[3, -2, 5]] * len(triangles), dtype=np.float64)
+    overlap = lattice_masks.trianglesOverlapBoxes(triangles[:, 0] + offsets, triangles[:, 1] + offsets, triangles[:, 2] + offsets, centers + offsets, halfSize)
+    assert overlap.tolist() == expected
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+    print("All lattice mask tests passed")
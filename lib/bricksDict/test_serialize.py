@@ -0,0 +1,163 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Tests for binary BFMCache serialization of bricksDicts
+
+Usage (from Blender's python, with Bricker enabled):
+    blender -b --python-expr "import pytest; pytest.main(['<path to Bricker>/lib/bricksDict/test_serialize.py'])"
+"""
+
+# System imports
+import base64
+import json
+import numpy as np
+import pytest
+
+# Addon imports
+from .columns import BricksDict, bricksDictFields
+from .serialize import *
+from ...functions.common import compress_str
+from ...functions.general import packKey, keyToStr
+
+
+def newEntry(loc, **fields):
+    """ returns bricksDict entry at 'loc' with default values for fields not in 'fields' """
+    entry = {field:None for field in bricksDictFields}
+    entry.update(name="Bricker_src__" + ",".join(str(i) for i in loc), loc=list(loc), val=0, draw=False, co=(0, 0, 0), mat_name="", custom_mat_name=False, attempted_merge=False, obscures=[False] * 6, flipped=False, rotated=False)
+    entry.update(fields)
+    return entry
+
+
+def makeBricksDict(width=4, seed=0):
+    """ returns BricksDict of 'width' x 'width' x 3 lattice with bricks of varying sizes and materials """
+    rand = np.random.RandomState(seed)
+    bricksDict = BricksDict(namePrefix="Bricker_src__")
+    for x in range(width):
+        for y in range(width):
+            for z in range(3):
+                draw = bool(rand.rand() < 0.7)
+                bricksDict[packKey(x, y, z)] = newEntry(
+                    (x, y, z),
+                    val=float(rand.choice([0, 0.5, 1])),
+                    draw=draw,
+                    co=(x * 0.1, y * 0.1, z * 0.12),
+                    near_face=int(rand.randint(0, 100)) if draw else None,
+                    near_intersection=(x * 0.1, y * 0.1 + 0.05, z * 0.12) if draw else None,
+                    rgba=[0.1, 0.2, 0.3, 1.0] if x % 2 else None,
+                    mat_name=["", "ABS Red", "ABS Blue"][(x + y) % 3],
+                    top_exposed=z == 2 if draw else None,
+                    bot_exposed=z == 0 if draw else None,
+                    obscures=[draw] * 6,
+                )
+    # merge pairs of locations along x into 2x1 bricks
+    for y in range(width):
+        for z in range(3):
+            for x in range(0, width - 1, 2):
+                key = packKey(x, y, z)
+                bricksDict[key]["parent"] = "self"
+                bricksDict[key]["size"] = [2, 1, 1]
+                bricksDict[key]["type"] = "PLATE"
+                bricksDict[packKey(x + 1, y, z)]["parent"] = key
+    return bricksDict
+
+
+def toDicts(bricksDict):
+    """ returns comparable (JSON compatible) list of keys and entries of 'bricksDict' """
+    return [[key, json.loads(json.dumps(dict(entry)))] for key, entry in bricksDict.items()]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip(compress):
+    bricksDict = makeBricksDict()
+    out = deserializeBFMCache(serializeBFMCache(bricksDict, compress=compress))
+    assert isinstance(out, BricksDict)
+    assert toDicts(out) == toDicts(bricksDict)
+
+
+def test_round_trip_deleted_rows():
+    bricksDict = makeBricksDict()
+    # deleted keys keep their rows, and re-added keys reuse them
+    del bricksDict[packKey(0, 0, 0)]
+    del bricksDict[packKey(3, 3, 2)]
+    del bricksDict[packKey(1, 2, 1)]
+    bricksDict[packKey(1, 2, 1)] = newEntry((1, 2, 1), draw=True, mat_name="ABS Green")
+    bricksDict[packKey(5, 0, 0)] = newEntry((5, 0, 0), parent=packKey(1, 2, 1), size=[1, 1, 3])
+    out = decodeBFMCache(encodeBFMCache(bricksDict))
+    assert toDicts(out) == toDicts(bricksDict)
+    assert packKey(0, 0, 0) not in out and packKey(3, 3, 2) not in out
+    assert out.deletedRows == bricksDict.deletedRows
+    # entries can still be added to and removed from the loaded bricksDict
+    out[packKey(0, 0, 0)] = newEntry((0, 0, 0), val=1)
+    del out[packKey(5, 0, 0)]
+    assert out[packKey(0, 0, 0)]["val"] == 1 and packKey(5, 0, 0) not in out
+
+
+def test_round_trip_extra_fields():
+    bricksDict = makeBricksDict()
+    key0, key1, key2 = packKey(0, 1, 0), packKey(2, 2, 1), packKey(3, 0, 2)
+    bricksDict[key0]["custom_field"] = [1, "a", None]
+    # values that don't fit their typed columns are kept as extra fields
+    bricksDict[key1]["near_normal"] = (0.0, 0.0, 1.0)
+    # NumPy values are stored as python values
+    bricksDict[key2]["np_float"] = np.float32(0.5)
+    bricksDict[key2]["np_int"] = np.int64(3)
+    bricksDict[key2]["np_array"] = np.array([1, 2, 3])
+    out = deserializeBFMCache(serializeBFMCache(bricksDict))
+    assert out[key0]["custom_field"] == [1, "a", None]
+    assert out[key1]["near_normal"] == [0.0, 0.0, 1.0]
+    assert out[key2]["np_float"] == 0.5 and type(out[key2]["np_float"]) is float
+    assert out[key2]["np_int"] == 3 and type(out[key2]["np_int"]) is int
+    assert out[key2]["np_array"] == [1, 2, 3]
+    assert toDicts(out) == toDicts(deserializeBFMCache(serializeBFMCache(out)))
+
+
+def test_extra_fields_must_be_cacheable():
+    bricksDict = makeBricksDict()
+    bricksDict[packKey(0, 0, 0)]["custom_field"] = object()
+    with pytest.raises(TypeError):
+        serializeBFMCache(bricksDict)
+
+
+def test_round_trip_frames():
+    frames = {"1":makeBricksDict(seed=1), "2":makeBricksDict(width=6, seed=2), "3":BricksDict()}
+    del frames["2"][packKey(4, 4, 1)]
+    out = decodeBFMCache(encodeBFMCache(frames))
+    assert list(out.keys()) == ["1", "2", "3"]
+    for frame in frames:
+        assert toDicts(out[frame]) == toDicts(frames[frame])
+
+
+def test_legacy_hex_cache():
+    bricksDict = makeBricksDict().toDict()
+    # legacy caches are hex-encoded zlib compressed JSON, keyed by 'x,y,z' strings
+    legacy = {keyToStr(key):dict(entry, parent=entry["parent"] if entry["parent"] in (None, "self") else keyToStr(entry["parent"])) for key, entry in bricksDict.items()}
+    cacheStr = compress_str(json.dumps(legacy))
+    validateBFMCache(cacheStr)
+    out = decodeBFMCache(cacheStr)
+    assert toDicts(out) == toDicts(bricksDict)
+    # legacy frame caches are keyed by frame
+    out = decodeBFMCache(compress_str(json.dumps({"1":legacy, "2":legacy})))
+    assert list(out.keys()) == ["1", "2"] and toDicts(out["2"]) == toDicts(bricksDict)
+
+
+def test_invalid_cache():
+    with pytest.raises(ValueError):
+        deserializeBFMCache(b"BFMX" + bytes(12))
+    with pytest.raises(ValueError):
+        validateBFMCache(bfmCacheStrPrefix + base64.b64encode(b"XXXX" + bytes(12)).decode("ascii"))
+    with pytest.raises(ValueError):
+        validateBFMCache("not a cache")
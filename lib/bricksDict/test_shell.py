@@ -0,0 +1,68 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Tests for shell classification of voxelized lattices (see 'test_lattice_masks.py' for tests that don't need Blender)
+
+Usage (from Blender's python, with Bricker enabled):
+    blender -b --python-expr "import pytest; pytest.main(['<path to Bricker>/lib/bricksDict/test_shell.py'])"
+"""
+
+# System imports
+import numpy as np
+import pytest
+
+# Addon imports
+from . import generate
+from .lattice_masks import floodFill, getAdjacentMask
+
+
+def getSphereShell(radius, brickShell):
+    """ returns brickFreqMatrix of a sphere voxelized like the surface overlap and octree modes """
+    n = int(2 * radius) + 5
+    coordMatrix = (np.indices((n, n, n)).transpose(1, 2, 3, 0) - (n - 1) / 2).astype(np.float32)
+    # mark cells the sphere surface passes through as shell
+    minDists = np.linalg.norm(np.maximum(np.abs(coordMatrix) - 0.5, 0), axis=3)
+    maxDists = np.linalg.norm(np.abs(coordMatrix) + 0.5, axis=3)
+    surface = (minDists <= radius) & (maxDists >= radius)
+    brickFreqMatrix = np.zeros((n, n, n), dtype=np.int8)
+    brickFreqMatrix[surface] = 1
+    faceIdxMatrix = generate.newFaceIdxMatrix((n, n, n))
+    normals = coordMatrix / np.maximum(np.linalg.norm(coordMatrix, axis=3), 1e-6)[..., None]
+    faceIdxMatrix["idx"][surface] = 0
+    faceIdxMatrix["loc"][surface] = normals[surface] * radius
+    faceIdxMatrix["normal"][surface] = normals[surface]
+    # flood fill outside from lattice boundary
+    boundary = np.ones((n, n, n), dtype=bool)
+    boundary[1:-1, 1:-1, 1:-1] = False
+    outside = floodFill(brickFreqMatrix != 1, boundary)
+    brickFreqMatrix[(brickFreqMatrix == 0) & ~outside] = -1
+    generate.setBrickShellSide(brickFreqMatrix, faceIdxMatrix, coordMatrix, brickShell)
+    generate.adjustBFM(brickFreqMatrix, matShellDepth=0, faceIdxMatrix=faceIdxMatrix, axes="xyz")
+    return brickFreqMatrix, faceIdxMatrix
+
+
+@pytest.mark.parametrize("brickShell", ["INSIDE", "OUTSIDE", "INSIDE AND OUTSIDE"])
+@pytest.mark.parametrize("radius", [5.3, 10.4, 20.2])
+def test_sphere_shell_is_closed(brickShell, radius):
+    brickFreqMatrix, faceIdxMatrix = getSphereShell(radius, brickShell)
+    removed = brickFreqMatrix == generate.bfmRemoved
+    internal = ~removed & (brickFreqMatrix != 1)
+    # no internal location may touch a removed location
+    assert not np.any(internal & getAdjacentMask(removed))
+    # all shell locations have a nearest face
+    assert np.all(faceIdxMatrix["idx"][brickFreqMatrix == 1] != -1)
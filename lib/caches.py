@@ -15,16 +15,169 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+# System imports
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import sys
+
+# Blender imports
+# NONE!
+
+# Addon imports
+# NONE!
+
+
+class LRUCache(MutableMapping):
+    """ dictionary that evicts least recently used entries when the approximate size of its entries exceeds a memory budget
+
+    Keyword Arguments:
+        name       -- name of cache (for 'getCacheStats')
+        budgetPref -- name of addon preference with memory budget in MB (0 for no limit)
+        getSize    -- function returning approximate size of a value in bytes
+        onEvict    -- function called with (key, value) before entry is evicted (entry is kept if it returns False)
+    """
+
+    def __init__(self, name, budgetPref, getSize, onEvict=None):
+        self.name = name
+        self.budgetPref = budgetPref
+        self.getSize = getSize
+        self.onEvict = onEvict
+        self.entries = OrderedDict()
+        self.totalSize = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        managedCaches.append(self)
+
+    def __getitem__(self, key):
+        try:
+            value, _ = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        size = self.getSize(value)
+        if key in self.entries:
+            self.totalSize -= self.entries[key][1]
+        self.entries[key] = (value, size)
+        self.entries.move_to_end(key)
+        self.totalSize += size
+        self.evict()
+
+    def __delitem__(self, key):
+        _, size = self.entries.pop(key)
+        self.totalSize -= size
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def peek(self, key, default=None):
+        """ returns value for 'key' without updating its position or hit/miss counters """
+        return self.entries[key][0] if key in self.entries else default
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.totalSize = 0
+
+    def getBudget(self):
+        """ returns memory budget of cache in bytes (0 for no limit) """
+        # imported here since 'functions' imports this module
+        from ..functions.common import get_addon_preferences
+        prefs = get_addon_preferences()
+        return getattr(prefs, self.budgetPref) * 1000000 if prefs else 0
+
+    def evict(self):
+        """ evict least recently used entries until cache fits in its budget (the most recently used entry is always kept) """
+        budget = self.getBudget()
+        if budget <= 0 or self.totalSize <= budget:
+            return
+        for key in list(self.entries)[:-1]:
+            value, size = self.entries[key]
+            if self.onEvict is not None and self.onEvict(key, value) is False:
+                continue
+            del self[key]
+            self.evictions += 1
+            if self.totalSize <= budget:
+                break
+
+    def updateSize(self, key):
+        """ recompute size of entry for 'key' and mark it most recently used (call after the value was modified in place) """
+        value, size = self.entries[key]
+        self.entries[key] = (value, self.getSize(value))
+        self.entries.move_to_end(key)
+        self.totalSize += self.entries[key][1] - size
+        self.evict()
+
+    def getStats(self):
+        """ returns dictionary of cache statistics """
+        return {"name":self.name, "entries":len(self.entries), "bytes":self.totalSize, "budget":self.getBudget(), "hits":self.hits, "misses":self.misses, "evictions":self.evictions}
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def getCacheStats():
+    """ returns list of statistics dictionaries for all managed caches """
+    return [cache.getStats() for cache in managedCaches]
+
+
+def getBricksDictSize(bricksDict):
+    """ returns approximate size of bricksDict (or dict of bricksDicts by frame) in bytes """
+    if bricksDict is None:
+        return 0
+    elif hasattr(bricksDict, "columns"):
+        # columnar BricksDict
+        return sum(col.nbytes for col in bricksDict.columns.values()) + sys.getsizeof(bricksDict.keyRows) + sys.getsizeof(bricksDict.rowKeys)
+    elif not isinstance(bricksDict, dict) or len(bricksDict) == 0:
+        # e.g. FrameFiles (frames are accounted for in 'bricker_frame_cache')
+        return 0
+    entry = next(iter(bricksDict.values()))
+    if isinstance(entry, dict) and "loc" not in entry:
+        return sum(getBricksDictSize(frame) for frame in bricksDict.values())
+    # estimate size of dictionary entries from first entry
+    entrySize = sys.getsizeof(entry) + sum(sys.getsizeof(value) for value in entry.values())
+    return sys.getsizeof(bricksDict) + len(bricksDict) * entrySize
+
+
+def getBMeshesSize(bms):
+    """ returns approximate size of list of bmeshes in bytes """
+    # approximate sizes of BMVert/BMEdge/BMFace/BMLoop structs with default custom data
+    return sum(len(bm.verts) * 80 + len(bm.edges) * 80 + len(bm.faces) * 96 + len(bm.loops) * 72 for bm in bms) if bms else 0
+
+
+managedCaches = []
+
 # initialize the brick bmesh cache dictionary
-bricker_mesh_cache = {}
+bricker_mesh_cache = LRUCache("Brick Meshes", "meshCacheMemoryLimit", getBMeshesSize)
 
 # initialize the source mesh cache dictionary
 bricker_source_mesh_cache = {}
 
-# initialize the BFMCache
-bricker_bfm_cache = {}
+# initialize the BFMCache (evicted bricksDicts are stored to deep cache, see 'storage.py')
+bricker_bfm_cache = LRUCache("Matrices", "matrixCacheMemoryLimit", getBricksDictSize)
+
+# initialize the dictionary of bricksDicts being loaded from deep cache in background threads
+bricker_bfm_prefetch = {}
+
+# initialize the frame file cache (bricksDicts loaded from frame files, see 'frame_cache.py')
+bricker_frame_cache = LRUCache("Animation Frames", "frameCacheMemoryLimit", getBricksDictSize)
+
+# initialize the smoke grid cache dictionary (preallocated grid arrays for each model, keyed by domain resolution)
+bricker_smoke_cache = {}
 
 # cache functions
 def cacheExists(cm):
     """check if light or deep matrix cache exists for cmlist item"""
-    return bricker_bfm_cache.get(cm.id) is not None or cm.BFMCache not in ("", "null")
+    return bricker_bfm_cache.peek(cm.id) is not None or cm.BFMCache not in ("", "null")
@@ -53,6 +53,46 @@ class BRICKER_AP_preferences(AddonPreferences):
                ("ON", "On", "Run brickify calculations in background"),
                ("OFF", "Off", "Run brickify calculations in active Blender window (user interface will freeze during calculation)")],
         default="AUTO")
+    voxelizationCores = IntProperty(
+        name="Voxelization Cores",
+        description="Number of worker processes used for 'Parallel Scanline' voxelization (0 to use all available cores)",
+        min=0, max=256,
+        default=0)
+    mergeCores = IntProperty(
+        name="Merge Cores",
+        description="Number of worker processes used for 'Parallel Merge' (0 to use all available cores)",
+        min=0, max=256,
+        default=0)
+    prefetchActiveModel = BoolProperty(
+        name="Preload Active Model",
+        description="When a file is opened, load the active model's matrix cache in a background thread (other models are loaded when first used)",
+        default=True)
+    frameCacheMemoryLimit = IntProperty(
+        name="Frame Cache Memory Limit (MB)",
+        description="Maximum memory used by animation frames loaded from frame cache files (least recently used frames are unloaded first; 0 for no limit)",
+        min=0,
+        default=1024)
+    undoMode = EnumProperty(
+        name="Undo Mode",
+        description="How Bricker stores undo states for model customizations (takes effect when a file is opened)",
+        items=[("DELTA", "Changes", "Store only the matrix entries changed by each customization (uses less memory)"),
+               ("SNAPSHOT", "Full Copies", "Store a full copy of each affected matrix for each customization")],
+        default="DELTA")
+    undoMemoryLimit = IntProperty(
+        name="Undo Memory Limit (MB)",
+        description="Maximum memory used by Bricker undo states (oldest states are removed first; 0 for no limit)",
+        min=0,
+        default=512)
+    matrixCacheMemoryLimit = IntProperty(
+        name="Matrix Cache Memory Limit (MB)",
+        description="Maximum memory used by model matrices kept in memory (least recently used matrices are moved to the .blend data first; 0 for no limit)",
+        min=0,
+        default=2048)
+    meshCacheMemoryLimit = IntProperty(
+        name="Brick Mesh Cache Memory Limit (MB)",
+        description="Maximum memory used by cached brick meshes (least recently used meshes are removed first; 0 for no limit)",
+        min=0,
+        default=256)
 
 	# addon updater preferences
     auto_check_update = bpy.props.BoolProperty(
@@ -106,6 +146,44 @@ class BRICKER_AP_preferences(AddonPreferences):
         col = split.column(align=True)
         col.prop(prefs, "brickifyInBackground", text="")
         col1.separator()
+        row = col1.row(align=False)
+        split = layout_split(row, factor=0.275)
+        col = split.column(align=True)
+        col.label(text="Voxelization Cores:")
+        col = split.column(align=True)
+        col.prop(prefs, "voxelizationCores", text="")
+        col1.separator()
+        row = col1.row(align=False)
+        split = layout_split(row, factor=0.275)
+        col = split.column(align=True)
+        col.label(text="Merge Cores:")
+        col = split.column(align=True)
+        col.prop(prefs, "mergeCores", text="")
+        col1.separator()
+        row = col1.row(align=False)
+        split = layout_split(row, factor=0.275)
+        col = split.column(align=True)
+        col.label(text="Cache Memory Limits (MB):")
+        col = split.column(align=True)
+        col.prop(prefs, "matrixCacheMemoryLimit", text="Matrices")
+        col.prop(prefs, "frameCacheMemoryLimit", text="Animation Frames")
+        col.prop(prefs, "meshCacheMemoryLimit", text="Brick Meshes")
+        col1.separator()
+        row = col1.row(align=False)
+        split = layout_split(row, factor=0.275)
+        col = split.column(align=True)
+        col.label(text="Matrix Cache:")
+        col = split.column(align=True)
+        col.prop(prefs, "prefetchActiveModel")
+        col1.separator()
+        row = col1.row(align=False)
+        split = layout_split(row, factor=0.275)
+        col = split.column(align=True)
+        col.label(text="Undo:")
+        col = split.column(align=True)
+        col.prop(prefs, "undoMode", text="")
+        col.prop(prefs, "undoMemoryLimit", text="Memory Limit (MB)")
+        col1.separator()
 
         # updater draw function
         addon_updater_ops.update_settings_ui(self,context)
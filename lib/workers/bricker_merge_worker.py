@@ -0,0 +1,362 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# NOTE: This module is imported by worker processes spawned from Blender's python
+#       executable, so it must not depend on 'bpy', 'mathutils', or the Bricker package
+
+# System imports
+import bisect
+import math
+import random
+import time
+import numpy as np
+
+
+def getBestSize(depths, allowedDepths, sortOrder, preferLargest, maxWidth, maxDepth):
+    """ returns (width, depth) of brick 'attemptMerge' would choose (None if only the default size fits)
+
+    Keyword Arguments:
+        depths        -- max available depth at the seed for each width
+        allowedDepths -- allowed depths by width (None if any size is allowed)
+        sortOrder     -- 'attemptMerge' random sort order (0 or 1)
+        preferLargest -- choose brick with the largest area
+        maxWidth      -- cm.maxWidth
+        maxDepth      -- cm.maxDepth
+    """
+    bestKey = None
+    bestSize = None
+    for w, d in enumerate(depths, 1):
+        if allowedDepths is not None:
+            allowed = allowedDepths[w - 1]
+            idx = bisect.bisect_right(allowed, d)
+            if idx == 0:
+                continue
+            d = allowed[idx - 1]
+        if preferLargest:
+            # sizes outside of the first orientation are appended last by 'attemptMerge' (wins ties)
+            key = (w * d, not (w <= maxWidth and d <= maxDepth), w, d)
+        elif sortOrder == 0:
+            key = (w, d)
+        else:
+            key = (d, w)
+        if bestKey is None or key > bestKey:
+            bestKey = key
+            bestSize = (w, d)
+    return bestSize
+
+
+def getRunLengths(ok, labels):
+    """ returns length of the run of 'ok' cells with the same label starting at each cell (in +y direction) """
+    numY = ok.shape[1]
+    same = np.zeros(ok.shape, dtype=bool)
+    same[:, :-1] = ok[:, :-1] & ok[:, 1:] & (labels[:, :-1] == labels[:, 1:])
+    idxs = np.broadcast_to(np.arange(numY), ok.shape)
+    runEnds = np.where(same, numY, idxs)
+    runEnds = np.minimum.accumulate(runEnds[:, ::-1], axis=1)[:, ::-1]
+    return np.where(ok, runEnds - idxs + 1, 0)
+
+
+def getLargestBrickAreas(runs, labels, getArea):
+    """ returns area of the largest brick in maximal rectangles anchored at each cell (stack-based histogram scan of 'runs' in x direction) """
+    numX, numY = runs.shape
+    areas = [[0] * numY for x in range(numX)]
+    runs = runs.tolist()
+    labels = labels.tolist()
+    for y in range(numY):
+        stack = []
+        for x in range(numX + 1):
+            h = runs[x][y] if x < numX else 0
+            # bricks can't span multiple labels
+            if 0 < x < numX and labels[x][y] != labels[x - 1][y]:
+                while stack:
+                    start, height = stack.pop()
+                    areas[start][y] = max(areas[start][y], getArea(start, y, x - start, height))
+            start = x
+            while stack and stack[-1][1] >= h:
+                start, height = stack.pop()
+                areas[start][y] = max(areas[start][y], getArea(start, y, x - start, height))
+            if h > 0:
+                stack.append((start, h))
+    return areas
+
+
+def getLargestFirstOrder(task):
+    """ returns seed indices of layer 'task' ordered by the area of the largest brick that fits at each seed """
+    numX, numY = task["numX"], task["numY"]
+    maxWidth, maxDepth = task["maxWidth"], task["maxDepth"]
+    maxL = max(maxWidth, maxDepth)
+    cells = task["cells"]
+    tables = task["tables"]
+    cellTables = {cell:tables[tableIdx] for cell, tableIdx in zip(cells, task["tableIdxs"])}
+    areaCache = {}
+    def getArea(x, y, w, h):
+        table = cellTables[x * numY + y]
+        cacheKey = (id(table), min(w, maxL), min(h, maxL))
+        area = areaCache.get(cacheKey)
+        if area is None:
+            capDepths, allowedDepths = table
+            depths = [min(h, capDepths[i]) for i in range(cacheKey[1])]
+            size = getBestSize(depths, allowedDepths, 0, True, maxWidth, maxDepth)
+            area = 1 if size is None else size[0] * size[1]
+            areaCache[cacheKey] = area
+        return area
+    ok = task["avail"].reshape(numX, numY)
+    labels = task["labels"].reshape(numX, numY)
+    areas = getLargestBrickAreas(getRunLengths(ok, labels), labels, getArea)
+    areas = [areas[cell // numY][cell % numY] for cell in cells]
+    return sorted(task["order"], key=lambda idx: -areas[idx])
+
+
+def mergeLayerTask(task):
+    """ returns (task id, list of (seed index, width, depth) for merged bricks) for layer 'task'
+
+    Keyword Arguments (keys of 'task'):
+        id             -- id returned with the results
+        numX, numY     -- dimensions of layer grid (padded with unavailable cells on the +x and +y sides)
+        cells          -- grid cell of each seed
+        order          -- seed indices in merge order
+        labels         -- material label of each grid cell (-1 where there's no key; 0 is the internal material)
+        avail          -- availability of each grid cell for merging
+        skip           -- grid cells that can't start a brick
+        tables         -- list of (max depth by width, allowed depths by width) size tables
+        tableIdxs      -- index into 'tables' for each seed
+        height3Only    -- seeds that can't merge (only tall bricks allowed at a height of 1)
+        preferLargest  -- seeds that merge into the brick with the largest area
+        randOrders     -- 'attemptMerge' random sort order for each merged seed (None for default sizes only)
+        maxWidth       -- cm.maxWidth
+        maxDepth       -- cm.maxDepth
+        mergeInternals -- merge internal bricks with bricks of any material
+        largestFirst   -- order seeds by the largest brick that fits at each seed and prefer largest bricks
+    """
+    numY = task["numY"]
+    maxWidth, maxDepth = task["maxWidth"], task["maxDepth"]
+    maxL = max(maxWidth, maxDepth)
+    mergeInternals = task["mergeInternals"]
+    largestFirst = task["largestFirst"]
+    cells = task["cells"]
+    tables = task["tables"]
+    tableIdxs = task["tableIdxs"]
+    height3Only = task["height3Only"]
+    preferLargest = task["preferLargest"]
+    randOrders = task["randOrders"]
+    order = getLargestFirstOrder(task) if largestFirst else task["order"]
+    labelGrid = task["labels"].tolist()
+    availGrid = task["avail"].tolist()
+    skipGrid = task["skip"].tolist()
+    numMerged = 0
+    bricks = []
+    for idx in order:
+        cell = cells[idx]
+        if skipGrid[cell]:
+            availGrid[cell] = False
+            continue
+        size = None
+        if randOrders is not None:
+            sortOrder = randOrders[numMerged]
+            numMerged += 1
+            capDepths, allowedDepths = tables[tableIdxs[idx]]
+            label = labelGrid[cell]
+            anyLabel = mergeInternals and label == 0
+            # get max available depth at the seed cell for each width
+            depths = []
+            limit = 0 if height3Only[idx] else maxL
+            for i in range(maxL):
+                limit = min(limit, capDepths[i])
+                c = cell + i * numY
+                j = 0
+                while j < limit and availGrid[c + j] and (anyLabel or labelGrid[c + j] == label or (mergeInternals and labelGrid[c + j] == 0)):
+                    j += 1
+                if j == 0:
+                    break
+                depths.append(j)
+                limit = j
+            size = getBestSize(depths, allowedDepths, sortOrder, largestFirst or preferLargest[idx], maxWidth, maxDepth)
+        w, d = size or (1, 1)
+        # remove cells in new brick from available cells
+        for i in range(w):
+            c = cell + i * numY
+            for j in range(d):
+                availGrid[c + j] = False
+                skipGrid[c + j] = True
+        bricks.append((idx, w, d))
+    return task["id"], bricks
+
+
+def getEdgeGrids(ids):
+    """ returns (-x, +x, -y, +y) grids flagging cells on that side of their brick (2D grid of brick ids, -1 where there's no brick) """
+    present = ids != -1
+    padded = np.pad(ids, 1, mode="constant", constant_values=-1)
+    return (present & (padded[:-2, 1:-1] != ids),
+            present & (padded[2:, 1:-1] != ids),
+            present & (padded[1:-1, :-2] != ids),
+            present & (padded[1:-1, 2:] != ids))
+
+
+def getLayerAlignedEdges(ids, belowIds):
+    """ returns number of brick edges in layer 'ids' aligned with edges on the same side of bricks in layer 'belowIds' (2D grids of brick ids, -1 where there's no brick) """
+    # bricks extending through both layers have no seam between them
+    seam = ids != belowIds
+    return sum(int(np.count_nonzero(edges & belowEdges & seam)) for edges, belowEdges in zip(getEdgeGrids(ids), getEdgeGrids(belowIds)))
+
+
+def optimizeLayerTask(task):
+    """ returns (task id, list of (seed index, width, depth) for merged bricks) for layer 'task', minimizing edges aligned with the layer below
+
+    Bricks are placed greedily by cost per cell, then windows of bricks are removed and
+    re-placed (simulated annealing) until 'timeLimit' runs out. The cost of a brick is the
+    number of its edges aligned with edges of bricks below it plus 'brickWeight', so seams
+    are scored incrementally from prefix sums of the edges below.
+
+    Keyword Arguments (keys of 'task', in addition to those of 'mergeLayerTask'):
+        below       -- id of the brick below each grid cell (-1 where there's no brick)
+        brickWeight -- cost of each brick (in aligned edges)
+        timeLimit   -- seconds to spend on local search
+        seed        -- random seed for local search
+    """
+    numX, numY = task["numX"], task["numY"]
+    maxL = max(task["maxWidth"], task["maxDepth"])
+    mergeInternals = task["mergeInternals"]
+    cells = task["cells"]
+    tables = task["tables"]
+    tableIdxs = task["tableIdxs"]
+    height3Only = task["height3Only"]
+    brickWeight = task["brickWeight"]
+    rand = random.Random(task["seed"])
+    labelGrid = task["labels"].tolist()
+    availGrid = task["avail"].tolist()
+    skipGrid = task["skip"].tolist()
+    seedIdxs = [-1] * (numX * numY)
+    for idx, cell in enumerate(cells):
+        seedIdxs[cell] = idx
+    # get prefix sums of edges of bricks below (x sides in +y direction, y sides in +x direction)
+    minusX, plusX, minusY, plusY = getEdgeGrids(task["below"].reshape(numX, numY))
+    minusXSums, plusXSums = (np.pad(np.cumsum(edges, axis=1), ((0, 0), (1, 0))).tolist() for edges in (minusX, plusX))
+    minusYSums, plusYSums = (np.pad(np.cumsum(edges, axis=0), ((1, 0), (0, 0))).tolist() for edges in (minusY, plusY))
+
+    def getCost(cell, w, d):
+        x, y = divmod(cell, numY)
+        x1, y1 = x + w - 1, y + d - 1
+        return (minusXSums[x][y1 + 1] - minusXSums[x][y] + plusXSums[x1][y1 + 1] - plusXSums[x1][y] +
+                minusYSums[x1 + 1][y] - minusYSums[x][y] + plusYSums[x1 + 1][y1] - plusYSums[x][y1] + brickWeight)
+
+    def getSizes(cell):
+        """ returns sizes of bricks that fit at free cell 'cell' """
+        idx = seedIdxs[cell]
+        capDepths, allowedDepths = tables[tableIdxs[idx]]
+        label = labelGrid[cell]
+        anyLabel = mergeInternals and label == 0
+        sizes = []
+        limit = 0 if height3Only[idx] else maxL
+        for i in range(maxL):
+            limit = min(limit, capDepths[i])
+            c = cell + i * numY
+            j = 0
+            while j < limit and free[c + j] and (anyLabel or labelGrid[c + j] == label or (mergeInternals and labelGrid[c + j] == 0)):
+                j += 1
+            if j == 0:
+                break
+            if allowedDepths is None:
+                sizes += [(i + 1, d) for d in range(1, j + 1)]
+            else:
+                allowed = allowedDepths[i]
+                sizes += [(i + 1, d) for d in allowed[:bisect.bisect_right(allowed, j)]]
+            limit = j
+        if len(sizes) == 0 or sizes[0] != (1, 1):
+            sizes.insert(0, (1, 1))
+        return sizes
+
+    def setBrick(cell, w, d, cost):
+        for i in range(w):
+            c = cell + i * numY
+            for j in range(d):
+                free[c + j] = False
+                owners[c + j] = cell
+        bricks[cell] = (w, d, cost)
+
+    def removeBrick(cell):
+        w, d, cost = bricks.pop(cell)
+        for i in range(w):
+            c = cell + i * numY
+            for j in range(d):
+                free[c + j] = True
+                owners[c + j] = -1
+        return cell, w, d, cost
+
+    def placeBrick(cell, exploreRate):
+        sizes = getSizes(cell)
+        if exploreRate > 0 and rand.random() < exploreRate:
+            w, d = rand.choice(sizes)
+            cost = getCost(cell, w, d)
+        else:
+            cost, w, d = min(((getCost(cell, w, d), w, d) for w, d in sizes), key=lambda size: (size[0] / (size[1] * size[2]), -size[1] * size[2]))
+        setBrick(cell, w, d, cost)
+        return cost
+
+    # place bricks greedily in grid order (bricks grow in +x and +y directions from free cells)
+    movableCells = [cell for cell in sorted(cells) if availGrid[cell]]
+    free = availGrid.copy()
+    owners = [-1] * (numX * numY)
+    bricks = {}
+    totalCost = sum(placeBrick(cell, 0) for cell in movableCells if free[cell])
+
+    # improve layer with simulated annealing, tracking accepted moves since the best layer found
+    bestCost = totalCost
+    moves = []
+    maxIters = len(movableCells) * 100
+    startTime = time.time()
+    timeLimit = task["timeLimit"]
+    for it in range(maxIters):
+        elapsed = time.time() - startTime
+        if elapsed >= timeLimit:
+            break
+        temperature = max(1 - elapsed / timeLimit, 0.02)
+        # remove bricks in a random window
+        x, y = divmod(rand.choice(movableCells), numY)
+        sizeX, sizeY = rand.randint(1, maxL), rand.randint(1, maxL)
+        anchors = {owners[c] for i in range(x, min(x + sizeX, numX)) for c in range(i * numY + y, i * numY + min(y + sizeY, numY)) if owners[c] != -1}
+        removed = [removeBrick(cell) for cell in anchors]
+        freedCells = sorted(cell + i * numY + j for cell, w, d, cost in removed for i in range(w) for j in range(d))
+        # re-place bricks in window
+        added = []
+        newCost = 0
+        for cell in freedCells:
+            if free[cell]:
+                newCost += placeBrick(cell, 0.25)
+                added.append(cell)
+        delta = newCost - sum(cost for cell, w, d, cost in removed)
+        if delta <= 0 or rand.random() < math.exp(-delta / temperature):
+            totalCost += delta
+            moves.append((removed, added))
+            if totalCost < bestCost:
+                bestCost = totalCost
+                moves = []
+        else:
+            for cell in added:
+                removeBrick(cell)
+            for brick in removed:
+                setBrick(*brick)
+    # revert to best layer found
+    for removed, added in reversed(moves):
+        for cell in added:
+            removeBrick(cell)
+        for brick in removed:
+            setBrick(*brick)
+
+    results = [(seedIdxs[cell], w, d) for cell, (w, d, cost) in bricks.items()]
+    # unmergable keys are drawn as default size bricks
+    results += [(idx, 1, 1) for idx, cell in enumerate(cells) if not skipGrid[cell] and not availGrid[cell]]
+    return task["id"], sorted(results)
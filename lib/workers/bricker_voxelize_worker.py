@@ -0,0 +1,116 @@
+# Copyright (C) 2019 Christopher Gearhart
+# chris@bblanimation.com
+# http://bblanimation.com/
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# NOTE: This module is imported by worker processes spawned from Blender's python
+#       executable, so it must not depend on 'bpy', 'mathutils', or the Bricker package
+
+# System imports
+import numpy as np
+
+
+# triangle data for the current worker process (set by 'initWorker')
+_triData = {}
+
+
+def initWorker(verts, tris, polyIdxs):
+    """ store serialized source triangles for all column bundles cast by this worker process
+
+    Keyword Arguments:
+        verts    -- (n, 3) array of vertex coordinates
+        tris     -- (m, 3) array of vertex indices for each triangle
+        polyIdxs -- (m,) array of source polygon indices for each triangle
+    """
+    verts = np.asarray(verts, dtype=np.float64)
+    tris = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+    triVerts = verts[tris]
+    normals = np.cross(triVerts[:, 1] - triVerts[:, 0], triVerts[:, 2] - triVerts[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    # remove degenerate triangles
+    valid = lengths > 0
+    _triData["triVerts"] = triVerts[valid]
+    _triData["normals"] = normals[valid] / lengths[valid, None]
+    _triData["polyIdxs"] = np.asarray(polyIdxs, dtype=np.int64)[valid]
+    _triData["mins"] = _triData["triVerts"].min(axis=1)
+    _triData["maxs"] = _triData["triVerts"].max(axis=1)
+
+
+def castColumn(triVerts, normals, polyIdxs, origin, axis:int, u_axis:int, v_axis:int, dirLen:float, miniDist:float):
+    """ returns sorted intersections of ray cast from 'origin' along positive 'axis' with the given triangles """
+    pu, pv = origin[u_axis], origin[v_axis]
+    a, b, c = triVerts[:, 0], triVerts[:, 1], triVerts[:, 2]
+    # get barycentric coordinates of projected ray origin in each projected triangle
+    d = (b[:, v_axis] - c[:, v_axis]) * (a[:, u_axis] - c[:, u_axis]) + (c[:, u_axis] - b[:, u_axis]) * (a[:, v_axis] - c[:, v_axis])
+    nonzero = d != 0
+    d = np.where(nonzero, d, 1)
+    w0 = ((b[:, v_axis] - c[:, v_axis]) * (pu - c[:, u_axis]) + (c[:, u_axis] - b[:, u_axis]) * (pv - c[:, v_axis])) / d
+    w1 = ((c[:, v_axis] - a[:, v_axis]) * (pu - c[:, u_axis]) + (a[:, u_axis] - c[:, u_axis]) * (pv - c[:, v_axis])) / d
+    w2 = 1 - w0 - w1
+    eps = -1e-9
+    hitMask = nonzero & (w0 >= eps) & (w1 >= eps) & (w2 >= eps)
+    if not hitMask.any():
+        return []
+    # get distance from ray origin to each intersection
+    t = w0[hitMask] * a[hitMask, axis] + w1[hitMask] * b[hitMask, axis] + w2[hitMask] * c[hitMask, axis] - origin[axis]
+    order = np.argsort(t, kind="mergesort")
+    hitNormals = normals[hitMask]
+    hitPolyIdxs = polyIdxs[hitMask]
+    hits = []
+    lastT = None
+    for i in order:
+        curT = float(t[i])
+        # skip intersections behind origin and duplicate intersections on shared edges
+        if curT < 0 or (lastT is not None and curT - lastT < miniDist):
+            continue
+        loc = [float(origin[0]), float(origin[1]), float(origin[2])]
+        loc[axis] += curT
+        normal = tuple(float(val) for val in hitNormals[i])
+        hits.append((curT, int(hitPolyIdxs[i]), tuple(loc), normal, normal[axis] * dirLen))
+        lastT = curT
+    return hits
+
+
+def castColumnBundle(args):
+    """ returns sorted ray intersections for each lattice column in the bundle
+
+    Keyword Arguments:
+        args -- tuple of (axis, bundleKey, origins, dirLen, miniDist) where 'origins' is a list of column starting points sharing the same coordinate on the first non-cast axis
+    """
+    axis, bundleKey, origins, dirLen, miniDist = args
+    u_axis, v_axis = [i for i in range(3) if i != axis]
+    origins = np.asarray(origins, dtype=np.float64)
+    triVerts = _triData["triVerts"]
+    normals = _triData["normals"]
+    polyIdxs = _triData["polyIdxs"]
+    mins = _triData["mins"]
+    maxs = _triData["maxs"]
+    # only consider triangles overlapping this bundle of columns
+    pu = origins[0][u_axis]
+    bundleMask = (mins[:, u_axis] <= pu) & (maxs[:, u_axis] >= pu)
+    bundleTriVerts = triVerts[bundleMask]
+    bundleNormals = normals[bundleMask]
+    bundlePolyIdxs = polyIdxs[bundleMask]
+    bundleMins = mins[bundleMask]
+    bundleMaxs = maxs[bundleMask]
+    results = []
+    for origin in origins:
+        pv = origin[v_axis]
+        colMask = (bundleMins[:, v_axis] <= pv) & (bundleMaxs[:, v_axis] >= pv) & (bundleMaxs[:, axis] >= origin[axis])
+        if not colMask.any():
+            results.append([])
+            continue
+        results.append(castColumn(bundleTriVerts[colMask], bundleNormals[colMask], bundlePolyIdxs[colMask], origin, axis, u_axis, v_axis, dirLen, miniDist))
+    return axis, bundleKey, results
@@ -143,7 +143,7 @@ class OBJECT_OT_delete_override(Operator):
                 for x in range(x0, x0 + objSize[0]):
                     for y in range(y0, y0 + objSize[1]):
                         for z in range(z0, z0 + (objSize[2] // cm.zStep)):
-                            curKey = listToStr((x, y, z))
+                            curKey = packKey(x, y, z)
                             # make adjustments to adjacent bricks
                             if cm.autoUpdateOnDelete and cm.lastSplitModel:
                                 self.updateAdjBricksDicts(bricksDict, cm.zStep, curKey, [x, y, z], keysToUpdate)
@@ -230,7 +230,7 @@ class OBJECT_OT_delete_override(Operator):
                     keysToUpdate.append(k0)
                     newBricks.append(k0)
         # top of bricks below are now exposed
-        k0 = listToStr((x, y, z - 1))
+        k0 = packKey(x, y, z - 1)
         if k0 in bricksDict and bricksDict[k0]["draw"]:
             k1 = k0 if bricksDict[k0]["parent"] == "self" else bricksDict[k0]["parent"]
             if not bricksDict[k1]["top_exposed"]:
@@ -238,7 +238,7 @@ class OBJECT_OT_delete_override(Operator):
                 # add key to list for drawing
                 keysToUpdate.append(k1)
         # bottom of bricks above are now exposed
-        k0 = listToStr((x, y, z + 1))
+        k0 = packKey(x, y, z + 1)
         if k0 in bricksDict and bricksDict[k0]["draw"]:
             k1 = k0 if bricksDict[k0]["parent"] == "self" else bricksDict[k0]["parent"]
             if not bricksDict[k1]["bot_exposed"]:
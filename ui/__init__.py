@@ -304,6 +304,8 @@ class VIEW3D_PT_bricker_animation(Panel):
                         if totalSkipped > 0:
                             row = col1.row(align=True)
                             row.label(text="Frames %(s)s-%(e)s outside of %(t)s simulation" % locals())
+            col = layout.column(align=True)
+            col.prop(cm, "useFrameCacheFiles")
             if get_addon_preferences().brickifyInBackground != "OFF":
                 col = layout.column(align=True)
                 row = col.row(align=True)
@@ -712,9 +714,21 @@ class VIEW3D_PT_bricker_merge_settings(Panel):
             row.prop(cm, "mergeSeed")
             row = col.row(align=True)
             row.prop(cm, "connectThresh")
+        elif cm.mergeType == "CONNECTIVITY":
+            row = col.row(align=True)
+            row.prop(cm, "mergeSeed")
+            row = col.row(align=True)
+            row.prop(cm, "connectTimeLimit")
+        if cm.modelCreated:
+            numAlignedEdges = cm.numAlignedEdges
+            row = col.row(align=True)
+            row.label(text="Aligned Edges: %(numAlignedEdges)s" % locals())
         col = layout.column(align=True)
         row = col.row(align=True)
         row.prop(cm, "mergeInternals")
+        if cm.brickType != "BRICKS AND PLATES" and cm.mergeType != "CONNECTIVITY":
+            row = col.row(align=True)
+            row.prop(cm, "parallelMerge")
         if cm.brickType == "BRICKS AND PLATES":
             row = col.row(align=True)
             row.prop(cm, "alignBricks")
@@ -1069,6 +1083,16 @@ class VIEW3D_PT_bricker_advanced(Panel):
         row = col.row(align=True)
         row.prop(cm, "verifyExposure")
         row = col.row(align=True)
+        row.prop(cm, "queryNearestFaces")
+        row = col.row(align=True)
+        row.label(text="Ray Backend:")
+        row = col.row(align=True)
+        row.prop(cm, "rayBackend", text="")
+        row = col.row(align=True)
+        row.label(text="Voxelization Mode:")
+        row = col.row(align=True)
+        row.prop(cm, "voxelizationMode", text="")
+        row = col.row(align=True)
         row.label(text="Meshes:")
         row = col.row(align=True)
         row.prop(cm, "instanceBricks")
@@ -1129,13 +1153,13 @@ class VIEW3D_PT_bricker_matrix_details(Panel):
             layout.label(text="Matrix not available")
             return
         try:
-            dictKey = listToStr(tuple(cm.activeKey))
+            dictKey = packKey(*cm.activeKey)
             brickD = bricksDict[dictKey]
         except Exception as e:
             layout.label(text="No brick details available")
             if len(bricksDict) == 0:
                 print("[Bricker] Skipped drawing Brick Details")
-            elif str(e)[1:-1] == dictKey:
+            elif str(e) == str(dictKey):
                 pass
                 # print("[Bricker] Key '" + str(dictKey) + "' not found")
             elif dictKey is None:
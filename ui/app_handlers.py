@@ -25,8 +25,8 @@ from mathutils import Vector, Euler
 
 # Addon imports
 from ..functions import *
-from ..lib.bricksDict import lightToDeepCache, deepToLightCache, getDictKey
-from ..lib.caches import bricker_bfm_cache
+from ..lib.bricksDict import lightToDeepCache, deepToLightCache, relocateFrameFiles, getDictKey
+from ..lib.caches import bricker_bfm_cache, bricker_bfm_prefetch, bricker_frame_cache, cacheExists
 from ..buttons.customize.tools import *
 from ..buttons.customize.undo_stack import *
 
@@ -112,6 +112,8 @@ def find_3dview_space():
 def clear_bfm_cache(dummy):
     for key in bricker_bfm_cache.keys():
         bricker_bfm_cache[key] = None
+    bricker_frame_cache.clear()
+    bricker_bfm_prefetch.clear()
 
 
 # pull dicts from deep cache to light cache on load
@@ -132,9 +134,8 @@ def handle_loading_to_light_cache(dummy):
             # reset undo states
             cm.blender_undo_state = 0
             python_undo_state[cm.id] = 0
-            # load bricksDict
-            bricksDict = getBricksDict(cm)
-            if bricksDict is None:
+            # verify bricksDict can be loaded (without loading it)
+            if matrixReallyIsDirty(cm) or not cacheExists(cm):
                 cm.matrixLost = True
                 cm.matrixIsDirty = True
 
@@ -145,6 +146,12 @@ def handle_storing_to_deep_cache(dummy):
     lightToDeepCache(bricker_bfm_cache)
 
 
+# copy frame files next to .blend file if saved to new location
+@persistent
+def handle_relocating_frame_files(dummy):
+    relocateFrameFiles(bricker_bfm_cache)
+
+
 # send parent object to scene for linking scene in other file
 @persistent
 def safe_link_parent(dummy):
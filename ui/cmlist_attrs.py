@@ -83,6 +83,10 @@ class CreatedModelProperties(bpy.types.PropertyGroup):
         update=dirtyAnim,
         min=0, max=500000,
         default=10)
+    useFrameCacheFiles = BoolProperty(
+        name="Cache Frames to Disk",
+        description="Store each frame's matrix in a file next to the .blend file instead of in memory and in the .blend file (frames are loaded on demand)",
+        default=False)
     maxWorkers = IntProperty(
         name="Max Worker Instances",
         description="Maximum number of Blender instances allowed to run in background for Bricker calculations (larger numbers are faster at a higher CPU load; 0 for local calculation)",
@@ -256,9 +260,23 @@ class CreatedModelProperties(bpy.types.PropertyGroup):
         name="Merge Type",
         description="Type of algorithm used for merging bricks together",
         items=[("GREEDY", "Greedy", "Creates fewest amount of bricks possible"),
-               ("RANDOM", "Random", "Merges randomly for realistic build")],
+               ("LARGEST", "Largest First", "Places the largest bricks that fit first"),
+               ("RANDOM", "Random", "Merges randomly for realistic build"),
+               ("CONNECTIVITY", "Connectivity", "Merges to minimize seams aligned with the layer below (searches each layer for the time limit; results may vary between builds)")],
         update=dirtyBuild,
         default="RANDOM")
+    connectTimeLimit = FloatProperty(
+        name="Time Limit",
+        description="Seconds spent optimizing brick connectivity for each layer (higher numbers are slower but bricks will be more interconnected)",
+        update=dirtyBuild,
+        step=1,
+        min=0.01, max=60,
+        default=0.1)
+    parallelMerge = BoolProperty(
+        name="Parallel Merge",
+        description="Merge brick layers in multiple worker processes (see 'Merge Cores' in addon preferences; layers are seeded independently, so results differ from merging in a single process)",
+        update=dirtyBuild,
+        default=False)
     legalBricksOnly = BoolProperty(
         name="Legal Bricks Only",
         description="Construct model using only legal brick sizes",
@@ -612,6 +630,28 @@ class CreatedModelProperties(bpy.types.PropertyGroup):
                ("XYZ", "XYZ (Best Result)", "Cast rays in all axis directions for insideness calculation (slowest; uses result consistent for at least 2 of the 3 rays)")],
         update=dirtyMatrix,
         default="HIGH EFFICIENCY")
+    rayBackend = EnumProperty(
+        name="Ray Backend",
+        description="Method used to cast rays against the source mesh for shell and insideness calculations",
+        items=[("OBJECT", "Object", "Cast each ray with the evaluated source object's 'ray_cast' method"),
+               ("BVH", "BVH Tree", "Build one BVH tree from the source mesh and reuse it for every ray (faster for high resolution source meshes)")],
+        update=dirtyMatrix,
+        default="OBJECT")
+    voxelizationMode = EnumProperty(
+        name="Voxelization Mode",
+        description="Method used to compute the shell and insideness of each lattice cell",
+        items=[("PER_CELL", "Per Cell", "Cast a new ray walk from every lattice cell"),
+               ("SCANLINE", "Scanline", "Cast one ray walk per lattice column and derive every cell in the column from its sorted intersections (much faster for high resolution models)"),
+               ("PARALLEL", "Parallel Scanline", "Split lattice columns into bundles and cast them against the source triangles in multiple worker processes (see 'Voxelization Cores' in addon preferences)"),
+               ("OCTREE", "Sparse Octree", "Recursively subdivide the lattice and only visit nodes touching source geometry, filling the interior with a flood fill (fastest for shell-only models of thin or hollow meshes)"),
+               ("SURFACE", "Surface Overlap", "Mark lattice cells overlapping source triangles (exact triangle/box test) as shell and flood fill the outside from the lattice boundary; casts no rays, so it is robust on non-manifold meshes")],
+        update=dirtyMatrix,
+        default="PER_CELL")
+    queryNearestFaces = BoolProperty(
+        name="Query Nearest Faces",
+        description="Find the nearest source face of internal bricks (within material shell depth) and unmatched shell bricks directly instead of propagating it from neighboring shell bricks (slower, but materials and slopes no longer depend on propagation order)",
+        default=False,
+        update=dirtyMatrix)
     castDoubleCheckRays = BoolProperty(
         name="Cast Both Directions",
         description="Cast additional ray(s) the opposite direction for insideness calculation (Slightly slower but much more accurate if mesh is not single closed mesh)",
@@ -674,6 +714,7 @@ class CreatedModelProperties(bpy.types.PropertyGroup):
     customized = BoolProperty(default=True)
     brickSizesUsed = StringProperty(default="")  # list of brickSizes used separated by | (e.g. '5,4,3|7,4,5|8,6,5')
     brickTypesUsed = StringProperty(default="")  # list of brickTypes used separated by | (e.g. 'PLATE|BRICK|STUD')
+    numAlignedEdges = IntProperty(default=0)  # number of brick edges aligned with edges of bricks below them
     modelCreatedOnFrame = IntProperty(default=-1)
     isSmoke = BoolProperty(default=False)
     hasCustomObj1 = BoolProperty(default=False)
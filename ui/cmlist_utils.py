@@ -225,6 +225,8 @@ def getCMProps():
             "maxWidth",
             "maxDepth",
             "mergeType",
+            "connectTimeLimit",
+            "parallelMerge",
             "legalBricksOnly",
             "splitModel",
             "internalSupports",
@@ -252,6 +254,9 @@ def getCMProps():
             "verifyExposure",
             "insidenessRayCastDir",
             "castDoubleCheckRays",
+            "rayBackend",
+            "voxelizationMode",
+            "queryNearestFaces",
             "startFrame",
             "stopFrame",
             "useAnimation",
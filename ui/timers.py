@@ -135,7 +135,7 @@ def handle_selections(junk=None):
             scn.Bricker_last_cmlist_index = scn.cmlist_index
             if obj.isBrick:
                 # adjust scn.active_brick_detail based on active brick
-                x0, y0, z0 = strToList(getDictKey(obj.name))
+                x0, y0, z0 = unpackKey(getDictKey(obj.name))
                 cm.activeKey = (x0, y0, z0)
             tag_redraw_areas("VIEW_3D")
             return 0.05